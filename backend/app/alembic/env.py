@@ -24,6 +24,11 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(object_, name, type_, reflected, compare_to) -> bool:
+    """自動生成の比較対象からFTS5の仮想テーブルとそのシャドウテーブルを除外"""
+    return not (type_ == "table" and name is not None and name.startswith("companies_fts"))
+
+
 def run_migrations() -> None:
     """データベースマイグレーションを実行
 
@@ -37,7 +42,11 @@ def run_migrations() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
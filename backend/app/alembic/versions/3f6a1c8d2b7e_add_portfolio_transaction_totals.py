@@ -0,0 +1,88 @@
+"""ポートフォリオに取引種別ごとの合計額を追加
+
+Revision ID: 3f6a1c8d2b7e
+Revises: b8d1e5f2a6c4
+Create Date: 2026-10-16 16:40:27.318406
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6a1c8d2b7e"
+down_revision: Union[str, Sequence[str], None] = "b8d1e5f2a6c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 取引種別 → portfolios の合計額の列
+# TOTAL_COLUMNS と _totals_update は app.database.models の PORTFOLIO_TOTAL_COLUMNS /
+# _portfolio_totals_update と同じ定義にすること（マイグレーションはモデルをimportしないため複製している）
+TOTAL_COLUMNS = {
+    "buy": "total_buy_amount",
+    "sell": "total_sell_amount",
+    "deposit": "total_deposit",
+    "withdrawal": "total_withdrawal",
+}
+
+
+def _totals_update(row: str, operator: str) -> str:
+    """トリガー内で、取引の金額をポートフォリオの種別ごとの合計額に加算（減算）するSQL"""
+    assignments = ", ".join(
+        f"{column} = {column} {operator} "
+        f"CASE {row}.transaction_type WHEN '{transaction_type}' THEN {row}.total_amount ELSE 0 END"
+        for transaction_type, column in TOTAL_COLUMNS.items()
+    )
+    return f"UPDATE portfolios SET {assignments} WHERE id = {row}.portfolio_id; "
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("portfolios", schema=None) as batch_op:
+        for column in TOTAL_COLUMNS.values():
+            batch_op.add_column(
+                sa.Column(
+                    column, sa.DECIMAL(precision=15, scale=2), nullable=False, server_default="0.00"
+                )
+            )
+
+    # 既存の取引履歴から合計額を計算
+    op.execute(
+        "UPDATE portfolios SET "
+        + ", ".join(
+            f"{column} = COALESCE((SELECT SUM(t.total_amount) FROM transactions t "
+            f"WHERE t.portfolio_id = portfolios.id AND t.transaction_type = '{transaction_type}'), 0)"
+            for transaction_type, column in TOTAL_COLUMNS.items()
+        )
+    )
+
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS transactions_totals_ai AFTER INSERT ON transactions BEGIN "
+        + _totals_update("new", "+")
+        + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS transactions_totals_ad AFTER DELETE ON transactions BEGIN "
+        + _totals_update("old", "-")
+        + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS transactions_totals_au AFTER UPDATE ON transactions BEGIN "
+        + _totals_update("old", "-")
+        + _totals_update("new", "+")
+        + "END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS transactions_totals_au")
+    op.execute("DROP TRIGGER IF EXISTS transactions_totals_ad")
+    op.execute("DROP TRIGGER IF EXISTS transactions_totals_ai")
+
+    with op.batch_alter_table("portfolios", schema=None) as batch_op:
+        for column in reversed(list(TOTAL_COLUMNS.values())):
+            batch_op.drop_column(column)
@@ -0,0 +1,76 @@
+"""銘柄ごとの最新株価テーブルを追加
+
+Revision ID: 5a9e7d3c1f48
+Revises: 3f6a1c8d2b7e
+Create Date: 2026-10-16 17:21:53.604117
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5a9e7d3c1f48"
+down_revision: Union[str, Sequence[str], None] = "3f6a1c8d2b7e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _latest_price_refresh(row: str) -> str:
+    """トリガー内で、銘柄の最新株価をstock_pricesから取り直すSQL"""
+    return (
+        f"DELETE FROM latest_prices WHERE symbol = {row}.symbol; "
+        "INSERT INTO latest_prices(symbol, date, close) "
+        f"SELECT symbol, date, close FROM stock_prices WHERE symbol = {row}.symbol "
+        "ORDER BY date DESC LIMIT 1; "
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "latest_prices",
+        sa.Column("symbol", sa.String(length=10), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("close", sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["symbol"],
+            ["companies.symbol"],
+        ),
+        sa.PrimaryKeyConstraint("symbol"),
+    )
+
+    # 既存の株価データから銘柄ごとの最新株価を登録
+    op.execute(
+        "INSERT INTO latest_prices(symbol, date, close) "
+        "SELECT symbol, date, close FROM ("
+        "SELECT symbol, date, close, "
+        "ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY date DESC) AS rn FROM stock_prices"
+        ") WHERE rn = 1"
+    )
+
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS stock_prices_latest_ai AFTER INSERT ON stock_prices "
+        "WHEN new.date >= COALESCE((SELECT date FROM latest_prices WHERE symbol = new.symbol), new.date) "
+        "BEGIN " + _latest_price_refresh("new") + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS stock_prices_latest_ad AFTER DELETE ON stock_prices "
+        "WHEN old.date >= (SELECT date FROM latest_prices WHERE symbol = old.symbol) "
+        "BEGIN " + _latest_price_refresh("old") + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS stock_prices_latest_au AFTER UPDATE ON stock_prices "
+        "BEGIN " + _latest_price_refresh("old") + _latest_price_refresh("new") + "END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS stock_prices_latest_au")
+    op.execute("DROP TRIGGER IF EXISTS stock_prices_latest_ad")
+    op.execute("DROP TRIGGER IF EXISTS stock_prices_latest_ai")
+    op.drop_table("latest_prices")
@@ -0,0 +1,33 @@
+"""AI株価分析結果にプロンプトハッシュを追加
+
+Revision ID: 7c2e9a4b1f03
+Revises: d4dae558d760
+Create Date: 2026-10-16 10:12:45.201934
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e9a4b1f03"
+down_revision: Union[str, Sequence[str], None] = "d4dae558d760"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("ai_stock_analyses", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("prompt_hash", sa.String(length=32), nullable=True))
+        batch_op.create_index("idx_ai_analyses_prompt_hash", ["prompt_hash"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("ai_stock_analyses", schema=None) as batch_op:
+        batch_op.drop_index("idx_ai_analyses_prompt_hash")
+        batch_op.drop_column("prompt_hash")
@@ -0,0 +1,108 @@
+"""銘柄ごとの最新テクニカル指標テーブルを追加
+
+Revision ID: a4e9d2b7c3f8
+Revises: e2b6a9d4c7f1
+Create Date: 2026-10-16 19:51:36.208417
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4e9d2b7c3f8"
+down_revision: Union[str, Sequence[str], None] = "e2b6a9d4c7f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _latest_indicator_refresh(row: str) -> str:
+    """トリガー内で、銘柄の最新テクニカル指標をtechnical_indicatorsから取り直すSQL"""
+    return (
+        f"DELETE FROM latest_technical_indicators WHERE symbol = {row}.symbol; "
+        "INSERT INTO latest_technical_indicators"
+        "(symbol, date, ma_25, divergence_rate, dividend_yield) "
+        "SELECT symbol, date, ma_25, divergence_rate, dividend_yield FROM technical_indicators "
+        f"WHERE symbol = {row}.symbol ORDER BY date DESC LIMIT 1; "
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "latest_technical_indicators",
+        sa.Column("symbol", sa.String(length=10), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("ma_25", sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column("divergence_rate", sa.DECIMAL(precision=5, scale=2), nullable=True),
+        sa.Column("dividend_yield", sa.DECIMAL(precision=5, scale=2), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["symbol"],
+            ["companies.symbol"],
+        ),
+        sa.PrimaryKeyConstraint("symbol"),
+    )
+    with op.batch_alter_table("latest_technical_indicators", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_latest_technical_indicators_screen",
+            ["divergence_rate", "dividend_yield"],
+            unique=False,
+        )
+
+    # 投資候補の抽出はlatest_technical_indicatorsを読むため、technical_indicatorsには
+    # 主キー以外のインデックスは不要になる（(symbol, date) は主キーで引ける）
+    with op.batch_alter_table("technical_indicators", schema=None) as batch_op:
+        batch_op.drop_index("idx_technical_indicators_symbol_date")
+
+    # 既存のテクニカル指標から銘柄ごとの最新値を登録
+    op.execute(
+        "INSERT INTO latest_technical_indicators"
+        "(symbol, date, ma_25, divergence_rate, dividend_yield) "
+        "SELECT symbol, date, ma_25, divergence_rate, dividend_yield FROM ("
+        "SELECT symbol, date, ma_25, divergence_rate, dividend_yield, "
+        "ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY date DESC) AS rn "
+        "FROM technical_indicators"
+        ") WHERE rn = 1"
+    )
+
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS technical_indicators_latest_ai "
+        "AFTER INSERT ON technical_indicators "
+        "WHEN new.date >= COALESCE("
+        "(SELECT date FROM latest_technical_indicators WHERE symbol = new.symbol), new.date) "
+        "BEGIN " + _latest_indicator_refresh("new") + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS technical_indicators_latest_ad "
+        "AFTER DELETE ON technical_indicators "
+        "WHEN old.date >= (SELECT date FROM latest_technical_indicators WHERE symbol = old.symbol) "
+        "BEGIN " + _latest_indicator_refresh("old") + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS technical_indicators_latest_au "
+        "AFTER UPDATE ON technical_indicators "
+        "WHEN old.date >= COALESCE("
+        "(SELECT date FROM latest_technical_indicators WHERE symbol = old.symbol), old.date) "
+        "OR new.date >= COALESCE("
+        "(SELECT date FROM latest_technical_indicators WHERE symbol = new.symbol), new.date) "
+        "BEGIN " + _latest_indicator_refresh("old") + _latest_indicator_refresh("new") + "END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS technical_indicators_latest_au")
+    op.execute("DROP TRIGGER IF EXISTS technical_indicators_latest_ad")
+    op.execute("DROP TRIGGER IF EXISTS technical_indicators_latest_ai")
+
+    with op.batch_alter_table("technical_indicators", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_technical_indicators_symbol_date", ["symbol", "date"], unique=False
+        )
+
+    with op.batch_alter_table("latest_technical_indicators", schema=None) as batch_op:
+        batch_op.drop_index("idx_latest_technical_indicators_screen")
+    op.drop_table("latest_technical_indicators")
@@ -0,0 +1,54 @@
+"""企業検索用のFTS5（trigram）インデックスを追加
+
+Revision ID: b8d1e5f2a6c4
+Revises: 7c2e9a4b1f03
+Create Date: 2026-10-16 15:02:11.483920
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d1e5f2a6c4"
+down_revision: Union[str, Sequence[str], None] = "7c2e9a4b1f03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS companies_fts USING fts5("
+        "symbol, name, content='companies', content_rowid='rowid', tokenize='trigram')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS companies_fts_ai AFTER INSERT ON companies BEGIN "
+        "INSERT INTO companies_fts(rowid, symbol, name) VALUES (new.rowid, new.symbol, new.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS companies_fts_ad AFTER DELETE ON companies BEGIN "
+        "INSERT INTO companies_fts(companies_fts, rowid, symbol, name) "
+        "VALUES ('delete', old.rowid, old.symbol, old.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS companies_fts_au AFTER UPDATE ON companies BEGIN "
+        "INSERT INTO companies_fts(companies_fts, rowid, symbol, name) "
+        "VALUES ('delete', old.rowid, old.symbol, old.name); "
+        "INSERT INTO companies_fts(rowid, symbol, name) VALUES (new.rowid, new.symbol, new.name); "
+        "END"
+    )
+    # 既存の企業データでインデックスを構築
+    op.execute("INSERT INTO companies_fts(companies_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS companies_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS companies_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS companies_fts_ai")
+    op.execute("DROP TABLE IF EXISTS companies_fts")
@@ -0,0 +1,34 @@
+"""取引履歴にポートフォリオ・取引種別・取引日の複合インデックスを追加
+
+Revision ID: c1d7f4e9a2b5
+Revises: 5a9e7d3c1f48
+Create Date: 2026-10-16 18:05:12.947361
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c1d7f4e9a2b5"
+down_revision: Union[str, Sequence[str], None] = "5a9e7d3c1f48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("transactions", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_transactions_portfolio_type_date",
+            ["portfolio_id", "transaction_type", "transaction_date"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("transactions", schema=None) as batch_op:
+        batch_op.drop_index("idx_transactions_portfolio_type_date")
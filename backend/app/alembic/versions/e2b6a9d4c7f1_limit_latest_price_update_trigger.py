@@ -0,0 +1,48 @@
+"""最新株価の更新トリガーを最新日の行の更新時だけ動かす
+
+Revision ID: e2b6a9d4c7f1
+Revises: c1d7f4e9a2b5
+Create Date: 2026-10-16 18:42:37.512804
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b6a9d4c7f1"
+down_revision: Union[str, Sequence[str], None] = "c1d7f4e9a2b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _latest_price_refresh(row: str) -> str:
+    """トリガー内で、銘柄の最新株価をstock_pricesから取り直すSQL"""
+    return (
+        f"DELETE FROM latest_prices WHERE symbol = {row}.symbol; "
+        "INSERT INTO latest_prices(symbol, date, close) "
+        f"SELECT symbol, date, close FROM stock_prices WHERE symbol = {row}.symbol "
+        "ORDER BY date DESC LIMIT 1; "
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS stock_prices_latest_au")
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS stock_prices_latest_au AFTER UPDATE ON stock_prices "
+        "WHEN old.date >= COALESCE((SELECT date FROM latest_prices WHERE symbol = old.symbol), old.date) "
+        "OR new.date >= COALESCE((SELECT date FROM latest_prices WHERE symbol = new.symbol), new.date) "
+        "BEGIN " + _latest_price_refresh("old") + _latest_price_refresh("new") + "END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS stock_prices_latest_au")
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS stock_prices_latest_au AFTER UPDATE ON stock_prices "
+        "BEGIN " + _latest_price_refresh("old") + _latest_price_refresh("new") + "END"
+    )
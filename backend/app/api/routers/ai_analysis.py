@@ -10,7 +10,7 @@ from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from app.api.dependencies.auth import get_current_user
 from app.api.schemas.ai_analysis import AnalysisListResponse, AnalysisResponse
 from app.config.settings import AI_ANALYSIS_TIMEOUT_SECONDS
-from app.database.database_manager import DatabaseManager
+from app.database.database_manager import DatabaseManager, get_db_manager
 from app.database.models import AIStockAnalysis, User
 from app.database.session import SessionLocal
 from app.services.ai_stock_analysis_service import AIStockAnalysisService
@@ -57,15 +57,6 @@ def to_analysis_response(analysis: AIStockAnalysis) -> AnalysisResponse:
     )
 
 
-def get_db_manager() -> DatabaseManager:
-    """データベースマネージャーを取得
-
-    Returns:
-        DatabaseManager インスタンス
-    """
-    return DatabaseManager()
-
-
 def get_ai_service(db_manager: DatabaseManager = Depends(get_db_manager)) -> AIStockAnalysisService:
     """AI分析サービスを取得
 
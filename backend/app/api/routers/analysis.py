@@ -4,7 +4,7 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from app.database.database_manager import DatabaseManager
+from app.database.database_manager import get_db_manager
 from app.services.analysis.technical_analyzer_service import TechnicalAnalyzerService
 
 router = APIRouter()
@@ -76,7 +76,7 @@ async def get_system_stats(
         market_filter: 市場区分（prime, standard, growth）。空文字で全市場。
     """
     try:
-        db_manager = DatabaseManager()
+        db_manager = get_db_manager()
         # 空文字の場合はNoneに変換
         filter_value = market_filter if market_filter else None
         stats = db_manager.get_database_stats(market_filter=filter_value)
@@ -2,6 +2,7 @@ import sys
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
@@ -118,11 +119,17 @@ async def get_candidates_count(
             market_filter=filter_value,
         )
 
+        # スコア帯（3未満 / 3以上5未満 / 5以上）ごとの件数を1回の走査で集計
+        scores = np.fromiter(
+            (c.get("analysis_score", 0) for c in candidates), dtype=float, count=len(candidates)
+        )
+        low, medium, high = np.bincount(np.digitize(scores, [3, 5]), minlength=3).tolist()
+
         return {
             "total_candidates": len(candidates),
-            "high_score": len([c for c in candidates if c.get("analysis_score", 0) >= 5]),
-            "medium_score": len([c for c in candidates if 3 <= c.get("analysis_score", 0) < 5]),
-            "low_score": len([c for c in candidates if c.get("analysis_score", 0) < 3]),
+            "high_score": high,
+            "medium_score": medium,
+            "low_score": low,
         }
 
     except Exception as e:
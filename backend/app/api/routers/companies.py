@@ -44,26 +44,14 @@ async def get_companies(
     try:
         company_service = CompanyFilterService()
 
-        # 検索時はデータベースレベルで検索、通常時は全件取得
-        if search:
-            companies = company_service.search_companies(
-                search=search,
-                limit=limit,
-                market=market,
-                sector=sector,
-                is_enterprise=is_enterprise,
-            )
-        else:
-            # 通常のフィルタリング（全件取得してからPythonでフィルタ）
-            companies = company_service.get_all_companies(limit=limit)
-
-            # フィルタを適用
-            if market:
-                companies = [c for c in companies if c.get("market") == market]
-            if sector:
-                companies = [c for c in companies if c.get("sector") == sector]
-            if is_enterprise is not None:
-                companies = [c for c in companies if c.get("is_enterprise") == is_enterprise]
+        # 検索・フィルタ・件数の上限はすべてデータベースレベルで適用
+        companies = company_service.search_companies(
+            search=search,
+            limit=limit,
+            market=market,
+            sector=sector,
+            is_enterprise=is_enterprise,
+        )
 
         # レスポンスモデルに変換
         result = [
@@ -134,11 +122,9 @@ async def get_investment_candidates(
             divergence_threshold=divergence_threshold,
             dividend_min=dividend_min,
             dividend_max=dividend_max,
+            limit=limit,
         )
 
-        # 上限件数でカット
-        candidates = candidates[:limit]
-
         # レスポンスモデルに変換
         result = [
             InvestmentCandidate(
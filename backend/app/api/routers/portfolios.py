@@ -225,7 +225,7 @@ def get_portfolio_summary(db: DBSession, current_user: CurrentUser):
             db.query(models.Position).filter(models.Position.portfolio_id == portfolio.id).count()
         )
         total_positions_count += positions_count
-        total_profit_loss += calc["total_profit_loss"]
+        total_profit_loss += calc.total_profit_loss
         total_initial_capital += float(portfolio.initial_capital)
 
     # 総損益率の計算（全ポートフォリオの初期資本に対する割合）
@@ -263,10 +263,10 @@ def get_portfolios(db: DBSession, current_user: CurrentUser):
                 name=portfolio.name,
                 description=portfolio.description,
                 initial_capital=float(portfolio.initial_capital),
-                total_value=calc["total_value"],
-                total_profit_loss=calc["total_profit_loss"],
-                total_profit_loss_rate=calc["total_profit_loss_rate"],
-                cash_balance=calc["cash_balance"],
+                total_value=calc.total_value,
+                total_profit_loss=calc.total_profit_loss,
+                total_profit_loss_rate=calc.total_profit_loss_rate,
+                cash_balance=calc.cash_balance,
                 positions_count=positions_count,
                 created_at=portfolio.created_at,
                 updated_at=portfolio.updated_at,
@@ -345,10 +345,10 @@ def get_portfolio_detail(portfolio_id: int, db: DBSession, current_user: Current
         name=portfolio.name,
         description=portfolio.description,
         initial_capital=float(portfolio.initial_capital),
-        total_value=calc["total_value"],
-        total_profit_loss=calc["total_profit_loss"],
-        total_profit_loss_rate=calc["total_profit_loss_rate"],
-        cash_balance=calc["cash_balance"],
+        total_value=calc.total_value,
+        total_profit_loss=calc.total_profit_loss,
+        total_profit_loss_rate=calc.total_profit_loss_rate,
+        cash_balance=calc.cash_balance,
         positions=position_details,
         created_at=portfolio.created_at,
         updated_at=portfolio.updated_at,
@@ -482,6 +482,7 @@ def deposit_cash(
     )
     db.add(transaction)
     db.commit()
+    PortfolioService.invalidate_cache(portfolio_id)
     db.refresh(transaction)
 
     return TransactionResponse(
@@ -509,11 +510,11 @@ def withdraw_cash(
 
     # 現金残高チェック
     service = PortfolioService(db)
-    calc = service.calculate_portfolio_value(portfolio_id)
-    if calc["cash_balance"] < payload.amount:
+    calc = service.calculate_portfolio_value(portfolio_id, bypass_cache=True)
+    if calc.cash_balance < payload.amount:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"現金残高が不足しています（残高: ¥{calc['cash_balance']:,.0f}）",
+            detail=f"現金残高が不足しています（残高: ¥{calc.cash_balance:,.0f}）",
         )
 
     # 出金トランザクション作成
@@ -530,6 +531,7 @@ def withdraw_cash(
     )
     db.add(transaction)
     db.commit()
+    PortfolioService.invalidate_cache(portfolio_id)
     db.refresh(transaction)
 
     return TransactionResponse(
@@ -5,7 +5,7 @@ import pandas as pd
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
-from app.database.database_manager import DatabaseManager
+from app.database.database_manager import get_db_manager
 from app.services.analysis.technical_analyzer_service import TechnicalAnalyzerService
 from app.utils.price_indicators import calculate_price_change_percent
 
@@ -73,7 +73,7 @@ class StockDetail(BaseModel):
 
 
 # データベースマネージャー
-db_manager = DatabaseManager()
+db_manager = get_db_manager()
 
 
 @router.get("/", response_model=list[StockInfo])
@@ -199,7 +199,9 @@ async def get_stock_detail(symbol: str, days: int = 365):
         dividend_yield = None
         if current_price:
             analyzer = TechnicalAnalyzerService()
-            dividend_yield = analyzer.get_dividend_yield(symbol, current_price)
+            dividend_yield = analyzer.get_dividend_yield(
+                symbol, current_price, ticker_info=ticker_data
+            )
 
         return StockDetail(
             symbol=company["symbol"],
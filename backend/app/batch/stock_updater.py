@@ -85,8 +85,9 @@ class BatchRunner:
             price_updates = cast(dict[str, bool], results.get("price_updates", {}))
             ticker_updates = cast(dict[str, bool], results.get("ticker_updates", {}))
 
-            price_success = sum(1 for success in price_updates.values() if success)
-            ticker_success = sum(1 for success in ticker_updates.values() if success)
+            # boolはintのサブクラスなのでそのまま合計すれば成功件数になる
+            price_success = sum(price_updates.values())
+            ticker_success = sum(ticker_updates.values())
 
             logger.info(
                 f"株価データ更新完了: 価格 {price_success}件, ティッカー {ticker_success}件"
@@ -116,7 +117,7 @@ class BatchRunner:
         try:
             results = self.technical_analysis_service.analyze_batch_stocks(symbols)
 
-            success_count = sum(1 for result in results.values() if result is not None)
+            success_count = len(results) - list(results.values()).count(None)
             logger.info(f"技術分析完了: 成功 {success_count}/{len(symbols)}")
 
             # 全ての銘柄で失敗した場合のみエラー（一部成功は正常）
@@ -192,14 +193,14 @@ def main(markets: str | None, symbols: tuple[str, ...]) -> None:
         # FilterCriteriaを作成
         filter_criteria = None
         if symbols:
-            symbol_list = list(symbols)
+            symbol_list = tuple(symbols)
             logger.info(f"指定銘柄: {symbol_list}")
             filter_criteria = FilterCriteria(specific_symbols=symbol_list)
         elif markets:
             logger.info(f"対象市場: {markets}")
             # 市場名をデータベースの表記に変換
             actual_market = MARKET_NAME_MAPPING.get(markets, markets)
-            filter_criteria = FilterCriteria(markets=[actual_market] if markets != "all" else None)
+            filter_criteria = FilterCriteria(markets=(actual_market,) if markets != "all" else None)
 
         if filter_criteria:
             # バッチ処理を実行
@@ -14,6 +14,9 @@ TRADING_DAYS_PER_YEAR = 252  # 年間取引日数（ボラティリティ年率
 VOLATILITY_WINDOW = 30  # ボラティリティ計算期間（日）
 DIVERGENCE_THRESHOLD_STRONG = 5.0  # 強気/弱気判定の乖離率閾値（%）
 VOLUME_MA_PERIOD = 20  # 出来高移動平均期間（日）
+MACD_FAST_PERIOD = 12  # MACD短期EMA期間（日）
+MACD_SLOW_PERIOD = 26  # MACD長期EMA期間（日）
+MACD_SIGNAL_PERIOD = 9  # MACDシグナル期間（日）
 
 # セキュリティ関連の定数
 TOKEN_LENGTH = 32  # トークン生成デフォルト長（バイト）
@@ -2,19 +2,22 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True)
 class FilterCriteria:
-    """銘柄フィルタリング条件を定義するクラス"""
+    """銘柄フィルタリング条件を定義するクラス
+
+    変更不可（frozen）でハッシュ可能にするため、複数の値を取る条件はタプルで受け取る。
+    """
 
     # 市場区分フィルタ
-    markets: Optional[list[str]] = None
-    exclude_markets: Optional[list[str]] = None
+    markets: Optional[tuple[str, ...]] = None
+    exclude_markets: Optional[tuple[str, ...]] = None
 
     # 企業規模フィルタ
     is_enterprise_only: bool = False
 
     # 特定銘柄コードリスト
-    specific_symbols: Optional[list[str]] = None
+    specific_symbols: Optional[tuple[str, ...]] = None
 
     # 企業規模フィルタ
     market_cap_min: Optional[int] = None
@@ -25,8 +28,8 @@ class FilterCriteria:
     max_revenue: Optional[int] = None
 
     # 業種フィルタ
-    sectors: Optional[list[str]] = None
-    excluded_sectors: Optional[list[str]] = None
+    sectors: Optional[tuple[str, ...]] = None
+    excluded_sectors: Optional[tuple[str, ...]] = None
 
     # 配当利回りフィルタ
     min_dividend_yield: Optional[float] = None
@@ -38,3 +41,36 @@ class FilterCriteria:
     divergence_min: Optional[float] = None
     dividend_yield_min: Optional[float] = None
     dividend_yield_max: Optional[float] = None
+
+
+@dataclass
+class CompanyInfo:
+    """JPXファイルから抽出した企業情報を保持するクラス"""
+
+    # 銘柄数ぶん生成されるため、インスタンスごとの__dict__を持たせない
+    # （dataclass(slots=True)はPython 3.10以降のため、__slots__を明示する）
+    __slots__ = ("symbol", "name", "sector", "market", "employees", "revenue", "is_enterprise")
+
+    symbol: str
+    name: str
+    sector: str
+    market: str
+    employees: Optional[int]
+    revenue: Optional[int]
+    is_enterprise: bool
+
+
+@dataclass(frozen=True)
+class PortfolioValuation:
+    """ポートフォリオの評価額と損益を保持するクラス
+
+    キャッシュした同じインスタンスを複数のリクエストに返すため、変更不可（frozen）にする。
+    """
+
+    # 評価額の計算ごとに生成されるため、インスタンスごとの__dict__を持たせない
+    __slots__ = ("total_value", "total_profit_loss", "total_profit_loss_rate", "cash_balance")
+
+    total_value: float
+    total_profit_loss: float
+    total_profit_loss_rate: float
+    cash_balance: float
@@ -14,10 +14,23 @@ MIN_REVENUE = 10_000_000_000
 
 DATA_DAYS = 252
 BATCH_SIZE = 50
+# 技術分析バッチの並列ワーカー数（SQLiteの書き込み競合を避けるため控えめに設定）
+TECHNICAL_ANALYSIS_MAX_WORKERS = 4
+# 技術指標をまとめて保存する銘柄数
+TECHNICAL_INDICATOR_WRITE_BATCH_SIZE = 500
 
 # 環境変数でDATABASE_PATHを上書き可能に（Docker対応）
 DATABASE_PATH = Path(os.environ.get("DATABASE_PATH", PROJECT_ROOT / "data" / "stock_data.db"))
 DATA_DIR = DATABASE_PATH.parent  # データベースと同じディレクトリ
+# SQLiteの接続ごとに設定するPRAGMA（WALで読み込みを書き込みにブロックさせず、コミット時のfsyncを減らす）
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # 負の値はKiB単位（64MiB）
+}
+DATABASE_STATS_CACHE_TTL_SECONDS = 60  # データベース統計情報の集計結果をメモリに保持する期間（秒）
 
 JPX_URL = "https://www.jpx.co.jp/markets/statistics-equities/misc/01.html"
 JPX_FILE_NAME = "data_j.xls"
@@ -27,6 +40,10 @@ LOG_FORMAT = "[%(asctime)s], [%(levelname)s], %(name)s -- %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 YFINANCE_REQUEST_DELAY = 0.1
+# yfinanceからの取得を並列に行うワーカー数（Yahooのレート制限を考慮して控えめに設定）
+YFINANCE_MAX_WORKERS = 8
+# ティッカー情報（DBに保存済みのyfinance info）を再取得するまでの基本日数。銘柄ごとに0〜6日ずらす
+TICKER_INFO_UPDATE_INTERVAL_DAYS = 14
 
 MARKET_INDICES = {"NIKKEI": "^N225", "TOPIX": "^TPX", "JASDAQ": "^JASDAQ"}
 
@@ -35,8 +52,13 @@ ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
 CLAUDE_MODEL = "claude-sonnet-4-20250514"
 CLAUDE_MAX_TOKENS = 2000
 
+# ポートフォリオ設定
+PORTFOLIO_VALUATION_CACHE_TTL_SECONDS = 30  # 評価額の計算結果をメモリに保持する期間（秒）
+PORTFOLIO_VALUATION_CACHE_MAXSIZE = 1024
+
 # AI分析設定
 AI_ANALYSIS_TIMEOUT_SECONDS = 60
 AI_ANALYSIS_DATA_DAYS = 90
+AI_ANALYSIS_REUSE_HOURS = 24  # 同一プロンプトの分析結果を再利用する期間（時間）
 
 DATA_DIR.mkdir(exist_ok=True)
@@ -1,19 +1,46 @@
+import time
 from datetime import datetime, timedelta
-from typing import Optional, cast
+from typing import Any, Optional, Union, cast
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import func, or_
+from sqlalchemy import Select, delete, func, or_, select
+from sqlalchemy.dialects.sqlite import Insert as SQLiteInsert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, RowMapping
 from sqlalchemy.orm import Session
 
 from app.config.constants import MARKET_NAME_MAPPING
 from app.config.logging_config import get_service_logger
-from app.config.settings import DATABASE_PATH
-from app.database.models import Company, StockPrice, TechnicalIndicator, TickerInfo
+from app.config.settings import DATABASE_PATH, DATABASE_STATS_CACHE_TTL_SECONDS
+from app.database.models import (
+    Company,
+    LatestTechnicalIndicator,
+    StockPrice,
+    TechnicalIndicator,
+    TickerInfo,
+)
 from app.database.session import SessionLocal, engine
-from app.database.types import SymbolDateMap
+from app.database.types import PriceArrays, SymbolDateMap, TechnicalIndicatorWrite
 
 logger = get_service_logger(__name__)
 
+# 企業情報として返す列（get_company_by_symbol / get_companies）
+_COMPANY_COLUMNS = (
+    Company.symbol,
+    Company.name,
+    Company.sector,
+    Company.market,
+    Company.employees,
+    Company.revenue,
+    Company.is_enterprise,
+    Company.dividend_yield,
+    Company.last_updated,
+)
+
+# read_sqlで日付列を変換する形式（保存時はISO形式の文字列のため、形式の推定を省く）
+_DATE_COLUMN_FORMAT = {"date": {"format": "%Y-%m-%d"}}
+
 
 class DatabaseManager:
     def __init__(self, db_path: Optional[str] = None, session: Optional[Session] = None):
@@ -25,6 +52,8 @@ class DatabaseManager:
         self.db_path = db_path or DATABASE_PATH  # 後方互換性
         self._external_session = session
         self._engine = engine
+        # 統計情報のキャッシュ（市場フィルタ → (有効期限, 集計結果)）
+        self._stats_cache: dict[Optional[str], tuple[float, dict]] = {}
 
     def _get_session(self) -> Session:
         """内部用セッション取得"""
@@ -50,23 +79,13 @@ class DatabaseManager:
         """指定された銘柄の企業情報を取得"""
         session = self._get_session()
         try:
-            company = session.query(Company).filter_by(symbol=symbol).first()
-            if company:
-                return {
-                    "symbol": company.symbol,
-                    "name": company.name,
-                    "sector": company.sector,
-                    "market": company.market,
-                    "employees": company.employees,
-                    "revenue": company.revenue,
-                    "is_enterprise": company.is_enterprise,
-                    "dividend_yield": float(company.dividend_yield)
-                    if company.dividend_yield
-                    else None,
-                    "last_updated": company.last_updated.isoformat()
-                    if company.last_updated
-                    else None,
-                }
+            row = (
+                session.execute(select(*_COMPANY_COLUMNS).where(Company.symbol == symbol))
+                .mappings()
+                .first()
+            )
+            if row:
+                return self._company_to_dict(row)
             return None
         except Exception as e:
             logger.error(f"Error getting company {symbol}: {e}")
@@ -75,35 +94,42 @@ class DatabaseManager:
             if not self._external_session:
                 session.close()
 
+    @staticmethod
+    def _company_to_dict(row: RowMapping) -> dict:
+        """_COMPANY_COLUMNS の行を辞書に変換（配当利回りはfloat、更新日時はISO形式の文字列）"""
+        company = dict(row)
+        company["dividend_yield"] = float(row["dividend_yield"]) if row["dividend_yield"] else None
+        company["last_updated"] = row["last_updated"].isoformat() if row["last_updated"] else None
+        return company
+
+    def get_existing_symbols(self, symbols: list[str]) -> set[str]:
+        """指定された銘柄のうち、companiesテーブルに存在する銘柄を取得"""
+        session = self._get_session()
+        try:
+            return set(session.scalars(select(Company.symbol).where(Company.symbol.in_(symbols))))
+        except Exception as e:
+            logger.error(f"Error getting existing symbols for {len(symbols)} symbols: {e}")
+            return set()
+        finally:
+            if not self._external_session:
+                session.close()
+
     def get_companies(
         self, is_enterprise_only: bool = False, markets: Optional[list[str]] = None
     ) -> list[dict]:
         """企業情報一覧を取得"""
         session = self._get_session()
         try:
-            query = session.query(Company)
+            # ORMオブジェクトを作らず、必要な列だけを行として取得する
+            query = select(*_COMPANY_COLUMNS)
 
             if is_enterprise_only:
-                query = query.filter(Company.is_enterprise.is_(True))
+                query = query.where(Company.is_enterprise.is_(True))
 
             if markets:
-                query = query.filter(Company.market.in_(markets))
+                query = query.where(Company.market.in_(markets))
 
-            companies = query.all()
-            return [
-                {
-                    "symbol": c.symbol,
-                    "name": c.name,
-                    "sector": c.sector,
-                    "market": c.market,
-                    "employees": c.employees,
-                    "revenue": c.revenue,
-                    "is_enterprise": c.is_enterprise,
-                    "dividend_yield": float(c.dividend_yield) if c.dividend_yield else None,
-                    "last_updated": c.last_updated.isoformat() if c.last_updated else None,
-                }
-                for c in companies
-            ]
+            return [self._company_to_dict(row) for row in session.execute(query).mappings()]
         except Exception as e:
             logger.error(f"Error getting companies: {e}")
             return []
@@ -115,33 +141,9 @@ class DatabaseManager:
         """企業情報を挿入または更新（UPSERT）"""
         session = self._get_session()
         try:
-            existing = session.query(Company).filter_by(symbol=company_data["symbol"]).first()
-
-            if existing:
-                # UPDATE
-                existing.name = company_data["name"]
-                existing.sector = company_data.get("sector")
-                existing.market = company_data.get("market")
-                existing.employees = company_data.get("employees")
-                existing.revenue = company_data.get("revenue")
-                existing.is_enterprise = company_data.get("is_enterprise", False)
-                existing.dividend_yield = company_data.get("dividend_yield")
-                existing.last_updated = datetime.now()
-            else:
-                # INSERT
-                company = Company(
-                    symbol=company_data["symbol"],
-                    name=company_data["name"],
-                    sector=company_data.get("sector"),
-                    market=company_data.get("market"),
-                    employees=company_data.get("employees"),
-                    revenue=company_data.get("revenue"),
-                    is_enterprise=company_data.get("is_enterprise", False),
-                    dividend_yield=company_data.get("dividend_yield"),
-                    last_updated=datetime.now(),
-                )
-                session.add(company)
-
+            session.execute(
+                self._company_upsert_stmt(), self._company_row(company_data, datetime.now())
+            )
             session.commit()
             return True
         except Exception as e:
@@ -153,50 +155,32 @@ class DatabaseManager:
                 session.close()
 
     def insert_companies(self, companies_data: list[dict]) -> bool:
-        """複数の企業データを一括挿入"""
-        session = self._get_session()
-        success_count = 0
-
-        try:
-            for company_data in companies_data:
-                try:
-                    existing = (
-                        session.query(Company).filter_by(symbol=company_data["symbol"]).first()
-                    )
-
-                    if existing:
-                        # UPDATE
-                        existing.name = company_data["name"]
-                        existing.sector = company_data.get("sector")
-                        existing.market = company_data.get("market")
-                        existing.employees = company_data.get("employees")
-                        existing.revenue = company_data.get("revenue")
-                        existing.is_enterprise = company_data.get("is_enterprise", False)
-                        existing.dividend_yield = company_data.get("dividend_yield")
-                        existing.last_updated = datetime.now()
-                    else:
-                        # INSERT
-                        company = Company(
-                            symbol=company_data["symbol"],
-                            name=company_data["name"],
-                            sector=company_data.get("sector"),
-                            market=company_data.get("market"),
-                            employees=company_data.get("employees"),
-                            revenue=company_data.get("revenue"),
-                            is_enterprise=company_data.get("is_enterprise", False),
-                            dividend_yield=company_data.get("dividend_yield"),
-                            last_updated=datetime.now(),
-                        )
-                        session.add(company)
+        """
+        複数の企業データを一括挿入または更新（UPSERT）
 
-                    success_count += 1
-                except Exception as e:
-                    logger.error(f"Error processing company {company_data.get('symbol')}: {e}")
-                    continue
+        銘柄コード・銘柄名のない企業データはログに出してスキップし、残りを保存する。
+        全件を1つのトランザクションで保存するため、DBへの書き込みでエラーになった場合は
+        エラーの行だけを除かず、全件をロールバックしてFalseを返す。
+        """
+        now = datetime.now()
+        rows = []
+        for company_data in companies_data:
+            if not company_data.get("symbol") or "name" not in company_data:
+                logger.error(f"Error processing company {company_data.get('symbol')}: 必須項目なし")
+                continue
+            rows.append(self._company_row(company_data, now))
+
+        if not rows:
+            logger.info(f"企業データ一括挿入完了: 成功 0/{len(companies_data)}")
+            return False
 
+        session = self._get_session()
+        try:
+            # 既存企業の有無を問い合わせず、1つのUPSERT文をexecutemanyで全件に適用する
+            session.execute(self._company_upsert_stmt(), rows)
             session.commit()
-            logger.info(f"企業データ一括挿入完了: 成功 {success_count}/{len(companies_data)}")
-            return success_count > 0
+            logger.info(f"企業データ一括挿入完了: 成功 {len(rows)}/{len(companies_data)}")
+            return True
 
         except Exception as e:
             logger.error(f"企業データ一括挿入エラー: {e}")
@@ -206,6 +190,34 @@ class DatabaseManager:
             if not self._external_session:
                 session.close()
 
+    @staticmethod
+    def _company_row(company_data: dict, last_updated: datetime) -> dict:
+        """企業データをcompaniesテーブルの列構成の辞書に変換"""
+        return {
+            "symbol": company_data["symbol"],
+            "name": company_data["name"],
+            "sector": company_data.get("sector"),
+            "market": company_data.get("market"),
+            "employees": company_data.get("employees"),
+            "revenue": company_data.get("revenue"),
+            "is_enterprise": company_data.get("is_enterprise", False),
+            "dividend_yield": company_data.get("dividend_yield"),
+            "last_updated": last_updated,
+        }
+
+    @staticmethod
+    def _company_upsert_stmt() -> SQLiteInsert:
+        """銘柄コードが既存であれば他の列を上書きする、companiesへのINSERT文"""
+        stmt = sqlite_insert(Company)
+        return stmt.on_conflict_do_update(
+            index_elements=[Company.symbol],
+            set_={
+                column.name: column
+                for column in stmt.excluded
+                if column.name != Company.symbol.name
+            },
+        )
+
     def get_filtered_companies(
         self,
         divergence_min: Optional[float] = None,
@@ -244,75 +256,47 @@ class DatabaseManager:
         """
         session = self._get_session()
         try:
-            # サブクエリ: 各銘柄の最新日付
-            latest_dates_subq = (
-                session.query(
-                    TechnicalIndicator.symbol, func.max(TechnicalIndicator.date).label("max_date")
-                )
-                .group_by(TechnicalIndicator.symbol)
-                .subquery()
+            # メインクエリ（ORMオブジェクトを作らず、返す列だけを行として取得する）
+            query = self._filtered_companies_query(
+                (
+                    Company.symbol,
+                    Company.name,
+                    Company.sector,
+                    Company.market,
+                    Company.employees,
+                    Company.revenue,
+                    Company.is_enterprise,
+                    Company.last_updated,
+                    LatestTechnicalIndicator.divergence_rate,
+                    LatestTechnicalIndicator.dividend_yield,
+                    LatestTechnicalIndicator.date,
+                ),
+                divergence_min=divergence_min,
+                divergence_max=divergence_max,
+                dividend_yield_min=dividend_yield_min,
+                dividend_yield_max=dividend_yield_max,
+                is_enterprise_only=is_enterprise_only,
+                market_filter=market_filter,
             )
 
-            # メインクエリ
-            query = (
-                session.query(Company, TechnicalIndicator)
-                .join(TechnicalIndicator, Company.symbol == TechnicalIndicator.symbol)
-                .join(
-                    latest_dates_subq,
-                    (TechnicalIndicator.symbol == latest_dates_subq.c.symbol)
-                    & (TechnicalIndicator.date == latest_dates_subq.c.max_date),
-                )
-            )
-
-            # フィルタ適用
-            if is_enterprise_only:
-                query = query.filter(Company.is_enterprise.is_(True))
-
-            if divergence_min is not None:
-                query = query.filter(func.abs(TechnicalIndicator.divergence_rate) >= divergence_min)
-
-            if divergence_max is not None:
-                query = query.filter(TechnicalIndicator.divergence_rate <= divergence_max)
-
-            if dividend_yield_min is not None:
-                query = query.filter(
-                    TechnicalIndicator.dividend_yield.isnot(None),
-                    TechnicalIndicator.dividend_yield >= dividend_yield_min,
-                )
-
-            if dividend_yield_max is not None:
-                query = query.filter(
-                    TechnicalIndicator.dividend_yield.isnot(None),
-                    TechnicalIndicator.dividend_yield <= dividend_yield_max,
-                )
-
-            if market_filter is not None:
-                query = query.filter(Company.market == market_filter)
-
-            results = query.distinct().all()
+            # latest_technical_indicatorsは銘柄が主キーのため、結合しても
+            # 銘柄ごとに1行になる（DISTINCTによる全列のソートは不要）
+            results = session.execute(query).all()
 
             # dict化（後方互換性）
             return [
                 {
-                    "symbol": row.Company.symbol,
-                    "name": row.Company.name,
-                    "sector": row.Company.sector,
-                    "market": row.Company.market,
-                    "employees": row.Company.employees,
-                    "revenue": row.Company.revenue,
-                    "is_enterprise": row.Company.is_enterprise,
-                    "last_updated": row.Company.last_updated.isoformat()
-                    if row.Company.last_updated
-                    else None,
-                    "divergence_rate": float(row.TechnicalIndicator.divergence_rate)
-                    if row.TechnicalIndicator.divergence_rate
-                    else None,
-                    "dividend_yield": float(row.TechnicalIndicator.dividend_yield)
-                    if row.TechnicalIndicator.dividend_yield
-                    else None,
-                    "date": row.TechnicalIndicator.date.isoformat()
-                    if row.TechnicalIndicator.date
-                    else None,
+                    "symbol": row.symbol,
+                    "name": row.name,
+                    "sector": row.sector,
+                    "market": row.market,
+                    "employees": row.employees,
+                    "revenue": row.revenue,
+                    "is_enterprise": row.is_enterprise,
+                    "last_updated": row.last_updated.isoformat() if row.last_updated else None,
+                    "divergence_rate": float(row.divergence_rate) if row.divergence_rate else None,
+                    "dividend_yield": float(row.dividend_yield) if row.dividend_yield else None,
+                    "date": row.date.isoformat() if row.date else None,
                 }
                 for row in results
             ]
@@ -323,6 +307,85 @@ class DatabaseManager:
             if not self._external_session:
                 session.close()
 
+    def get_filtered_symbols(
+        self,
+        divergence_min: Optional[float] = None,
+        divergence_max: Optional[float] = None,
+        dividend_yield_min: Optional[float] = None,
+        dividend_yield_max: Optional[float] = None,
+        is_enterprise_only: bool = True,
+        market_filter: Optional[str] = None,
+    ) -> list[str]:
+        """get_filtered_companies と同じ条件に合致する銘柄コードだけを取得する。
+
+        銘柄コードしか使わない呼び出し元のため、企業情報・技術指標の列を読まずに
+        symbol列だけを取得する。引数は get_filtered_companies と同じ。
+        """
+        session = self._get_session()
+        try:
+            query = self._filtered_companies_query(
+                (Company.symbol,),
+                divergence_min=divergence_min,
+                divergence_max=divergence_max,
+                dividend_yield_min=dividend_yield_min,
+                dividend_yield_max=dividend_yield_max,
+                is_enterprise_only=is_enterprise_only,
+                market_filter=market_filter,
+            )
+            return list(session.scalars(query))
+        except Exception as e:
+            logger.error(f"Error getting filtered symbols: {e}")
+            return []
+        finally:
+            if not self._external_session:
+                session.close()
+
+    @staticmethod
+    def _filtered_companies_query(
+        columns: tuple,
+        divergence_min: Optional[float],
+        divergence_max: Optional[float],
+        dividend_yield_min: Optional[float],
+        dividend_yield_max: Optional[float],
+        is_enterprise_only: bool,
+        market_filter: Optional[str],
+    ) -> Select:
+        """各銘柄の最新の技術指標でフィルタし、指定した列を取得するクエリを組み立てる"""
+        # 最新の技術指標はlatest_technical_indicatorsにトリガーで同期されているため、
+        # technical_indicatorsを銘柄ごとに集約せずに主キーで結合するだけでよい
+        query = select(*columns).join(
+            LatestTechnicalIndicator, Company.symbol == LatestTechnicalIndicator.symbol
+        )
+
+        # フィルタ適用
+        if is_enterprise_only:
+            query = query.where(Company.is_enterprise.is_(True))
+
+        if divergence_min is not None:
+            query = query.where(
+                func.abs(LatestTechnicalIndicator.divergence_rate) >= divergence_min
+            )
+
+        if divergence_max is not None:
+            query = query.where(LatestTechnicalIndicator.divergence_rate <= divergence_max)
+
+        if dividend_yield_min is not None:
+            query = query.where(
+                LatestTechnicalIndicator.dividend_yield.isnot(None),
+                LatestTechnicalIndicator.dividend_yield >= dividend_yield_min,
+            )
+
+        if dividend_yield_max is not None:
+            query = query.where(
+                LatestTechnicalIndicator.dividend_yield.isnot(None),
+                LatestTechnicalIndicator.dividend_yield <= dividend_yield_max,
+            )
+
+        if market_filter is not None:
+            query = query.where(Company.market == market_filter)
+
+        return query
+
     # ========== 株価データメソッド ==========
 
     def get_latest_stock_price_date(self, symbol: str) -> Optional[datetime]:
@@ -344,25 +407,21 @@ class DatabaseManager:
     def get_latest_price_dates(self, symbols: list[str]) -> SymbolDateMap:
         """複数銘柄の最新株価日付をまとめて取得"""
         session = self._get_session()
-        latest_dates = {}
         try:
-            results = (
-                session.query(StockPrice.symbol, func.max(StockPrice.date).label("max_date"))
-                .filter(StockPrice.symbol.in_(symbols))
+            results = session.execute(
+                select(StockPrice.symbol, func.max(StockPrice.date))
+                .where(StockPrice.symbol.in_(symbols))
                 .group_by(StockPrice.symbol)
-                .all()
-            )
+            ).all()
 
-            for row in results:
-                # Dateオブジェクトをdatetimeに変換
-                latest_dates[row.symbol] = (
-                    datetime.combine(row.max_date, datetime.min.time()) if row.max_date else None
-                )
-
-            return latest_dates
+            # Dateオブジェクトをdatetimeに変換
+            return {
+                symbol: datetime(max_date.year, max_date.month, max_date.day) if max_date else None
+                for symbol, max_date in results
+            }
         except Exception as e:
             logger.error(f"Error fetching latest price dates for {symbols}: {e}")
-            return latest_dates
+            return {}
         finally:
             if not self._external_session:
                 session.close()
@@ -386,45 +445,142 @@ class DatabaseManager:
             query += " ORDER BY date"
 
             # pandas read_sql（SQLAlchemyエンジン使用）
-            df = pd.read_sql(query, self._engine, params=params)
-
-            if not df.empty:
-                df["date"] = pd.to_datetime(df["date"])
-                df.set_index("date", inplace=True)
-
+            # 日付の変換とインデックス化は読み込み時に行い、DataFrameを作り直さない
+            df: pd.DataFrame = pd.read_sql(
+                query,
+                self._engine,
+                params=params,
+                index_col="date",
+                parse_dates=_DATE_COLUMN_FORMAT,
+            )
             return df
         except Exception as e:
             logger.error(f"Error getting stock prices for {symbol}: {e}")
             return pd.DataFrame()
 
+    def get_stock_prices_arrays(self, symbol: str) -> PriceArrays:
+        """
+        株価データを日付・終値・出来高のNumPy配列として取得
+
+        DataFrameを経由せず必要な列だけを読み込むため、列を取り出して計算するだけの用途に使う。
+
+        Returns:
+            "date"（datetime64[ns]）・"close"・"volume"（float64、欠損はNaN）の日付昇順の配列。
+            株価データがない銘柄は空の配列
+
+        Raises:
+            Exception: DBからの取得に失敗した場合（株価データがない場合と区別するため空の配列にしない）
+        """
+        query = (
+            select(StockPrice.date, StockPrice.close, StockPrice.volume)
+            .where(StockPrice.symbol == symbol)
+            .order_by(StockPrice.date)
+        )
+        try:
+            with self._engine.connect() as conn:
+                rows = conn.execute(query).all()
+        except Exception as e:
+            logger.error(f"Error getting stock price arrays for {symbol}: {e}")
+            raise
+
+        dates, closes, volumes = zip(*rows) if rows else ((), (), ())
+        return {
+            "date": np.array(dates, dtype="datetime64[D]").astype("datetime64[ns]"),
+            "close": np.array(closes, dtype=float),
+            "volume": np.array(volumes, dtype=float),
+        }
+
+    def get_latest_prices_bulk(self, symbols: list[str], n: int = 2) -> pd.DataFrame:
+        """複数銘柄の直近n件の終値を1回のクエリでまとめて取得する。
+
+        Args:
+            symbols: 銘柄コードのリスト
+            n: 銘柄ごとに取得する直近の件数
+
+        Returns:
+            symbol, date, close 列を持つDataFrame（銘柄・日付の昇順）
+        """
+        if not symbols:
+            return pd.DataFrame(columns=["symbol", "date", "close"])
+
+        try:
+            row_number = (
+                func.row_number()
+                .over(partition_by=StockPrice.symbol, order_by=StockPrice.date.desc())
+                .label("rn")
+            )
+            ranked = (
+                select(StockPrice.symbol, StockPrice.date, StockPrice.close, row_number)
+                .where(StockPrice.symbol.in_(symbols))
+                .subquery()
+            )
+            query = (
+                select(ranked.c.symbol, ranked.c.date, ranked.c.close)
+                .where(ranked.c.rn <= n)
+                .order_by(ranked.c.symbol, ranked.c.date)
+            )
+
+            return pd.read_sql(query, self._engine)
+        except Exception as e:
+            logger.error(f"Error getting latest prices for {len(symbols)} symbols: {e}")
+            return pd.DataFrame(columns=["symbol", "date", "close"])
+
     def insert_stock_prices(self, symbol: str, price_data: pd.DataFrame) -> bool:
-        """株価データ挿入（pandas to_sql使用）"""
-        session = self._get_session()
+        """
+        株価データを保存（銘柄・日付ごとのUPSERT）
+
+        取得した期間の行を挿入・更新し、取得した期間より前の既存データは削除する。
+        """
         try:
-            # 既存データ削除（SQLAlchemy）
-            session.query(StockPrice).filter_by(symbol=symbol).delete()
-            session.commit()  # 削除を即座にコミット
-
-            # DataFrameの準備
-            data_copy = price_data.copy()
-            data_copy["symbol"] = symbol
-            # DatetimeIndexを文字列に変換
-            datetime_index = pd.to_datetime(data_copy.index)
-            data_copy.index = datetime_index.strftime("%Y-%m-%d")
-            data_copy.reset_index(inplace=True)
-            data_copy.rename(columns={"index": "date"}, inplace=True)
-
-            # pandas to_sql（SQLAlchemyエンジン使用）
-            data_copy.to_sql("stock_prices", self._engine, if_exists="append", index=False)
+            with self._engine.begin() as conn:
+                self._upsert_daily_rows(conn, StockPrice, symbol, price_data)
 
             return True
         except Exception as e:
             logger.error(f"Error inserting stock prices for {symbol}: {e}")
-            session.rollback()
             return False
-        finally:
-            if not self._external_session:
-                session.close()
+
+    @staticmethod
+    def _upsert_daily_rows(
+        conn: Connection,
+        model: Union[type[StockPrice], type[TechnicalIndicator]],
+        symbol: str,
+        data: pd.DataFrame,
+    ) -> None:
+        """
+        DatetimeIndexの日付ごとの行を、(symbol, date) の主キーでUPSERT
+
+        data のうちテーブルにある列だけを保存し、既存行はそれらの列だけを上書きする。
+        1つのINSERT ... ON CONFLICT DO UPDATE 文をexecutemanyで全行に適用する。
+        data の最古の日付より前の既存行は削除し、保存する期間を data の期間にそろえる
+        （株式分割などで遡って調整された値と、調整前の古い値が混ざらないようにする）。
+        """
+        if data.empty:
+            return
+
+        dates = pd.to_datetime(data.index).date
+        conn.execute(delete(model).where(model.symbol == symbol, model.date < min(dates)))
+
+        columns = [
+            column.name
+            for column in model.__table__.columns
+            if column.name in data.columns and column.name not in ("symbol", "date")
+        ]
+        values = data[columns]
+        # 欠損値はNULLとして保存し、NumPyの数値はPythonの値に変換する
+        records = values.astype(object).replace({np.nan: None})
+        records.insert(0, "date", dates)
+        records.insert(0, "symbol", symbol)
+
+        stmt = sqlite_insert(model)
+        if columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[model.symbol, model.date],
+                set_={column: stmt.excluded[column] for column in columns},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[model.symbol, model.date])
+        conn.execute(stmt, cast(list[dict[str, Any]], records.to_dict(orient="records")))
 
     # ========== テクニカル指標メソッド ==========
 
@@ -447,45 +603,107 @@ class DatabaseManager:
             query += " ORDER BY date"
 
             # pandas read_sql（SQLAlchemyエンジン使用）
-            df = pd.read_sql(query, self._engine, params=params)
-
-            if not df.empty:
-                df["date"] = pd.to_datetime(df["date"])
-                df.set_index("date", inplace=True)
-
+            # 日付の変換とインデックス化は読み込み時に行い、DataFrameを作り直さない
+            df: pd.DataFrame = pd.read_sql(
+                query,
+                self._engine,
+                params=params,
+                index_col="date",
+                parse_dates=_DATE_COLUMN_FORMAT,
+            )
             return df
         except Exception as e:
             logger.error(f"Error getting technical indicators for {symbol}: {e}")
             return pd.DataFrame()
 
-    def insert_technical_indicators(self, symbol: str, indicators_data: pd.DataFrame) -> bool:
-        """テクニカル指標挿入（pandas to_sql使用）"""
+    def get_latest_technical_indicator(self, symbol: str) -> Optional[dict]:
+        """指定された銘柄の保存済みテクニカル指標のうち最新日の値を取得"""
         session = self._get_session()
         try:
-            # 既存データ削除（SQLAlchemy）
-            session.query(TechnicalIndicator).filter_by(symbol=symbol).delete()
-            session.commit()  # 削除を即座にコミット
-
-            # DataFrameの準備
-            data_copy = indicators_data.copy()
-            data_copy["symbol"] = symbol
-            # DatetimeIndexを文字列に変換
-            datetime_index = pd.to_datetime(data_copy.index)
-            data_copy.index = datetime_index.strftime("%Y-%m-%d")
-            data_copy.reset_index(inplace=True)
-            data_copy.rename(columns={"index": "date"}, inplace=True)
-
-            # pandas to_sql（SQLAlchemyエンジン使用）
-            data_copy.to_sql("technical_indicators", self._engine, if_exists="append", index=False)
+            row = session.execute(
+                select(TechnicalIndicator.date, TechnicalIndicator.ma_25)
+                .where(TechnicalIndicator.symbol == symbol)
+                .order_by(TechnicalIndicator.date.desc())
+                .limit(1)
+            ).first()
+            if row is None:
+                return None
+            return {
+                "date": datetime.combine(row.date, datetime.min.time()),
+                "ma_25": float(row.ma_25) if row.ma_25 is not None else None,
+            }
+        except Exception as e:
+            logger.error(f"Error fetching latest technical indicator for {symbol}: {e}")
+            return None
+        finally:
+            if not self._external_session:
+                session.close()
+
+    def insert_technical_indicators(self, symbol: str, indicators_data: pd.DataFrame) -> bool:
+        """
+        テクニカル指標を保存（銘柄・日付ごとのUPSERT）
+
+        指標のある期間の行を挿入・更新し、その期間より前の既存データは削除する。
+        """
+        try:
+            with self._engine.begin() as conn:
+                self._upsert_daily_rows(conn, TechnicalIndicator, symbol, indicators_data)
 
             return True
         except Exception as e:
             logger.error(f"Error inserting technical indicators for {symbol}: {e}")
-            session.rollback()
             return False
-        finally:
-            if not self._external_session:
-                session.close()
+
+    def insert_technical_indicators_bulk(self, writes: list[TechnicalIndicatorWrite]) -> bool:
+        """
+        複数銘柄のテクニカル指標を1トランザクションでまとめて保存（pandas to_sql使用）
+
+        oldest_date がない銘柄は既存データをすべて置き換える。ある銘柄は indicators の期間と
+        oldest_date より前（株価データの保持期間外）の既存行だけを置き換え、それ以外は残す。
+        """
+        if not writes:
+            return True
+
+        try:
+            with self._engine.begin() as conn:
+                for write in writes:
+                    condition = TechnicalIndicator.symbol == write.symbol
+                    if write.oldest_date is not None:
+                        condition &= or_(
+                            TechnicalIndicator.date < write.oldest_date.date(),
+                            TechnicalIndicator.date
+                            >= pd.Timestamp(write.indicators.index[0]).date(),
+                        )
+                    conn.execute(delete(TechnicalIndicator).where(condition))
+
+                records = pd.concat(
+                    [
+                        self._to_technical_indicator_records(write.symbol, write.indicators)
+                        for write in writes
+                    ],
+                    ignore_index=True,
+                )
+                # pandas to_sql（executemanyで一括挿入）
+                records.to_sql("technical_indicators", conn, if_exists="append", index=False)
+
+            return True
+        except Exception as e:
+            logger.error(f"Error bulk inserting technical indicators ({len(writes)} symbols): {e}")
+            return False
+
+    def _to_technical_indicator_records(
+        self, symbol: str, indicators_data: pd.DataFrame
+    ) -> pd.DataFrame:
+        """テクニカル指標をテーブルの列構成に変換"""
+        # DataFrameの準備
+        data_copy = indicators_data.copy()
+        data_copy["symbol"] = symbol
+        # DatetimeIndexを文字列に変換
+        datetime_index = pd.to_datetime(data_copy.index)
+        data_copy.index = datetime_index.strftime("%Y-%m-%d")
+        data_copy.reset_index(inplace=True)
+        data_copy.rename(columns={"index": "date"}, inplace=True)
+        return data_copy
 
     # ========== ティッカー情報メソッド ==========
 
@@ -495,57 +713,7 @@ class DatabaseManager:
         try:
             ticker = session.query(TickerInfo).filter_by(symbol=symbol).first()
             if ticker:
-                return {
-                    "symbol": ticker.symbol,
-                    "industry": ticker.industry,
-                    "sector": ticker.sector,
-                    "full_time_employees": ticker.full_time_employees,
-                    "market_cap": ticker.market_cap,
-                    "current_price": float(ticker.current_price) if ticker.current_price else None,
-                    "dividend_yield": float(ticker.dividend_yield)
-                    if ticker.dividend_yield
-                    else None,
-                    "dividend_rate": float(ticker.dividend_rate) if ticker.dividend_rate else None,
-                    "trailing_annual_dividend_rate": float(ticker.trailing_annual_dividend_rate)
-                    if ticker.trailing_annual_dividend_rate
-                    else None,
-                    "ex_dividend_date": ticker.ex_dividend_date.isoformat()
-                    if ticker.ex_dividend_date
-                    else None,
-                    "trailing_pe": float(ticker.trailing_pe) if ticker.trailing_pe else None,
-                    "forward_pe": float(ticker.forward_pe) if ticker.forward_pe else None,
-                    "price_to_book": float(ticker.price_to_book) if ticker.price_to_book else None,
-                    "debt_to_equity": float(ticker.debt_to_equity)
-                    if ticker.debt_to_equity
-                    else None,
-                    "return_on_equity": float(ticker.return_on_equity)
-                    if ticker.return_on_equity
-                    else None,
-                    "return_on_assets": float(ticker.return_on_assets)
-                    if ticker.return_on_assets
-                    else None,
-                    "total_revenue": ticker.total_revenue,
-                    "earnings_growth": float(ticker.earnings_growth)
-                    if ticker.earnings_growth
-                    else None,
-                    "revenue_growth": float(ticker.revenue_growth)
-                    if ticker.revenue_growth
-                    else None,
-                    "profit_margins": float(ticker.profit_margins)
-                    if ticker.profit_margins
-                    else None,
-                    "fifty_two_week_high": float(ticker.fifty_two_week_high)
-                    if ticker.fifty_two_week_high
-                    else None,
-                    "fifty_two_week_low": float(ticker.fifty_two_week_low)
-                    if ticker.fifty_two_week_low
-                    else None,
-                    "average_volume": ticker.average_volume,
-                    "corporate_actions_dividend": ticker.corporate_actions_dividend,
-                    "last_updated": ticker.last_updated.isoformat()
-                    if ticker.last_updated
-                    else None,
-                }
+                return self._ticker_info_to_dict(ticker)
             return None
         except Exception as e:
             logger.error(f"Error getting ticker info for {symbol}: {e}")
@@ -554,6 +722,60 @@ class DatabaseManager:
             if not self._external_session:
                 session.close()
 
+    def get_ticker_info_bulk(self, symbols: list[str]) -> dict[str, dict]:
+        """複数銘柄のティッカー情報をまとめて取得（情報がない銘柄は含まない）"""
+        session = self._get_session()
+        ticker_infos: dict[str, dict] = {}
+        try:
+            for ticker in session.query(TickerInfo).filter(TickerInfo.symbol.in_(symbols)):
+                ticker_infos[ticker.symbol] = self._ticker_info_to_dict(ticker)
+            return ticker_infos
+        except Exception as e:
+            logger.error(f"Error getting ticker info for {len(symbols)} symbols: {e}")
+            return ticker_infos
+        finally:
+            if not self._external_session:
+                session.close()
+
+    @staticmethod
+    def _ticker_info_to_dict(ticker: TickerInfo) -> dict:
+        """TickerInfoを辞書に変換"""
+        return {
+            "symbol": ticker.symbol,
+            "industry": ticker.industry,
+            "sector": ticker.sector,
+            "full_time_employees": ticker.full_time_employees,
+            "market_cap": ticker.market_cap,
+            "current_price": float(ticker.current_price) if ticker.current_price else None,
+            "dividend_yield": float(ticker.dividend_yield) if ticker.dividend_yield else None,
+            "dividend_rate": float(ticker.dividend_rate) if ticker.dividend_rate else None,
+            "trailing_annual_dividend_rate": float(ticker.trailing_annual_dividend_rate)
+            if ticker.trailing_annual_dividend_rate
+            else None,
+            "ex_dividend_date": ticker.ex_dividend_date.isoformat()
+            if ticker.ex_dividend_date
+            else None,
+            "trailing_pe": float(ticker.trailing_pe) if ticker.trailing_pe else None,
+            "forward_pe": float(ticker.forward_pe) if ticker.forward_pe else None,
+            "price_to_book": float(ticker.price_to_book) if ticker.price_to_book else None,
+            "debt_to_equity": float(ticker.debt_to_equity) if ticker.debt_to_equity else None,
+            "return_on_equity": float(ticker.return_on_equity) if ticker.return_on_equity else None,
+            "return_on_assets": float(ticker.return_on_assets) if ticker.return_on_assets else None,
+            "total_revenue": ticker.total_revenue,
+            "earnings_growth": float(ticker.earnings_growth) if ticker.earnings_growth else None,
+            "revenue_growth": float(ticker.revenue_growth) if ticker.revenue_growth else None,
+            "profit_margins": float(ticker.profit_margins) if ticker.profit_margins else None,
+            "fifty_two_week_high": float(ticker.fifty_two_week_high)
+            if ticker.fifty_two_week_high
+            else None,
+            "fifty_two_week_low": float(ticker.fifty_two_week_low)
+            if ticker.fifty_two_week_low
+            else None,
+            "average_volume": ticker.average_volume,
+            "corporate_actions_dividend": ticker.corporate_actions_dividend,
+            "last_updated": ticker.last_updated.isoformat() if ticker.last_updated else None,
+        }
+
     def get_latest_ticker_info_date(self, symbol: str) -> Optional[datetime]:
         """指定された銘柄の最新ticker_info更新日を取得"""
         session = self._get_session()
@@ -572,21 +794,15 @@ class DatabaseManager:
     def get_latest_ticker_info_dates(self, symbols: list[str]) -> SymbolDateMap:
         """指定された銘柄のticker_infoの最終更新日を取得"""
         session = self._get_session()
-        latest_dates = {}
         try:
-            results = (
-                session.query(TickerInfo.symbol, TickerInfo.last_updated)
-                .filter(TickerInfo.symbol.in_(symbols))
-                .all()
+            stmt = select(TickerInfo.symbol, TickerInfo.last_updated).where(
+                TickerInfo.symbol.in_(symbols)
             )
-
-            for row in results:
-                latest_dates[row.symbol] = row.last_updated
-
-            return latest_dates
+            # (symbol, last_updated) の行をそのまま辞書にする
+            return dict(session.execute(stmt).tuples().all())
         except Exception as e:
             logger.error(f"Error fetching latest ticker info dates for {symbols}: {e}")
-            return latest_dates
+            return {}
         finally:
             if not self._external_session:
                 session.close()
@@ -595,7 +811,7 @@ class DatabaseManager:
         """ティッカー情報をデータベースに保存（UPSERT）"""
         session = self._get_session()
         try:
-            # corporateActionsの配当情報を抽出
+            # corporateActionsの配当情報を抽出（JSON列にリストのまま保存する）
             dividend_actions = []
             if "corporateActions" in ticker_info:
                 for action in ticker_info["corporateActions"]:
@@ -634,9 +850,7 @@ class DatabaseManager:
                 existing.fifty_two_week_high = ticker_info.get("fiftyTwoWeekHigh")
                 existing.fifty_two_week_low = ticker_info.get("fiftyTwoWeekLow")
                 existing.average_volume = ticker_info.get("averageVolume")
-                existing.corporate_actions_dividend = (
-                    str(dividend_actions) if dividend_actions else None
-                )
+                existing.corporate_actions_dividend = dividend_actions or None
                 existing.last_updated = datetime.now()
             else:
                 # INSERT
@@ -666,7 +880,7 @@ class DatabaseManager:
                     fifty_two_week_high=ticker_info.get("fiftyTwoWeekHigh"),
                     fifty_two_week_low=ticker_info.get("fiftyTwoWeekLow"),
                     average_volume=ticker_info.get("averageVolume"),
-                    corporate_actions_dividend=str(dividend_actions) if dividend_actions else None,
+                    corporate_actions_dividend=dividend_actions or None,
                     last_updated=datetime.now(),
                 )
                 session.add(new_ticker)
@@ -687,16 +901,15 @@ class DatabaseManager:
         try:
             threshold_date = datetime.now() - timedelta(days=days_old)
 
-            results = (
-                session.query(Company.symbol)
+            stmt = (
+                select(Company.symbol)
                 .outerjoin(TickerInfo, Company.symbol == TickerInfo.symbol)
-                .filter(
+                .where(
                     or_(TickerInfo.last_updated.is_(None), TickerInfo.last_updated < threshold_date)
                 )
-                .all()
             )
 
-            return [row.symbol for row in results]
+            return list(session.scalars(stmt))
         except Exception as e:
             logger.error(f"Error getting symbols needing ticker update: {e}")
             return []
@@ -733,11 +946,33 @@ class DatabaseManager:
     def get_database_stats(self, market_filter: Optional[str] = None) -> dict:
         """データベース統計情報を取得。
 
+        集計結果は市場フィルタごとに DATABASE_STATS_CACHE_TTL_SECONDS の間インスタンスに保持し、
+        その間の呼び出しでは集計しない（取得に失敗した結果は保持しない）。
+
         Args:
             market_filter: 市場区分でフィルタ（例: "prime", "standard", "growth"）
         """
+        cached = self._stats_cache.get(market_filter)
+        if cached is not None and cached[0] > time.monotonic():
+            return dict(cached[1])
+
+        stats = self._query_database_stats(market_filter)
+        if stats:
+            self._stats_cache[market_filter] = (
+                time.monotonic() + DATABASE_STATS_CACHE_TTL_SECONDS,
+                stats,
+            )
+        return dict(stats)
+
+    def _query_database_stats(self, market_filter: Optional[str]) -> dict:
+        """データベース統計情報を集計"""
         session = self._get_session()
         try:
+            # 価格のある銘柄数と最新の価格日付は、stock_pricesの1回の走査でまとめて集計する
+            query = session.query(
+                func.count(func.distinct(StockPrice.symbol)), func.max(StockPrice.date)
+            )
+
             # 市場フィルタ適用の有無でクエリを分岐
             if market_filter:
                 # 市場名をデータベースの日本語表記に変換
@@ -747,24 +982,9 @@ class DatabaseManager:
                 market_symbols_subq = session.query(Company.symbol).filter(
                     Company.market == actual_market
                 )
+                query = query.filter(StockPrice.symbol.in_(market_symbols_subq))
 
-                symbols_with_prices = (
-                    session.query(func.count(func.distinct(StockPrice.symbol)))
-                    .filter(StockPrice.symbol.in_(market_symbols_subq))
-                    .scalar()
-                )
-
-                latest_price_date = (
-                    session.query(func.max(StockPrice.date))
-                    .filter(StockPrice.symbol.in_(market_symbols_subq))
-                    .scalar()
-                )
-            else:
-                symbols_with_prices = session.query(
-                    func.count(func.distinct(StockPrice.symbol))
-                ).scalar()
-
-                latest_price_date = session.query(func.max(StockPrice.date)).scalar()
+            symbols_with_prices, latest_price_date = query.one()
 
             return {
                 "symbols_with_prices": symbols_with_prices or 0,
@@ -777,3 +997,21 @@ class DatabaseManager:
         finally:
             if not self._external_session:
                 session.close()
+
+
+_db_manager: Optional[DatabaseManager] = None
+
+
+def get_db_manager() -> DatabaseManager:
+    """プロセス内で共有するDatabaseManagerを取得する
+
+    エンジン（コネクションプール）はモジュール単位で共有されているため、
+    サービスごとにインスタンスを生成せず使い回す。
+
+    Returns:
+        共有のDatabaseManagerインスタンス
+    """
+    global _db_manager
+    if _db_manager is None:
+        _db_manager = DatabaseManager()
+    return _db_manager
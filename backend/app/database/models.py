@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from sqlalchemy import (
+    DDL,
     DECIMAL,
     JSON,
     BigInteger,
@@ -18,6 +19,7 @@ from sqlalchemy import (
     Integer,
     String,
     UniqueConstraint,
+    event,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -110,6 +112,35 @@ class Company(Base):
     last_updated: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
 
+# 銘柄コード・銘柄名の部分一致検索用のFTS5（trigram）インデックス。
+# companiesの変更はトリガーで同期する（Alembicマイグレーションと同じ定義）
+COMPANIES_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS companies_fts USING fts5("
+    "symbol, name, content='companies', content_rowid='rowid', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS companies_fts_ai AFTER INSERT ON companies BEGIN "
+    "INSERT INTO companies_fts(rowid, symbol, name) VALUES (new.rowid, new.symbol, new.name); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS companies_fts_ad AFTER DELETE ON companies BEGIN "
+    "INSERT INTO companies_fts(companies_fts, rowid, symbol, name) "
+    "VALUES ('delete', old.rowid, old.symbol, old.name); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS companies_fts_au AFTER UPDATE ON companies BEGIN "
+    "INSERT INTO companies_fts(companies_fts, rowid, symbol, name) "
+    "VALUES ('delete', old.rowid, old.symbol, old.name); "
+    "INSERT INTO companies_fts(rowid, symbol, name) VALUES (new.rowid, new.symbol, new.name); "
+    "END",
+    "INSERT INTO companies_fts(companies_fts) VALUES ('rebuild')",
+)
+
+for _statement in COMPANIES_FTS_DDL:
+    event.listen(Company.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Company.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS companies_fts").execute_if(dialect="sqlite"),
+)
+
+
 class StockPrice(Base):
     """株価データテーブル"""
 
@@ -119,15 +150,57 @@ class StockPrice(Base):
         String(10), ForeignKey("companies.symbol"), primary_key=True
     )
     date: Mapped[datetime] = mapped_column(Date, primary_key=True)
-    open: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2), nullable=True)
-    high: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2), nullable=True)
-    low: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2), nullable=True)
-    close: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2), nullable=True)
+    # 株価は分析・表示にしか使わないため、取得時にDecimalへ変換せずSQLiteの数値のまま返す
+    open: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2, asdecimal=False), nullable=True)
+    high: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2, asdecimal=False), nullable=True)
+    low: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2, asdecimal=False), nullable=True)
+    close: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2, asdecimal=False), nullable=True)
     volume: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
 
     __table_args__ = (Index("idx_stock_prices_symbol_date", "symbol", "date"),)
 
 
+class LatestPrice(Base):
+    """銘柄ごとの最新株価テーブル（stock_pricesのトリガーで更新する）"""
+
+    __tablename__ = "latest_prices"
+
+    symbol: Mapped[str] = mapped_column(
+        String(10), ForeignKey("companies.symbol"), primary_key=True
+    )
+    date: Mapped[datetime] = mapped_column(Date, nullable=False)
+    close: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2, asdecimal=False), nullable=True)
+
+
+def _latest_price_refresh(row: str) -> str:
+    """トリガー内で、銘柄の最新株価をstock_pricesから取り直すSQL"""
+    return (
+        f"DELETE FROM latest_prices WHERE symbol = {row}.symbol; "
+        "INSERT INTO latest_prices(symbol, date, close) "
+        f"SELECT symbol, date, close FROM stock_prices WHERE symbol = {row}.symbol "
+        "ORDER BY date DESC LIMIT 1; "
+    )
+
+
+# 最新株価は、株価の追加・変更・削除時にトリガーで同期する（Alembicマイグレーションと同じ定義）
+# pandasのto_sqlなどORMを経由しない書き込みでもずれないよう、DB側で更新する
+STOCK_PRICES_LATEST_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS stock_prices_latest_ai AFTER INSERT ON stock_prices "
+    "WHEN new.date >= COALESCE((SELECT date FROM latest_prices WHERE symbol = new.symbol), new.date) "
+    "BEGIN " + _latest_price_refresh("new") + "END",
+    "CREATE TRIGGER IF NOT EXISTS stock_prices_latest_ad AFTER DELETE ON stock_prices "
+    "WHEN old.date >= (SELECT date FROM latest_prices WHERE symbol = old.symbol) "
+    "BEGIN " + _latest_price_refresh("old") + "END",
+    "CREATE TRIGGER IF NOT EXISTS stock_prices_latest_au AFTER UPDATE ON stock_prices "
+    "WHEN old.date >= COALESCE((SELECT date FROM latest_prices WHERE symbol = old.symbol), old.date) "
+    "OR new.date >= COALESCE((SELECT date FROM latest_prices WHERE symbol = new.symbol), new.date) "
+    "BEGIN " + _latest_price_refresh("old") + _latest_price_refresh("new") + "END",
+)
+
+for _statement in STOCK_PRICES_LATEST_DDL:
+    event.listen(StockPrice.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
 class TechnicalIndicator(Base):
     """テクニカル指標テーブル"""
 
@@ -137,12 +210,76 @@ class TechnicalIndicator(Base):
         String(10), ForeignKey("companies.symbol"), primary_key=True
     )
     date: Mapped[datetime] = mapped_column(Date, primary_key=True)
-    ma_25: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2), nullable=True)
-    divergence_rate: Mapped[Optional[float]] = mapped_column(DECIMAL(5, 2), nullable=True)
-    dividend_yield: Mapped[Optional[float]] = mapped_column(DECIMAL(5, 2), nullable=True)
+    # 指標はNumPyでの計算・表示にしか使わないため、株価と同じくDecimalへ変換しない
+    ma_25: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2, asdecimal=False), nullable=True)
+    divergence_rate: Mapped[Optional[float]] = mapped_column(
+        DECIMAL(5, 2, asdecimal=False), nullable=True
+    )
+    dividend_yield: Mapped[Optional[float]] = mapped_column(
+        DECIMAL(5, 2, asdecimal=False), nullable=True
+    )
     volume_avg_20: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
 
-    __table_args__ = (Index("idx_technical_indicators_symbol_date", "symbol", "date"),)
+
+class LatestTechnicalIndicator(Base):
+    """銘柄ごとの最新テクニカル指標テーブル（technical_indicatorsのトリガーで更新する）"""
+
+    __tablename__ = "latest_technical_indicators"
+
+    symbol: Mapped[str] = mapped_column(
+        String(10), ForeignKey("companies.symbol"), primary_key=True
+    )
+    date: Mapped[datetime] = mapped_column(Date, nullable=False)
+    ma_25: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2, asdecimal=False), nullable=True)
+    divergence_rate: Mapped[Optional[float]] = mapped_column(
+        DECIMAL(5, 2, asdecimal=False), nullable=True
+    )
+    dividend_yield: Mapped[Optional[float]] = mapped_column(
+        DECIMAL(5, 2, asdecimal=False), nullable=True
+    )
+
+    # 投資候補の抽出で、乖離率の上限・配当利回りの範囲をインデックスで絞り込む
+    __table_args__ = (
+        Index("idx_latest_technical_indicators_screen", "divergence_rate", "dividend_yield"),
+    )
+
+
+def _latest_indicator_refresh(row: str) -> str:
+    """トリガー内で、銘柄の最新テクニカル指標をtechnical_indicatorsから取り直すSQL"""
+    return (
+        f"DELETE FROM latest_technical_indicators WHERE symbol = {row}.symbol; "
+        "INSERT INTO latest_technical_indicators"
+        "(symbol, date, ma_25, divergence_rate, dividend_yield) "
+        "SELECT symbol, date, ma_25, divergence_rate, dividend_yield FROM technical_indicators "
+        f"WHERE symbol = {row}.symbol ORDER BY date DESC LIMIT 1; "
+    )
+
+
+# 最新テクニカル指標も最新株価と同じく、指標の追加・変更・削除時にトリガーで同期する
+# （Alembicマイグレーションと同じ定義）
+TECHNICAL_INDICATORS_LATEST_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS technical_indicators_latest_ai "
+    "AFTER INSERT ON technical_indicators "
+    "WHEN new.date >= COALESCE("
+    "(SELECT date FROM latest_technical_indicators WHERE symbol = new.symbol), new.date) "
+    "BEGIN " + _latest_indicator_refresh("new") + "END",
+    "CREATE TRIGGER IF NOT EXISTS technical_indicators_latest_ad "
+    "AFTER DELETE ON technical_indicators "
+    "WHEN old.date >= (SELECT date FROM latest_technical_indicators WHERE symbol = old.symbol) "
+    "BEGIN " + _latest_indicator_refresh("old") + "END",
+    "CREATE TRIGGER IF NOT EXISTS technical_indicators_latest_au "
+    "AFTER UPDATE ON technical_indicators "
+    "WHEN old.date >= COALESCE("
+    "(SELECT date FROM latest_technical_indicators WHERE symbol = old.symbol), old.date) "
+    "OR new.date >= COALESCE("
+    "(SELECT date FROM latest_technical_indicators WHERE symbol = new.symbol), new.date) "
+    "BEGIN " + _latest_indicator_refresh("old") + _latest_indicator_refresh("new") + "END",
+)
+
+for _statement in TECHNICAL_INDICATORS_LATEST_DDL:
+    event.listen(
+        TechnicalIndicator.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
 
 
 class TickerInfo(Base):
@@ -177,7 +314,7 @@ class TickerInfo(Base):
     fifty_two_week_high: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2), nullable=True)
     fifty_two_week_low: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2), nullable=True)
     average_volume: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
-    corporate_actions_dividend: Mapped[Optional[str]] = mapped_column(JSON, nullable=True)
+    corporate_actions_dividend: Mapped[Optional[list[dict]]] = mapped_column(JSON, nullable=True)
     last_updated: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     __table_args__ = (
@@ -198,6 +335,19 @@ class Portfolio(Base):
     initial_capital: Mapped[float] = mapped_column(
         DECIMAL(15, 2), nullable=False, server_default="1000000.00"
     )
+    # 取引種別ごとの合計額（transactionsのトリガーで更新する集計値）
+    total_buy_amount: Mapped[float] = mapped_column(
+        DECIMAL(15, 2), nullable=False, server_default="0.00"
+    )
+    total_sell_amount: Mapped[float] = mapped_column(
+        DECIMAL(15, 2), nullable=False, server_default="0.00"
+    )
+    total_deposit: Mapped[float] = mapped_column(
+        DECIMAL(15, 2), nullable=False, server_default="0.00"
+    )
+    total_withdrawal: Mapped[float] = mapped_column(
+        DECIMAL(15, 2), nullable=False, server_default="0.00"
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
     )
@@ -279,6 +429,55 @@ class Transaction(Base):
         Index("idx_transactions_symbol", "symbol"),
         Index("idx_transactions_date", "transaction_date"),
         Index("idx_transactions_portfolio_date", "portfolio_id", "transaction_date"),
+        # 取引種別で絞り込んだ取引履歴を、日付の降順にソートせずに読み出す
+        Index(
+            "idx_transactions_portfolio_type_date",
+            "portfolio_id",
+            "transaction_type",
+            "transaction_date",
+        ),
+    )
+
+
+# 取引種別 → portfolios の合計額の列
+# PORTFOLIO_TOTAL_COLUMNS と _portfolio_totals_update は、マイグレーション 3f6a1c8d2b7e の
+# TOTAL_COLUMNS / _totals_update と同じ定義にすること（トリガーを変える場合は両方を揃える）
+PORTFOLIO_TOTAL_COLUMNS = {
+    "buy": "total_buy_amount",
+    "sell": "total_sell_amount",
+    "deposit": "total_deposit",
+    "withdrawal": "total_withdrawal",
+}
+
+
+def _portfolio_totals_update(row: str, operator: str) -> str:
+    """トリガー内で、取引の金額をポートフォリオの種別ごとの合計額に加算（減算）するSQL"""
+    assignments = ", ".join(
+        f"{column} = {column} {operator} "
+        f"CASE {row}.transaction_type WHEN '{transaction_type}' THEN {row}.total_amount ELSE 0 END"
+        for transaction_type, column in PORTFOLIO_TOTAL_COLUMNS.items()
+    )
+    return f"UPDATE portfolios SET {assignments} WHERE id = {row}.portfolio_id; "
+
+
+# ポートフォリオの合計額は、取引の追加・変更・削除時にトリガーで同期する
+# （Alembicマイグレーションと同じ定義。取引の登録経路に関わらず集計値がずれない）
+TRANSACTION_TOTALS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS transactions_totals_ai AFTER INSERT ON transactions BEGIN "
+    + _portfolio_totals_update("new", "+")
+    + "END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_totals_ad AFTER DELETE ON transactions BEGIN "
+    + _portfolio_totals_update("old", "-")
+    + "END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_totals_au AFTER UPDATE ON transactions BEGIN "
+    + _portfolio_totals_update("old", "-")
+    + _portfolio_totals_update("new", "+")
+    + "END",
+)
+
+for _statement in TRANSACTION_TOTALS_DDL:
+    event.listen(
+        Transaction.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
     )
 
 
@@ -303,6 +502,7 @@ class AIStockAnalysis(Base):
     )
     analysis_text: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    prompt_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
     )
@@ -311,6 +511,7 @@ class AIStockAnalysis(Base):
     __table_args__ = (
         Index("idx_ai_analyses_user_symbol", "user_id", "symbol"),
         Index("idx_ai_analyses_status", "status"),
+        Index("idx_ai_analyses_prompt_hash", "prompt_hash"),
     )
 
 
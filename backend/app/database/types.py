@@ -1,7 +1,10 @@
 """データベース関連の型定義"""
 
 from datetime import datetime
-from typing import Optional
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
 
 # 銘柄ごとの最新日付マップ
 SymbolDateMap = dict[str, Optional[datetime]]
@@ -11,3 +14,15 @@ CompanyDict = dict[str, str | int | float | bool | None]
 
 # 分析結果辞書（オプショナル）
 AnalysisResultMap = dict[str, Optional[dict]]
+
+# 列名 → NumPy配列（株価の日付・終値・出来高など）
+PriceArrays = dict[str, np.ndarray]
+
+
+class TechnicalIndicatorWrite(NamedTuple):
+    """1銘柄分のテクニカル指標の保存内容"""
+
+    symbol: str
+    indicators: pd.DataFrame
+    # 差分更新時の株価データ保持期間の開始日（Noneの場合は全期間を置き換える）
+    oldest_date: Optional[datetime] = None
@@ -4,22 +4,88 @@ Claude APIを使用して銘柄の詳細分析を実行する。
 """
 
 import asyncio
+import hashlib
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.config.settings import AI_ANALYSIS_DATA_DAYS, AI_ANALYSIS_TIMEOUT_SECONDS
+from app.config.settings import (
+    AI_ANALYSIS_DATA_DAYS,
+    AI_ANALYSIS_REUSE_HOURS,
+    AI_ANALYSIS_TIMEOUT_SECONDS,
+)
 from app.database.database_manager import DatabaseManager
 from app.database.models import AIStockAnalysis, Company, StockPrice, TechnicalIndicator
 from app.database.session import SessionLocal
-from app.services.claude_service import ClaudeAPIError, ClaudeService
+from app.services.claude_service import ClaudeAPIError, get_claude_service
 
 logger = logging.getLogger(__name__)
 
 
+# プロンプトの固定部分（銘柄に依存しないため一度だけ組み立てる）
+_PROMPT_HEADER = (
+    "あなたは日本株の投資分析専門家です。以下の銘柄について、詳細な分析を行ってください。\n"
+)
+_PROMPT_INSTRUCTIONS = f"""
+
+【分析指示】
+以下の形式で詳細な分析を提供してください：
+
+## 株価動向分析（過去{AI_ANALYSIS_DATA_DAYS}日）
+
+**価格推移:**
+- {AI_ANALYSIS_DATA_DAYS}日前、現在、最高値、最安値を明記
+- 主要な変動要因を3つ挙げる
+
+**テクニカル指標:**
+- 移動平均からの乖離、配当利回りの評価
+- 売られすぎ/買われすぎの判断
+
+## 投資判断
+
+**1ヶ月:** 買い推奨度 ★☆☆☆☆〜★★★★★（5段階評価）
+短期的な見通しと根拠
+
+**3ヶ月:** 買い推奨度 ★☆☆☆☆〜★★★★★（5段階評価）
+中期的な見通しと根拠
+
+**1年:** 買い推奨度 ★☆☆☆☆〜★★★★★（5段階評価）
+長期的な見通しと根拠
+
+**それ以上:** 買い推奨度 ★☆☆☆☆〜★★★★★（5段階評価）
+超長期的な見通しと根拠
+
+**総評:**
+総合的な投資判断（2-3文）
+
+注意: 株価の下落理由については、一般的な市場動向や業界トレンドに基づいて推測してください。
+"""
+
+
+def compute_prompt_hash(prompt: str) -> str:
+    """プロンプトのハッシュ値を計算する
+
+    Args:
+        prompt: プロンプト
+
+    Returns:
+        32文字の16進ハッシュ文字列
+    """
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CompanyView(NamedTuple):
+    """分析プロンプト構築用の企業情報（読み取り専用）"""
+
+    symbol: str
+    name: Optional[str]
+    sector: Optional[str]
+    market: Optional[str]
+
+
 class AIStockAnalysisService:
     """AI株価分析サービスクラス"""
 
@@ -30,10 +96,14 @@ class AIStockAnalysisService:
             db_manager: データベースマネージャー
         """
         self.db_manager = db_manager
-        self.claude_service = ClaudeService()
+        self.claude_service = get_claude_service()
 
     def get_stock_data_for_analysis(
-        self, session: Session, symbol: str, days: int = AI_ANALYSIS_DATA_DAYS
+        self,
+        session: Session,
+        symbol: str,
+        days: int = AI_ANALYSIS_DATA_DAYS,
+        now: Optional[datetime] = None,
     ) -> dict[str, Any]:
         """分析用の株価データを取得する
 
@@ -41,36 +111,47 @@ class AIStockAnalysisService:
             session: データベースセッション
             symbol: 銘柄コード
             days: データ取得日数
+            now: 基準時刻（省略時は現在時刻。複数処理で共有する場合に指定）
 
         Returns:
-            株価データと企業情報を含む辞書
+            株価データと企業情報を含む辞書。ORMオブジェクトではなく
+            CompanyView と Row（列アクセス可能なタプル）で返す
 
         Raises:
             ValueError: 銘柄が見つからない場合
         """
         logger.debug("株価データを取得します (symbol=%s, days=%d)", symbol, days)
 
-        # 企業情報を取得
-        company = session.scalar(select(Company).where(Company.symbol == symbol))
-        if not company:
+        # 企業情報を取得（ORMオブジェクトを生成せず必要な列のみ取得）
+        company_row = session.execute(
+            select(Company.symbol, Company.name, Company.sector, Company.market).where(
+                Company.symbol == symbol
+            )
+        ).one_or_none()
+        if not company_row:
             logger.warning("銘柄が見つかりません (symbol=%s)", symbol)
             raise ValueError(f"銘柄 {symbol} が見つかりません")
+        company = CompanyView(*company_row)
 
-        # 過去N日間の株価データを一括取得
-        start_date = datetime.now(timezone.utc) - timedelta(days=days)
-        stock_prices = session.scalars(
-            select(StockPrice)
+        # 過去N日間の終値を一括取得
+        start_date = (now or datetime.now(timezone.utc)) - timedelta(days=days)
+        stock_prices = session.execute(
+            select(StockPrice.date, StockPrice.close)
             .where(StockPrice.symbol == symbol, StockPrice.date >= start_date)
             .order_by(StockPrice.date.desc())
         ).all()
 
         # 最新のテクニカル指標を取得
-        latest_indicator = session.scalar(
-            select(TechnicalIndicator)
+        latest_indicator = session.execute(
+            select(
+                TechnicalIndicator.ma_25,
+                TechnicalIndicator.divergence_rate,
+                TechnicalIndicator.dividend_yield,
+            )
             .where(TechnicalIndicator.symbol == symbol)
             .order_by(TechnicalIndicator.date.desc())
             .limit(1)
-        )
+        ).first()
 
         logger.debug(
             "株価データを取得しました (symbol=%s, price_count=%d, has_indicator=%s)",
@@ -115,9 +196,10 @@ class AIStockAnalysisService:
             min_price = 0
             price_change_pct = 0
 
-        # プロンプト構築
-        prompt = f"""あなたは日本株の投資分析専門家です。以下の銘柄について、詳細な分析を行ってください。
-
+        # プロンプト構築（固定部分はモジュール定数として事前に組み立て済み）
+        parts = [
+            _PROMPT_HEADER,
+            f"""
 【銘柄情報】
 銘柄コード: {company.symbol}
 銘柄名: {company.name or "不明"}
@@ -131,59 +213,34 @@ class AIStockAnalysisService:
 期間最高値: {max_price:,.0f}円
 期間最安値: {min_price:,.0f}円
 
-【テクニカル指標】"""
+【テクニカル指標】""",
+        ]
 
         if latest_indicator:
-            prompt += f"""
+            parts.append(
+                f"""
 25日移動平均: {float(latest_indicator.ma_25):,.0f}円
 乖離率: {float(latest_indicator.divergence_rate):+.1f}%
 配当利回り: {float(latest_indicator.dividend_yield or 0):.2f}%"""
+            )
         else:
-            prompt += "\nテクニカル指標データなし"
+            parts.append("\nテクニカル指標データなし")
 
-        prompt += f"""
+        parts.append(_PROMPT_INSTRUCTIONS)
 
-【分析指示】
-以下の形式で詳細な分析を提供してください：
-
-## 株価動向分析（過去{AI_ANALYSIS_DATA_DAYS}日）
-
-**価格推移:**
-- {AI_ANALYSIS_DATA_DAYS}日前、現在、最高値、最安値を明記
-- 主要な変動要因を3つ挙げる
-
-**テクニカル指標:**
-- 移動平均からの乖離、配当利回りの評価
-- 売られすぎ/買われすぎの判断
-
-## 投資判断
-
-**1ヶ月:** 買い推奨度 ★☆☆☆☆〜★★★★★（5段階評価）
-短期的な見通しと根拠
-
-**3ヶ月:** 買い推奨度 ★☆☆☆☆〜★★★★★（5段階評価）
-中期的な見通しと根拠
-
-**1年:** 買い推奨度 ★☆☆☆☆〜★★★★★（5段階評価）
-長期的な見通しと根拠
-
-**それ以上:** 買い推奨度 ★☆☆☆☆〜★★★★★（5段階評価）
-超長期的な見通しと根拠
-
-**総評:**
-総合的な投資判断（2-3文）
-
-注意: 株価の下落理由については、一般的な市場動向や業界トレンドに基づいて推測してください。
-"""
+        prompt = "".join(parts)
 
         return prompt
 
-    def _record_analysis_failure(self, analysis_id: int, error_message: str) -> None:
+    def _record_analysis_failure(
+        self, analysis_id: int, error_message: str, now: Optional[datetime] = None
+    ) -> None:
         """分析失敗をデータベースに記録する
 
         Args:
             analysis_id: 分析ID
             error_message: エラーメッセージ（ユーザー向けの安全なメッセージ）
+            now: 完了時刻（省略時は現在時刻）
         """
         logger.info("分析失敗を記録します (analysis_id=%d)", analysis_id)
         with SessionLocal() as session:
@@ -191,7 +248,7 @@ class AIStockAnalysisService:
             if analysis:
                 analysis.status = "failed"
                 analysis.error_message = error_message
-                analysis.completed_at = datetime.now(timezone.utc)
+                analysis.completed_at = now or datetime.now(timezone.utc)
                 session.commit()
 
     async def analyze_stock_async(
@@ -231,7 +288,9 @@ class AIStockAnalysisService:
             logger.error("バリデーションエラー (analysis_id=%d): %s", analysis_id, str(e))
             self._record_analysis_failure(analysis_id, str(e))
         except Exception:
-            logger.exception("AI分析中に予期しないエラーが発生しました (analysis_id=%d)", analysis_id)
+            logger.exception(
+                "AI分析中に予期しないエラーが発生しました (analysis_id=%d)", analysis_id
+            )
             self._record_analysis_failure(analysis_id, "分析中に予期しないエラーが発生しました")
 
     async def _perform_analysis(self, symbol: str, analysis_id: int) -> None:
@@ -249,16 +308,30 @@ class AIStockAnalysisService:
         if not self.claude_service.is_available():
             raise ClaudeAPIError("APIキーが設定されていません")
 
+        # データ取得期間と再利用期間の基準時刻を共有する
+        started_at = datetime.now(timezone.utc)
+
         # 株価データを取得してプロンプトを構築
         with SessionLocal() as session:
-            data = self.get_stock_data_for_analysis(session, symbol)
+            data = self.get_stock_data_for_analysis(session, symbol, now=started_at)
             prompt = self.build_analysis_prompt(data)
+            prompt_hash = compute_prompt_hash(prompt)
+            analysis_text = self.find_reusable_analysis_text(session, prompt_hash, now=started_at)
 
-        # Claude APIに分析を依頼
-        response = await asyncio.to_thread(self.claude_service.send_message, prompt)
+        if analysis_text is not None:
+            logger.info(
+                "同一プロンプトの分析結果を再利用します (analysis_id=%d, prompt_hash=%s)",
+                analysis_id,
+                prompt_hash,
+            )
+        else:
+            # Claude APIに分析を依頼
+            # 分析はリクエストごとに別のイベントループ（asyncio.run）で動くため、ループに
+            # 紐づく非同期クライアントではなく、接続プールを共有する同期クライアントを使う
+            response = await asyncio.to_thread(self.claude_service.send_message, prompt)
 
-        # 分析結果を取得
-        analysis_text = self.claude_service.extract_text_from_response(response)
+            # 分析結果を取得
+            analysis_text = self.claude_service.extract_text_from_response(response)
 
         # データベースに保存
         with SessionLocal() as session:
@@ -266,17 +339,56 @@ class AIStockAnalysisService:
             if analysis:
                 analysis.status = "completed"
                 analysis.analysis_text = analysis_text
+                analysis.prompt_hash = prompt_hash
                 analysis.completed_at = datetime.now(timezone.utc)
                 session.commit()
                 logger.debug("分析結果を保存しました (analysis_id=%d)", analysis_id)
 
-    def create_analysis_record(self, session: Session, symbol: str, user_id: int) -> int:
+    def find_reusable_analysis_text(
+        self,
+        session: Session,
+        prompt_hash: str,
+        hours: int = AI_ANALYSIS_REUSE_HOURS,
+        now: Optional[datetime] = None,
+    ) -> Optional[str]:
+        """同一プロンプトで完了済みの直近の分析結果を取得する
+
+        株価・指標が前回分析から変わっていなければプロンプトも一致するため、
+        Claude APIを呼び出さずに既存の分析テキストを再利用できる。
+        再利用期間は依頼時刻（created_at）ではなく、分析の完了時刻（completed_at）から数える。
+
+        Args:
+            session: データベースセッション
+            prompt_hash: プロンプトのハッシュ値
+            hours: 再利用を許可する期間（時間）
+            now: 基準時刻（省略時は現在時刻）
+
+        Returns:
+            再利用可能な分析テキスト（存在しない場合はNone）
+        """
+        threshold = (now or datetime.now(timezone.utc)) - timedelta(hours=hours)
+        return session.scalar(
+            select(AIStockAnalysis.analysis_text)
+            .where(
+                AIStockAnalysis.prompt_hash == prompt_hash,
+                AIStockAnalysis.status == "completed",
+                AIStockAnalysis.analysis_text.isnot(None),
+                AIStockAnalysis.completed_at >= threshold,
+            )
+            .order_by(AIStockAnalysis.completed_at.desc())
+            .limit(1)
+        )
+
+    def create_analysis_record(
+        self, session: Session, symbol: str, user_id: int, now: Optional[datetime] = None
+    ) -> int:
         """分析レコードを作成する
 
         Args:
             session: データベースセッション
             symbol: 銘柄コード
             user_id: ユーザーID
+            now: 作成時刻（省略時は現在時刻。複数件作成時は同じ時刻を渡す）
 
         Returns:
             作成された分析レコードのID
@@ -286,7 +398,7 @@ class AIStockAnalysisService:
             symbol=symbol,
             user_id=user_id,
             status="pending",
-            created_at=datetime.now(timezone.utc),
+            created_at=now or datetime.now(timezone.utc),
         )
         session.add(analysis)
         session.commit()
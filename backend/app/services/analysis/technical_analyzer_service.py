@@ -1,21 +1,27 @@
+import heapq
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
-from app.config.constants import MARKET_NAME_MAPPING
+from app.config.constants import MACD_SIGNAL_PERIOD, MACD_SLOW_PERIOD, MARKET_NAME_MAPPING
 from app.config.settings import (
     DIVERGENCE_THRESHOLD,
     DIVIDEND_YIELD_MAX,
     DIVIDEND_YIELD_MIN,
     MA_PERIOD,
+    TECHNICAL_ANALYSIS_MAX_WORKERS,
+    TECHNICAL_INDICATOR_WRITE_BATCH_SIZE,
 )
-from app.database.database_manager import DatabaseManager
-from app.database.types import AnalysisResultMap
+from app.database.database_manager import DatabaseManager, get_db_manager
+from app.database.types import AnalysisResultMap, PriceArrays, TechnicalIndicatorWrite
 from app.utils.price_indicators import (
-    calculate_divergence_rate,
+    calculate_divergence_rates,
+    calculate_macd,
     calculate_moving_average,
-    calculate_price_change_percent,
     calculate_volume_average,
 )
 
@@ -26,75 +32,182 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 投資スコアの区分表（各区間の下限と点数）。import時に配列化しておき、スコア計算では二分探索で引く
+# 乖離率の絶対値: 3%未満0 / 3%以上2 / 5%以上3 / 7%以上4 / 10%以上5
+DIVERGENCE_SCORE_EDGES = np.array([3.0, 5.0, 7.0, 10.0])
+DIVERGENCE_SCORE_VALUES = np.array([0, 2, 3, 4, 5])
+# 配当利回り: 0%以下0 / 0%超1 / 3.0%以上2 / 3.5%以上3 / 4.5%超2 / 5.0%超1
+# 「超」の境界は直後の浮動小数点数を下限にして、すべて「以上」として扱う
+DIVIDEND_SCORE_EDGES = np.array(
+    [
+        np.nextafter(0.0, np.inf),
+        3.0,
+        3.5,
+        np.nextafter(4.5, np.inf),
+        np.nextafter(5.0, np.inf),
+    ]
+)
+DIVIDEND_SCORE_VALUES = np.array([0, 1, 2, 3, 2, 1])
+
+
+def _analyze_ma_trend(close_prices: pd.Series) -> str:
+    """
+    MACDによるトレンド分析
+
+    MACDの符号で方向を、ヒストグラムの前日差で勢いを判定する。
+    """
+    if len(close_prices) < MACD_SLOW_PERIOD + MACD_SIGNAL_PERIOD:
+        return "Unknown"
+
+    macd = calculate_macd(close_prices)
+    latest_macd = macd["macd"].iat[-1]
+    histogram_slope = macd["histogram"].iat[-1] - macd["histogram"].iat[-2]
+
+    if latest_macd > 0 and histogram_slope > 0:
+        return "Upward"
+    elif latest_macd < 0 and histogram_slope < 0:
+        return "Downward"
+    else:
+        return "Sideways"
+
+
+# 価格トレンドは直近5件の値だけで決まる純粋関数なので、値のタプルをキーにメモ化する
+@lru_cache(maxsize=8192)
+def _analyze_price_trend(price_values: tuple[float, ...]) -> str:
+    """
+    価格のトレンド分析
+    """
+    if len(price_values) < 2:
+        return "Unknown"
+
+    recent_change = ((price_values[-1] / price_values[-2]) - 1) * 100
+
+    if recent_change > 2:
+        return "Strong Up"
+    elif recent_change > 0:
+        return "Up"
+    elif recent_change < -2:
+        return "Strong Down"
+    elif recent_change < 0:
+        return "Down"
+    else:
+        return "Flat"
+
 
 class TechnicalAnalyzerService:
-    def __init__(self) -> None:
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_manager: Optional[DatabaseManager] = None) -> None:
+        self.db_manager = db_manager or get_db_manager()
 
     def get_dividend_yield(
-        self, symbol: str, current_price: Optional[float] = None
+        self,
+        symbol: str,
+        current_price: Optional[float] = None,
+        ticker_info: Optional[dict] = None,
     ) -> Optional[float]:
         """
         配当利回りを計算（ticker_infoの年間配当金と現在の株価から計算）
+
+        ticker_infoを渡した場合はDBからの再取得を省略する。
         """
-        try:
+        if ticker_info is None:
             ticker_info = self.db_manager.get_ticker_info(symbol)
 
-            if not ticker_info:
-                logger.debug(f"ticker_infoデータなし: {symbol}")
-                return 0.0
-
-            annual_dividend = ticker_info.get("trailing_annual_dividend_rate")
-            if annual_dividend is None or annual_dividend <= 0:
-                logger.debug(f"年間配当金データなし: {symbol}")
-                return 0.0
-
-            # 現在の株価を取得（引数で指定されていない場合は最新の株価データを使用）
-            if current_price is None:
-                price_data = self.db_manager.get_stock_prices(symbol)
-                if price_data.empty:
-                    # 株価データがない場合はticker_infoの株価を使用
-                    ticker_price = ticker_info.get("current_price")
-                    if ticker_price is None or ticker_price <= 0:
-                        logger.debug(f"株価データなし: {symbol}")
-                        return 0.0
-                    current_price = ticker_price
-                else:
-                    current_price = float(price_data["close"].iloc[-1])
-
-            if current_price is None or current_price <= 0:
-                logger.warning(f"無効な株価: {symbol}, price: {current_price}")
-                return 0.0
-
-            # 配当利回り計算：(年間配当金 / 現在株価) * 100
-            dividend_yield = (float(annual_dividend) / current_price) * 100
-            return round(dividend_yield, 2)
+        if not ticker_info:
+            logger.debug("ticker_infoデータなし: %s", symbol)
+            return 0.0
 
-        except Exception as e:
+        # 配当がなければ株価を取得する必要はない
+        annual_dividend = ticker_info.get("trailing_annual_dividend_rate")
+        if annual_dividend is None or annual_dividend <= 0:
+            logger.debug("年間配当金データなし: %s", symbol)
+            return 0.0
+
+        current_price = self._resolve_current_price(symbol, current_price, ticker_info)
+        if current_price is None:
+            logger.debug("有効な株価データなし: %s", symbol)
+            return 0.0
+
+        # 配当利回り計算：(年間配当金 / 現在株価) * 100
+        try:
+            return round(float(annual_dividend) / float(current_price) * 100, 2)
+        except (TypeError, ValueError, ZeroDivisionError) as e:
             logger.warning(f"配当利回り計算エラー {symbol}: {e}")
             return 0.0
 
+    def _resolve_current_price(
+        self, symbol: str, current_price: Optional[float], ticker_info: dict
+    ) -> Optional[float]:
+        """
+        配当利回りの計算に使う株価を決定
+
+        引数で指定された株価、最新の株価データ、ticker_infoの株価の順に使う。
+        株価データの終値は正の値（欠損（NaN）・0以下でない）の場合だけ使う。
+        """
+        if current_price is not None:
+            return current_price if current_price > 0 else None
+
+        closes = self.db_manager.get_stock_prices_arrays(symbol)["close"]
+        # NaNとの比較は常に偽のため、欠損もここで除かれる
+        if len(closes) and closes[-1] > 0:
+            return float(closes[-1])
+
+        ticker_price = ticker_info.get("current_price")
+        if ticker_price is None or ticker_price <= 0:
+            return None
+        return float(ticker_price)
+
     def analyze_single_stock(self, symbol: str) -> Optional[dict]:
         """
         単一銘柄の技術分析を実行
         """
+        analyzed = self._calculate_indicators(symbol)
+        if analyzed is None:
+            return None
+
+        result, write = analyzed
+        if not self.db_manager.insert_technical_indicators_bulk([write]):
+            logger.error(f"技術指標保存失敗: {symbol}")
+            return None
+
+        logger.debug("技術分析完了: %s", symbol)
+        return result
+
+    def _calculate_indicators(
+        self, symbol: str, ticker_info: Optional[dict] = None
+    ) -> Optional[tuple[dict, TechnicalIndicatorWrite]]:
+        """
+        単一銘柄の技術指標を計算（保存はしない）
+
+        Args:
+            symbol: 銘柄コード
+            ticker_info: 取得済みのティッカー情報（Noneの場合はDBから取得）
+
+        Returns:
+            (分析結果, 保存内容)。分析できない場合はNone
+        """
         try:
-            logger.debug(f"技術分析開始: {symbol}")
+            logger.debug("技術分析開始: %s", symbol)
 
-            # データベースから株価データを取得
-            price_data = self.db_manager.get_stock_prices(symbol)
-            if price_data.empty:
+            # データベースから株価データを取得（必要な列のみNumPy配列で受け取る）
+            price_arrays = self.db_manager.get_stock_prices_arrays(symbol)
+            dates = price_arrays["date"]
+            if len(dates) == 0:
                 logger.warning(f"株価データが見つかりません: {symbol}")
                 return None
 
             # 必要なデータ期間があるかチェック
-            if len(price_data) < MA_PERIOD:
-                logger.warning(f"データ不足 {symbol}: {len(price_data)} < {MA_PERIOD}")
+            if len(dates) < MA_PERIOD:
+                logger.warning(f"データ不足 {symbol}: {len(dates)} < {MA_PERIOD}")
                 return None
 
-            # 技術指標の計算
-            close_prices = price_data["close"]
-            volumes = price_data["volume"]
+            # 前回保存分から変わっていなければ、保存済みの最新日以降だけを再計算する
+            incremental_start = self._get_incremental_start(symbol, price_arrays)
+            start = incremental_start or 0
+
+            # 技術指標の計算（移動平均の計算と保存に必要な分だけSeriesにする）
+            index = pd.DatetimeIndex(dates[start:], name="date")
+            close_prices = pd.Series(price_arrays["close"][start:], index=index)
+            volumes = pd.Series(price_arrays["volume"][start:], index=index)
 
             # 25日移動平均
             ma_25 = calculate_moving_average(close_prices, MA_PERIOD)
@@ -103,85 +216,166 @@ class TechnicalAnalyzerService:
             volume_avg_20 = calculate_volume_average(volumes, 20)
 
             # 最新の値を取得
-            latest_date = price_data.index[-1]
-            latest_price = close_prices.iloc[-1]
-            latest_ma_25 = ma_25.iloc[-1]
-            latest_volume_avg = volume_avg_20.iloc[-1]
+            latest_date = index[-1]
+            latest_price = close_prices.iat[-1]
+            latest_ma_25 = ma_25.iat[-1]
+            latest_volume_avg = volume_avg_20.iat[-1]
 
             # 配当利回りの取得（現在の株価を使用）
-            dividend_yield = self.get_dividend_yield(symbol, latest_price)
+            dividend_yield = self.get_dividend_yield(symbol, latest_price, ticker_info=ticker_info)
 
             # 結果をDataFrameとして構築
             indicators_df = pd.DataFrame(
                 {
                     "ma_25": ma_25,
-                    "divergence_rate": [
-                        calculate_divergence_rate(price, ma)
-                        for price, ma in zip(close_prices, ma_25)
-                    ],
+                    "divergence_rate": calculate_divergence_rates(close_prices, ma_25),
                     "dividend_yield": dividend_yield,  # 全期間で同じ値
                     "volume_avg_20": volume_avg_20,
                 },
-                index=price_data.index,
+                index=index,
             )
 
             # 欠損値を除去
             indicators_df = indicators_df.dropna()
 
             # 最新の乖離率をDataFrameから取得
-            latest_divergence_rate = float(indicators_df["divergence_rate"].iloc[-1])
-
-            # データベースに保存
-            success = self.db_manager.insert_technical_indicators(symbol, indicators_df)
-
-            if success:
-                logger.debug(f"技術分析完了: {symbol}")
-                return {
-                    "symbol": symbol,
-                    "latest_price": latest_price,
-                    "latest_ma_25": latest_ma_25,
-                    "divergence_rate": latest_divergence_rate,
-                    "dividend_yield": dividend_yield,
-                    "latest_volume_avg": latest_volume_avg,
-                    "analysis_date": latest_date,
-                }
-            else:
-                logger.error(f"技術指標保存失敗: {symbol}")
-                return None
+            latest_divergence_rate = float(indicators_df["divergence_rate"].iat[-1])
+
+            result = {
+                "symbol": symbol,
+                "latest_price": latest_price,
+                "latest_ma_25": latest_ma_25,
+                "divergence_rate": latest_divergence_rate,
+                "dividend_yield": dividend_yield,
+                "latest_volume_avg": latest_volume_avg,
+                "analysis_date": latest_date,
+            }
+            write = TechnicalIndicatorWrite(
+                symbol,
+                indicators_df,
+                oldest_date=None
+                if incremental_start is None
+                else pd.Timestamp(dates[MA_PERIOD - 1]),
+            )
+            return result, write
 
         except Exception as e:
             logger.error(f"技術分析エラー {symbol}: {e}")
             return None
 
-    def analyze_batch_stocks(self, symbols: list[str]) -> AnalysisResultMap:
+    def _get_incremental_start(self, symbol: str, price_arrays: PriceArrays) -> Optional[int]:
+        """
+        差分更新で再計算を始める位置を求める
+
+        保存済み指標の最新日の移動平均を計算できる最初の位置を返す。
+        最新日の移動平均を再計算して保存値と一致しない場合（分割・配当による株価の遡及調整）や、
+        指標が未保存の場合はNoneを返し、全期間を再計算させる。
+        """
+        latest_indicator = self.db_manager.get_latest_technical_indicator(symbol)
+        if latest_indicator is None or latest_indicator["ma_25"] is None:
+            return None
+
+        dates = price_arrays["date"]
+        latest_date = np.datetime64(latest_indicator["date"], "ns")
+        position = int(np.searchsorted(dates, latest_date))
+        if position < MA_PERIOD - 1 or position >= len(dates) or dates[position] != latest_date:
+            return None
+
+        start = position - (MA_PERIOD - 1)
+        recalculated_ma = float(np.mean(price_arrays["close"][start : position + 1]))
+        if abs(recalculated_ma - latest_indicator["ma_25"]) > 0.01:
+            logger.debug("株価の遡及調整を検出したため全期間を再計算: %s", symbol)
+            return None
+
+        return start
+
+    def analyze_batch_stocks(
+        self, symbols: list[str], max_workers: int = TECHNICAL_ANALYSIS_MAX_WORKERS
+    ) -> AnalysisResultMap:
         """
         複数銘柄の技術分析をバッチ実行
+
+        銘柄ごとの分析は互いに独立しているため、スレッドプールで並列に実行する。
+        結果は入力した銘柄の順序を保持する。
+
+        Args:
+            symbols: 分析対象の銘柄コードリスト
+            max_workers: 並列ワーカー数（1で逐次実行）
         """
-        results = {}
+        results: AnalysisResultMap = {}
+        pending: list[tuple[dict, TechnicalIndicatorWrite]] = []
 
-        logger.info(f"技術分析開始: {len(symbols)} 銘柄")
+        logger.info(f"技術分析開始: {len(symbols)} 銘柄 (workers={max_workers})")
+
+        # 全銘柄のticker_infoを1回のクエリで取得（情報がない銘柄は空の辞書で再取得を省く）
+        ticker_infos = self.db_manager.get_ticker_info_bulk(symbols)
+
+        # 計算はワーカーで並列に行い、保存は呼び出し元のスレッドでまとめて行う
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            analyzed = executor.map(
+                self._calculate_indicators,
+                symbols,
+                [ticker_infos.get(symbol, {}) for symbol in symbols],
+            )
+            for i, (symbol, calculated) in enumerate(zip(symbols, analyzed)):
+                if (i + 1) % 50 == 0:
+                    logger.info(f"進捗: {i + 1}/{len(symbols)}")
 
-        for i, symbol in enumerate(symbols):
-            if (i + 1) % 50 == 0:
-                logger.info(f"進捗: {i + 1}/{len(symbols)}")
+                results[symbol] = None
+                if calculated is not None:
+                    pending.append(calculated)
+                if len(pending) >= TECHNICAL_INDICATOR_WRITE_BATCH_SIZE:
+                    self._flush_indicator_writes(pending, results)
+                    pending = []
 
-            result = self.analyze_single_stock(symbol)
-            results[symbol] = result
+        self._flush_indicator_writes(pending, results)
 
         success_count = sum(1 for result in results.values() if result is not None)
         logger.info(f"技術分析完了: 成功 {success_count}/{len(symbols)}")
 
         return results
 
+    def _flush_indicator_writes(
+        self, pending: list[tuple[dict, TechnicalIndicatorWrite]], results: AnalysisResultMap
+    ) -> None:
+        """
+        計算済みの技術指標をまとめて保存し、保存できた銘柄の分析結果を反映
+        """
+        if not pending:
+            return
+
+        # 同じ銘柄が複数回含まれる場合は後のものを保存する
+        latest = {write.symbol: (result, write) for result, write in pending}
+        writes = [write for _, write in latest.values()]
+        if self.db_manager.insert_technical_indicators_bulk(writes):
+            saved = set(latest)
+        else:
+            # 一括保存に失敗した場合は、1銘柄の不正データで残りを失わないよう銘柄ごとに保存し直す
+            logger.warning(f"技術指標の一括保存失敗、銘柄ごとに再試行: {len(writes)} 銘柄")
+            saved = {
+                write.symbol
+                for write in writes
+                if self.db_manager.insert_technical_indicators_bulk([write])
+            }
+
+        for symbol, (result, _) in latest.items():
+            if symbol in saved:
+                results[symbol] = result
+            else:
+                logger.error(f"技術指標保存失敗: {symbol}")
+
     def get_investment_candidates(
         self,
         divergence_threshold: float = DIVERGENCE_THRESHOLD,
         dividend_min: float = DIVIDEND_YIELD_MIN,
         dividend_max: float = DIVIDEND_YIELD_MAX,
         market_filter: Optional[str] = None,
+        limit: Optional[int] = None,
     ) -> list[dict]:
         """
         投資候補銘柄を抽出
+
+        limitを指定した場合はスコア上位limit件だけを返す。
         """
         try:
             # 市場フィルタを日本語名に変換
@@ -201,93 +395,129 @@ class TechnicalAnalyzerService:
 
             logger.info(f"投資候補銘柄: {len(candidates)} 銘柄が抽出されました")
 
+            # 全候補の直近2営業日の終値を1回のクエリで取得
+            latest_prices = self.db_manager.get_latest_prices_bulk(
+                [candidate["symbol"] for candidate in candidates], n=2
+            )
+            price_summary = self._summarize_latest_prices(latest_prices)
+            scores = self._calculate_investment_scores(candidates)
+
             # 追加の分析情報を付与
+            # ソートキーはスコアを付与した時点で記録し、ソート時に辞書を引き直さない
             enriched_candidates = []
-            for candidate in candidates:
+            sort_scores = []
+            for candidate, score in zip(candidates, scores):
+                sort_score = 0.0
                 try:
-                    # 最新の株価データを取得
-                    price_data = self.db_manager.get_stock_prices(candidate["symbol"])
-                    if not price_data.empty:
-                        latest_price = price_data["close"].iloc[-1]
-                        price_change_1d = (
-                            calculate_price_change_percent(
-                                float(price_data["close"].iloc[-1]),
-                                float(price_data["close"].iloc[-2]),
-                            )
-                            if len(price_data) > 1
-                            else 0.0
-                        )
-
+                    summary = price_summary.get(candidate["symbol"])
+                    if summary is not None:
+                        latest_price, price_change_1d = summary
                         candidate.update(
                             {
                                 "current_price": latest_price,
                                 "latest_price": latest_price,
-                                "price_change_1d": round(price_change_1d, 2),
-                                "analysis_score": self._calculate_investment_score(candidate),
+                                "price_change_1d": price_change_1d,
+                                "analysis_score": score,
                             }
                         )
-
-                    enriched_candidates.append(candidate)
+                        sort_score = score
 
                 except Exception as e:
                     logger.warning(f"候補銘柄の詳細取得エラー {candidate.get('symbol')}: {e}")
-                    enriched_candidates.append(candidate)
 
-            # スコア順でソート
-            enriched_candidates.sort(key=lambda x: x.get("analysis_score", 0), reverse=True)
+                enriched_candidates.append(candidate)
+                sort_scores.append(sort_score)
 
-            return enriched_candidates
+            # スコア順でソート（スコアのない銘柄は0として扱い、同点は抽出順を保つ）
+            if limit is not None:
+                order = heapq.nlargest(limit, range(len(sort_scores)), key=sort_scores.__getitem__)
+            else:
+                order = np.argsort(-np.asarray(sort_scores, dtype=float), kind="stable").tolist()
+
+            return [enriched_candidates[i] for i in order]
 
         except Exception as e:
             logger.error(f"投資候補抽出エラー: {e}")
             return []
 
-    def _calculate_investment_score(self, candidate: dict) -> float:
+    def _summarize_latest_prices(
+        self, latest_prices: pd.DataFrame
+    ) -> dict[str, tuple[float, float]]:
         """
-        投資魅力度スコアを計算
+        銘柄ごとの最新終値と前日比（%）をまとめて計算
+
+        Args:
+            latest_prices: get_latest_prices_bulk の結果（銘柄・日付の昇順）
+
+        Returns:
+            銘柄コード → (最新終値, 前日比%) の辞書。前日データがない場合の前日比は0.0
         """
-        score = 0.0
+        if latest_prices.empty:
+            return {}
+
+        is_latest = ~latest_prices["symbol"].duplicated(keep="last")
+        latest = latest_prices[is_latest].set_index("symbol")["close"].astype(float)
+        previous = (
+            latest_prices[~is_latest]
+            .drop_duplicates("symbol", keep="last")
+            .set_index("symbol")["close"]
+            .astype(float)
+            .reindex(latest.index)
+        )
 
-        try:
-            # 乖離率スコア（絶対値が大きいほど高スコア）
-            divergence_rate_raw = candidate.get("divergence_rate")
-            if divergence_rate_raw is not None:
-                divergence_rate = abs(divergence_rate_raw)
-                if divergence_rate >= 10:
-                    score += 5
-                elif divergence_rate >= 7:
-                    score += 4
-                elif divergence_rate >= 5:
-                    score += 3
-                elif divergence_rate >= 3:
-                    score += 2
-
-            # 配当利回りスコア
-            dividend_yield = candidate.get("dividend_yield")
-            if dividend_yield is not None and dividend_yield > 0:
-                if 3.5 <= dividend_yield <= 4.5:
-                    score += 3
-                elif 3.0 <= dividend_yield <= 5.0:
-                    score += 2
-                else:
-                    score += 1
-
-            # 企業規模スコア
-            if candidate.get("is_enterprise"):
-                score += 2
-
-            # 市場区分スコア
-            market = candidate.get("market", "").lower()
-            if "プライム" in market or "prime" in market:
-                score += 2
-            elif "スタンダード" in market or "standard" in market:
-                score += 1
-
-            return round(score, 1)
+        change = ((latest - previous) / previous * 100).round(2)
+        change = change.where(previous.notna() & (previous != 0), 0.0)
 
-        except Exception as e:
-            logger.warning(f"スコア計算エラー: {e}")
-            return 0.0
+        return dict(zip(latest.index, zip(latest.tolist(), change.tolist())))
+
+    def _calculate_investment_scores(self, candidates: list[dict]) -> list[float]:
+        """
+        投資魅力度スコアを候補銘柄全体でまとめて計算
+
+        Args:
+            candidates: get_filtered_companies の結果
+
+        Returns:
+            candidatesと同じ順序のスコアのリスト
+        """
+        if not candidates:
+            return []
+
+        cdf = pd.DataFrame(
+            candidates, columns=["divergence_rate", "dividend_yield", "is_enterprise", "market"]
+        )
+
+        # 乖離率スコア（絶対値が大きいほど高スコア）
+        divergence = np.abs(
+            pd.to_numeric(cdf["divergence_rate"], errors="coerce").fillna(0.0).to_numpy(float)
+        )
+        divergence_score = DIVERGENCE_SCORE_VALUES[
+            np.searchsorted(DIVERGENCE_SCORE_EDGES, divergence, side="right")
+        ]
+
+        # 配当利回りスコア（欠損は0%として扱う）
+        dividend = pd.to_numeric(cdf["dividend_yield"], errors="coerce").fillna(0.0).to_numpy(float)
+        dividend_score = DIVIDEND_SCORE_VALUES[
+            np.searchsorted(DIVIDEND_SCORE_EDGES, dividend, side="right")
+        ]
+
+        # 企業規模スコア
+        enterprise_score = np.where(cdf["is_enterprise"].eq(True), 2, 0)
+
+        # 市場区分スコア
+        market = cdf["market"].astype("string")
+        market_score = np.select(
+            [
+                market.str.contains("プライム|prime", case=False, regex=True, na=False),
+                market.str.contains("スタンダード|standard", case=False, regex=True, na=False),
+            ],
+            [2, 1],
+            default=0,
+        )
+
+        total = divergence_score + dividend_score + enterprise_score + market_score
+        scores: list[float] = np.round(total.astype(float), 1).tolist()
+        return scores
 
     def get_technical_summary(self, symbol: str) -> Optional[dict]:
         """
@@ -304,20 +534,18 @@ class TechnicalAnalyzerService:
             if prices.empty:
                 return None
 
-            latest_indicators = indicators.iloc[-1]
-            latest_prices = prices.iloc[-1]
-
             # トレンド分析
-            ma_trend = self._analyze_ma_trend(indicators["ma_25"].tail(5))
-            price_trend = self._analyze_price_trend(prices["close"].tail(5))
+            ma_trend = _analyze_ma_trend(prices["close"])
+            price_trend = _analyze_price_trend(tuple(prices["close"].tail(5).to_numpy(dtype=float)))
 
+            # 最新値は行全体を取り出さず、必要な列の末尾要素だけを参照する
             return {
                 "symbol": symbol,
-                "current_price": latest_prices["close"],
-                "ma_25": latest_indicators["ma_25"],
-                "divergence_rate": latest_indicators["divergence_rate"],
-                "dividend_yield": latest_indicators["dividend_yield"],
-                "volume_avg_20": latest_indicators["volume_avg_20"],
+                "current_price": prices["close"].iat[-1],
+                "ma_25": indicators["ma_25"].iat[-1],
+                "divergence_rate": indicators["divergence_rate"].iat[-1],
+                "dividend_yield": indicators["dividend_yield"].iat[-1],
+                "volume_avg_20": indicators["volume_avg_20"].iat[-1],
                 "ma_trend": ma_trend,
                 "price_trend": price_trend,
                 "last_updated": indicators.index[-1],
@@ -327,45 +555,6 @@ class TechnicalAnalyzerService:
             logger.error(f"技術分析サマリー取得エラー {symbol}: {e}")
             return None
 
-    def _analyze_ma_trend(self, ma_series: pd.Series) -> str:
-        """
-        移動平均のトレンド分析
-        """
-        if len(ma_series) < 2:
-            return "Unknown"
-
-        recent_slope = ma_series.iloc[-1] - ma_series.iloc[-2]
-        longer_slope = (
-            ma_series.iloc[-1] - ma_series.iloc[0] if len(ma_series) >= 5 else recent_slope
-        )
-
-        if recent_slope > 0 and longer_slope > 0:
-            return "Upward"
-        elif recent_slope < 0 and longer_slope < 0:
-            return "Downward"
-        else:
-            return "Sideways"
-
-    def _analyze_price_trend(self, price_series: pd.Series) -> str:
-        """
-        価格のトレンド分析
-        """
-        if len(price_series) < 2:
-            return "Unknown"
-
-        recent_change = ((price_series.iloc[-1] / price_series.iloc[-2]) - 1) * 100
-
-        if recent_change > 2:
-            return "Strong Up"
-        elif recent_change > 0:
-            return "Up"
-        elif recent_change < -2:
-            return "Strong Down"
-        elif recent_change < 0:
-            return "Down"
-        else:
-            return "Flat"
-
 
 if __name__ == "__main__":
     analyzer = TechnicalAnalyzerService()
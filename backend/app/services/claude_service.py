@@ -4,14 +4,31 @@ Anthropic Claude APIとの通信を担当するサービス。
 """
 
 import logging
-
-from anthropic import Anthropic, APIConnectionError, APIError, RateLimitError
+from typing import Optional
+
+import httpx
+from anthropic import (
+    Anthropic,
+    APIConnectionError,
+    APIError,
+    DefaultHttpxClient,
+    RateLimitError,
+)
 from anthropic.types import Message, TextBlock
 
-from app.config.settings import ANTHROPIC_API_KEY, CLAUDE_MAX_TOKENS, CLAUDE_MODEL
+from app.config.settings import (
+    ANTHROPIC_API_KEY,
+    CLAUDE_MAX_TOKENS,
+    CLAUDE_MODEL,
+)
 
 logger = logging.getLogger(__name__)
 
+# 分析リクエストの間隔が数十秒空いてもTLS接続を使い回せるよう、keep-alive期間を延長する
+CLAUDE_HTTP_LIMITS = httpx.Limits(
+    max_connections=20, max_keepalive_connections=20, keepalive_expiry=60
+)
+
 
 class ClaudeAPIError(Exception):
     """Claude API呼び出し時のエラー"""
@@ -24,7 +41,14 @@ class ClaudeService:
 
     def __init__(self) -> None:
         """サービスの初期化"""
-        self.client = Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
+        self.client = (
+            Anthropic(
+                api_key=ANTHROPIC_API_KEY,
+                http_client=DefaultHttpxClient(limits=CLAUDE_HTTP_LIMITS),
+            )
+            if ANTHROPIC_API_KEY
+            else None
+        )
 
     def is_available(self) -> bool:
         """APIが利用可能かどうかを返す
@@ -42,6 +66,9 @@ class ClaudeService:
     ) -> Message:
         """Claudeにメッセージを送信する
 
+        同一プロンプトの分析結果の再利用は、AIStockAnalysisService が保存済みの分析
+        （prompt_hash）から行うため、ここではレスポンスをキャッシュしない。
+
         Args:
             prompt: プロンプト
             model: 使用するモデル
@@ -57,7 +84,9 @@ class ClaudeService:
             logger.error("Anthropic APIキーが設定されていません")
             raise ClaudeAPIError("APIキーが設定されていません")
 
-        logger.info("Claude APIにリクエストを送信します (model=%s, max_tokens=%d)", model, max_tokens)
+        logger.info(
+            "Claude APIにリクエストを送信します (model=%s, max_tokens=%d)", model, max_tokens
+        )
 
         try:
             response = self.client.messages.create(
@@ -65,23 +94,28 @@ class ClaudeService:
                 max_tokens=max_tokens,
                 messages=[{"role": "user", "content": prompt}],
             )
-            logger.info(
-                "Claude APIからレスポンスを受信しました (stop_reason=%s)",
-                response.stop_reason,
-            )
-            return response
+        except APIError as e:
+            raise self._to_claude_api_error(e) from e
+
+        logger.info("Claude APIからレスポンスを受信しました (stop_reason=%s)", response.stop_reason)
+        return response
 
-        except RateLimitError as e:
+    @staticmethod
+    def _to_claude_api_error(error: APIError) -> ClaudeAPIError:
+        """Anthropic SDKの例外をClaudeAPIErrorに変換する
+
+        レート制限（429）はSDKが指数バックオフで自動リトライした後に到達する。
+        """
+        if isinstance(error, RateLimitError):
             logger.warning("Claude API: レート制限に達しました")
-            raise ClaudeAPIError(
+            return ClaudeAPIError(
                 "APIのレート制限に達しました。しばらく待ってから再試行してください"
-            ) from e
-        except APIConnectionError as e:
+            )
+        if isinstance(error, APIConnectionError):
             logger.error("Claude API: 接続エラーが発生しました")
-            raise ClaudeAPIError("APIへの接続に失敗しました") from e
-        except APIError as e:
-            logger.error("Claude API: エラーが発生しました: %s", str(e))
-            raise ClaudeAPIError("API呼び出し中にエラーが発生しました") from e
+            return ClaudeAPIError("APIへの接続に失敗しました")
+        logger.error("Claude API: エラーが発生しました: %s", str(error))
+        return ClaudeAPIError("API呼び出し中にエラーが発生しました")
 
     def extract_text_from_response(self, response: Message) -> str:
         """レスポンスからテキストを抽出する
@@ -116,3 +150,21 @@ class ClaudeService:
             raise ClaudeAPIError("APIレスポンスのテキストが空です")
 
         return first_block.text
+
+
+_claude_service: Optional[ClaudeService] = None
+
+
+def get_claude_service() -> ClaudeService:
+    """プロセス内で共有するClaudeServiceを取得する
+
+    Anthropicクライアントは内部にHTTPコネクションプールを持つため、
+    リクエストごとに生成せず使い回すことでTCP/TLSハンドシェイクを省略する。
+
+    Returns:
+        共有のClaudeServiceインスタンス
+    """
+    global _claude_service
+    if _claude_service is None:
+        _claude_service = ClaudeService()
+    return _claude_service
@@ -1,6 +1,8 @@
 import logging
 from typing import Optional
 
+from sqlalchemy import or_, select, text
+
 from app.config.models import FilterCriteria
 from app.config.settings import LOG_DATE_FORMAT, LOG_FORMAT
 from app.database.database_manager import DatabaseManager
@@ -10,6 +12,9 @@ from app.database.session import get_db
 logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
 logger = logging.getLogger(__name__)
 
+# companies_fts（FTS5 trigram）で検索できる最小の文字数
+FTS_MIN_QUERY_LENGTH = 3
+
 
 class CompanyFilterService:
     """企業フィルタリングを担当するサービスクラス"""
@@ -27,13 +32,13 @@ class CompanyFilterService:
             # 特定銘柄が指定されている場合は、それらのみを返す
             if filter_criteria.specific_symbols:
                 logger.info(f"特定銘柄フィルタ適用: {filter_criteria.specific_symbols}")
-                # 指定された銘柄がデータベースに存在するかチェック
-                valid_symbols = []
-                for symbol in filter_criteria.specific_symbols:
-                    if self.get_company_info(symbol):
-                        valid_symbols.append(symbol)
-                    else:
-                        logger.warning(f"銘柄 {symbol} はデータベースに存在しません")
+                # 指定された銘柄がデータベースに存在するかを1回のクエリでチェック
+                existing = self.db_manager.get_existing_symbols(
+                    list(filter_criteria.specific_symbols)
+                )
+                valid_symbols = [s for s in filter_criteria.specific_symbols if s in existing]
+                for symbol in sorted(set(filter_criteria.specific_symbols).difference(existing)):
+                    logger.warning(f"銘柄 {symbol} はデータベースに存在しません")
 
                 logger.info(f"特定銘柄フィルタリング完了: {len(valid_symbols)} 銘柄")
                 return valid_symbols
@@ -45,15 +50,14 @@ class CompanyFilterService:
                 market_filter = filter_criteria.markets[0]
                 logger.info(f"市場フィルタ適用: {market_filter}")
 
-            companies = self.db_manager.get_filtered_companies(
+            # 銘柄コードだけを返すため、企業情報・技術指標の列は取得しない
+            symbols = self.db_manager.get_filtered_symbols(
                 divergence_min=filter_criteria.divergence_min,
                 dividend_yield_min=filter_criteria.dividend_yield_min,
                 dividend_yield_max=filter_criteria.dividend_yield_max,
                 is_enterprise_only=filter_criteria.is_enterprise_only,
                 market_filter=market_filter,
             )
-
-            symbols = [company["symbol"] for company in companies]
             logger.info(f"フィルタリング完了: {len(symbols)} 銘柄が抽出されました")
 
             return symbols
@@ -94,7 +98,7 @@ class CompanyFilterService:
 
     def search_companies(
         self,
-        search: str,
+        search: Optional[str] = None,
         limit: int = 100,
         market: Optional[str] = None,
         sector: Optional[str] = None,
@@ -104,8 +108,8 @@ class CompanyFilterService:
         銘柄コードまたは銘柄名で企業を検索する（データベースレベル）。
 
         Args:
-            search: 検索文字列（銘柄コードまたは銘柄名の部分一致）
-            limit: 取得件数の上限
+            search: 検索文字列（銘柄コードまたは銘柄名の部分一致）。未指定の場合は絞り込まない
+            limit: 取得件数の上限（0の場合は全件）
             market: 市場区分でフィルタ（オプション）
             sector: 業種でフィルタ（オプション）
             is_enterprise: 大企業のみ（オプション）
@@ -116,34 +120,46 @@ class CompanyFilterService:
         try:
             db = next(get_db())
             try:
-                # 検索条件を構築（銘柄コードまたは銘柄名で部分一致）
-                search_pattern = f"%{search}%"
-                query = db.query(Company).filter(
-                    (Company.symbol.ilike(search_pattern)) | (Company.name.ilike(search_pattern))
+                # ORMオブジェクトを生成せず、必要な列だけを取得する
+                stmt = select(
+                    Company.symbol,
+                    Company.name,
+                    Company.sector,
+                    Company.market,
+                    Company.is_enterprise,
                 )
 
+                # 検索条件を構築（銘柄コードまたは銘柄名で部分一致）
+                # trigramは3文字未満を検索できないため、短い検索文字列はILIKEで走査する
+                if search and len(search) >= FTS_MIN_QUERY_LENGTH:
+                    stmt = stmt.where(
+                        text(
+                            "companies.rowid IN "
+                            "(SELECT rowid FROM companies_fts WHERE companies_fts MATCH :phrase)"
+                        ).bindparams(phrase='"' + search.replace('"', '""') + '"')
+                    )
+                elif search:
+                    search_pattern = f"%{search}%"
+                    stmt = stmt.where(
+                        or_(
+                            Company.symbol.ilike(search_pattern), Company.name.ilike(search_pattern)
+                        )
+                    )
+
                 # 追加フィルタ適用
                 if market:
-                    query = query.filter(Company.market == market)
+                    stmt = stmt.where(Company.market == market)
                 if sector:
-                    query = query.filter(Company.sector == sector)
+                    stmt = stmt.where(Company.sector == sector)
                 if is_enterprise is not None:
-                    query = query.filter(Company.is_enterprise.is_(is_enterprise))
+                    stmt = stmt.where(Company.is_enterprise.is_(is_enterprise))
 
                 # limit適用
-                companies = query.limit(limit).all()
+                if limit:
+                    stmt = stmt.limit(limit)
 
                 # 辞書形式に変換
-                result = [
-                    {
-                        "symbol": c.symbol,
-                        "name": c.name,
-                        "sector": c.sector,
-                        "market": c.market,
-                        "is_enterprise": c.is_enterprise,
-                    }
-                    for c in companies
-                ]
+                result = [dict(row) for row in db.execute(stmt).mappings()]
 
                 logger.info(f"検索完了: '{search}' で {len(result)} 件")
                 return result
@@ -1,11 +1,13 @@
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
+import numpy as np
 import pandas as pd
 
+from app.config.models import CompanyInfo
 from app.config.settings import DATA_DIR, JPX_FILE_NAME
-from app.utils.determine_enterprise import determine_enterprise_status
+from app.utils.determine_enterprise import determine_enterprise_statuses
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,6 +16,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Excelの読み込みに使うエンジン（先頭から順に試す）。calamine（Rust実装）はxls/xlsxの両方を高速に読める
+EXCEL_ENGINES: tuple[Literal["calamine", "openpyxl", "xlrd"], ...] = (
+    "calamine",
+    "openpyxl",
+    "xlrd",
+)
+
+# 項目ごとの列名の候補（一般的な列名パターンを想定。先頭から順に値のある列を採用する）
+COLUMN_CANDIDATES = {
+    "symbol": ("コード", "Code", "Symbol", "銘柄コード", "証券コード"),
+    "name": ("銘柄名", "Name", "会社名", "企業名"),
+    "sector": ("業種", "Sector", "33業種区分", "17業種区分"),
+    "market": ("市場・商品区分", "Market", "上場区分", "市場区分"),
+}
+
+# 読み込む列（候補のいずれか）。JPXファイルの他の列はDataFrameに載せない
+JPX_COLUMNS = frozenset(c for candidates in COLUMN_CANDIDATES.values() for c in candidates)
+
 
 class JPXFileParseService:
     def __init__(self) -> None:
@@ -30,7 +50,7 @@ class JPXFileParseService:
         logger.info("URL: https://www.jpx.co.jp/markets/statistics-equities/misc/01.html")
         return self.jpx_file_path.exists()
 
-    def parse_jpx_excel(self, file_path: Optional[Path] = None) -> list[dict]:
+    def parse_jpx_excel(self, file_path: Optional[Path] = None) -> list[CompanyInfo]:
         """
         JPXのExcelファイルを解析して企業情報を抽出
         """
@@ -43,28 +63,44 @@ class JPXFileParseService:
 
         try:
             # Excelファイルの読み込み（複数のエンジンを試行）
-            try:
-                df = pd.read_excel(file_path, engine="openpyxl")
-            except Exception:
-                try:
-                    df = pd.read_excel(file_path, engine="xlrd")
-                except Exception:
-                    logger.error(f"Excelファイルの読み込みに失敗: {file_path}")
-                    return []
-
-            companies = []
+            df = self._read_excel(file_path)
+            if df is None:
+                logger.error(f"Excelファイルの読み込みに失敗: {file_path}")
+                return []
 
             # JPXファイルの一般的な構造を想定した解析
             # 実際のファイル構造に応じて調整が必要
-            for index, row in df.iterrows():
-                try:
-                    # 基本的な企業情報の抽出
-                    company_data = self._extract_company_info(row)
-                    if company_data:
-                        companies.append(company_data)
-                except Exception as e:
-                    logger.warning(f"行 {index} の解析に失敗: {e}")
-                    continue
+            # 列名の解決はファイル全体で1回だけ行い、各項目は行ごとではなく列単位で抽出する
+            columns = self._resolve_columns(df.columns)
+            symbols = self._extract_symbols(df, columns["symbol"])
+            names = self._first_values(df, columns["name"])
+            sectors = self._first_values(df, columns["sector"])
+            markets = self._first_values(df, columns["market"])
+
+            # エンタープライズ企業の判定（基本的な条件）も列単位で行う
+            is_enterprise = determine_enterprise_statuses(names)
+
+            # 必要最小限の情報（証券コード・企業名）がない行は除く
+            valid = self._is_filled(symbols) & self._is_filled(names)
+
+            companies = [
+                CompanyInfo(
+                    symbol=symbol,
+                    name=name,
+                    sector=sector or "Unknown",
+                    market=market or "Unknown",
+                    employees=None,  # JPXファイルには通常含まれない
+                    revenue=None,  # JPXファイルには通常含まれない
+                    is_enterprise=enterprise,
+                )
+                for symbol, name, sector, market, enterprise in zip(
+                    symbols[valid],
+                    names[valid],
+                    sectors[valid],
+                    markets[valid],
+                    is_enterprise[valid].tolist(),
+                )
+            ]
 
             logger.info(f"JPXファイルから {len(companies)} 社の情報を抽出しました")
             return companies
@@ -73,71 +109,70 @@ class JPXFileParseService:
             logger.error(f"JPXファイルの解析に失敗: {e}")
             return []
 
-    def _extract_company_info(self, row: pd.Series) -> Optional[dict]:
+    def _read_excel(self, file_path: Path) -> Optional[pd.DataFrame]:
         """
-        行データから企業情報を抽出
-        JPXファイルの実際の構造に応じてカスタマイズが必要
+        EXCEL_ENGINESの順にエンジンを試してExcelファイルを読み込む
+
+        calamineが使えない環境（未インストール、pandas 2.2未満）では従来のエンジンで読み込む。
+        openpyxlはpandas側で読み取り専用モードで開かれるため、ここでは列の絞り込みだけを行う。
+        値はすべて文字列として読み込み（欠損はNaNのまま）、列ごとの型推定を省く。
         """
-        try:
-            # 一般的な列名パターンを想定
-            symbol_candidates = ["コード", "Code", "Symbol", "銘柄コード", "証券コード"]
-            name_candidates = ["銘柄名", "Name", "会社名", "企業名"]
-            sector_candidates = ["業種", "Sector", "33業種区分", "17業種区分"]
-            market_candidates = ["市場・商品区分", "Market", "上場区分", "市場区分"]
-
-            symbol = None
-            name = None
-            sector = None
-            market = None
-
-            # シンボル（証券コード）の抽出
-            for candidate in symbol_candidates:
-                if candidate in row.index and pd.notna(row[candidate]):
-                    symbol = str(row[candidate]).strip()
-                    # 4桁の数字のみ抽出
-                    if symbol.isdigit() and len(symbol) == 4:
-                        break
-                    # 4桁 + .T の形式から4桁のみ抽出
-                    if "." in symbol:
-                        symbol = symbol.split(".")[0]
-                        if symbol.isdigit() and len(symbol) == 4:
-                            break
-
-            # 企業名の抽出
-            for candidate in name_candidates:
-                if candidate in row.index and pd.notna(row[candidate]):
-                    name = str(row[candidate]).strip()
-                    break
-
-            # 業種の抽出
-            for candidate in sector_candidates:
-                if candidate in row.index and pd.notna(row[candidate]):
-                    sector = str(row[candidate]).strip()
-                    break
-
-            # 市場区分の抽出
-            for candidate in market_candidates:
-                if candidate in row.index and pd.notna(row[candidate]):
-                    market = str(row[candidate]).strip()
-                    break
-
-            # 必要最小限の情報があるかチェック
-            if not symbol or not name:
-                return None
-
-            # エンタープライズ企業の判定（基本的な条件）
-            is_enterprise = determine_enterprise_status(name, sector, market)
-
-            return {
-                "symbol": symbol,
-                "name": name,
-                "sector": sector or "Unknown",
-                "market": market or "Unknown",
-                "employees": None,  # JPXファイルには通常含まれない
-                "revenue": None,  # JPXファイルには通常含まれない
-                "is_enterprise": is_enterprise,
-            }
+        for engine in EXCEL_ENGINES:
+            try:
+                return pd.read_excel(
+                    file_path,
+                    engine=engine,
+                    usecols=lambda column: column in JPX_COLUMNS,
+                    dtype=str,
+                )
+            except Exception as e:
+                logger.debug("Excelエンジン %s での読み込みに失敗: %s", engine, e)
+        return None
+
+    def _resolve_columns(self, df_columns: pd.Index) -> dict[str, tuple[str, ...]]:
+        """
+        項目ごとに、ファイルに存在する列名の候補を優先順に解決
+        """
+        return {
+            field: tuple(c for c in candidates if c in df_columns)
+            for field, candidates in COLUMN_CANDIDATES.items()
+        }
 
-        except Exception as e:
-            logger.warning(f"企業情報抽出エラー: {e}")
-            return None
+    def _extract_symbols(self, df: pd.DataFrame, candidates: tuple[str, ...]) -> pd.Series:
+        """
+        候補の列から証券コードを列単位で抽出
+
+        行ごとに、4桁の数字（"7203.T" の形式は "." より前）になる最初の列の値を採用する。
+        4桁の数字になる列がない行は、値のある最後の列の値を採用する（"130A" などの英字入りコード）。
+        値のある列がない行はNoneになる。
+        """
+        symbols = pd.Series(None, index=df.index, dtype=object)
+        found = pd.Series(False, index=df.index)
+        for candidate in candidates:
+            column = df[candidate]
+            present = column.notna()
+            normalized = column.astype(str).str.strip().str.split(".", n=1).str[0]
+            # 4桁のコードがまだ見つかっていない行だけ上書きする
+            symbols = symbols.mask(present & ~found, normalized)
+            found |= present & normalized.str.fullmatch(r"\d{4}")
+        return symbols
+
+    @staticmethod
+    def _first_values(df: pd.DataFrame, candidates: tuple[str, ...]) -> pd.Series:
+        """
+        候補の列のうち、行ごとに最初に値のある列の値を前後の空白を除いた文字列で返す
+
+        値のある列がない行はNoneになる（NaNのままだと真と評価され、"Unknown" への置き換えが効かない）。
+        """
+        values = pd.Series(None, index=df.index, dtype=object)
+        for candidate in candidates:
+            column = df[candidate]
+            values = values.mask(values.isna() & column.notna(), column.astype(str).str.strip())
+        return values.replace({np.nan: None})
+
+    @staticmethod
+    def _is_filled(values: pd.Series) -> pd.Series:
+        """
+        値があり、空文字でない行をTrueとするマスクを返す
+        """
+        return values.notna() & (values != "")
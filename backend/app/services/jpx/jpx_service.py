@@ -1,3 +1,4 @@
+from dataclasses import asdict
 from typing import Optional
 
 from app.config.logging_config import get_service_logger
@@ -28,8 +29,8 @@ class JPXService:
                 logger.warning("JPXデータが空です")
                 return False
 
-            # データベースに保存
-            success = self.db_manager.insert_companies(companies_data)
+            # データベースに保存（DB行の辞書はここで初めて作る）
+            success = self.db_manager.insert_companies([asdict(c) for c in companies_data])
 
             if success:
                 logger.info(f"JPXデータ更新完了: {len(companies_data)} 件")
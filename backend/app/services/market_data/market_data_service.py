@@ -1,17 +1,91 @@
 import hashlib
 import logging
+import threading
 import time
-from typing import Optional
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Optional, TypeVar
 
 import pandas as pd
 import yfinance as yf
+from curl_cffi import requests as curl_requests
 
-from app.config.settings import YFINANCE_REQUEST_DELAY
+from app.config.settings import (
+    TICKER_INFO_UPDATE_INTERVAL_DAYS,
+    YFINANCE_MAX_WORKERS,
+    YFINANCE_REQUEST_DELAY,
+)
 from app.database.database_manager import DatabaseManager
+from app.utils.symbol import format_symbol
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_yfinance_session: Optional[curl_requests.Session] = None
+
+
+def get_yfinance_session() -> curl_requests.Session:
+    """
+    yfinanceの全リクエストで共有するHTTPセッションを取得
+
+    銘柄ごとにTLS接続を張り直さないよう、プロセス内で1つのセッションを使い回す。
+    curl_cffiのセッションはスレッドごとに接続を保持するため、並列取得でも共有できる。
+    """
+    global _yfinance_session
+    if _yfinance_session is None:
+        _yfinance_session = curl_requests.Session(impersonate="chrome")
+    return _yfinance_session
+
+
+# 同じ実行内で同じ銘柄を再取得しないよう、取得結果をメモ化する（例外は記録されない）
+@lru_cache(maxsize=4096)
+def _fetch_yfinance_info(yf_ticker: str) -> dict:
+    """
+    yfinanceからティッカー情報を取得
+
+    従業員数・売上高・財務指標はquoteSummaryにしか含まれず、複数銘柄をまとめて
+    取得できるv7/finance/quoteでは揃わないため、銘柄ごとに取得する。
+    """
+    # レート制限の適用（キャッシュヒット時は待たない）
+    time.sleep(YFINANCE_REQUEST_DELAY)
+
+    ticker = yf.Ticker(yf_ticker, session=get_yfinance_session())
+    info: dict = ticker.info
+    return info
+
+
+_inflight_info: dict[str, "Future[dict]"] = {}
+_inflight_info_lock = threading.Lock()
+
+
+def _fetch_yfinance_info_coalesced(yf_ticker: str) -> dict:
+    """
+    同じ銘柄のティッカー情報取得が実行中であれば、その結果を待って共有する
+
+    メモ化だけでは同時に来た同一銘柄の問い合わせがそれぞれyfinanceに飛ぶため、
+    実行中の取得をFutureで束ねる。取得時の例外も待機中の呼び出し元に伝える。
+    """
+    with _inflight_info_lock:
+        future = _inflight_info.get(yf_ticker)
+        is_owner = future is None
+        if future is None:
+            future = Future()
+            _inflight_info[yf_ticker] = future
+
+    if is_owner:
+        try:
+            future.set_result(_fetch_yfinance_info(yf_ticker))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with _inflight_info_lock:
+                del _inflight_info[yf_ticker]
+
+    return future.result()
+
 
 class MarketDataService:
     """市場データ収集を担当するサービスクラス"""
@@ -19,7 +93,16 @@ class MarketDataService:
     def __init__(self, db_manager: Optional[DatabaseManager] = None) -> None:
         self.db_manager = db_manager or DatabaseManager()
 
-    def get_ticker_info_update_interval_days(self, symbol: str, base_days: int = 14) -> int:
+    @staticmethod
+    def clear_cache() -> None:
+        """
+        メモ化したyfinanceのティッカー情報を破棄
+        """
+        _fetch_yfinance_info.cache_clear()
+
+    def get_ticker_info_update_interval_days(
+        self, symbol: str, base_days: int = TICKER_INFO_UPDATE_INTERVAL_DAYS
+    ) -> int:
         """
         銘柄のハッシュ値に基づいて更新間隔を分散
         """
@@ -30,55 +113,30 @@ class MarketDataService:
     def collect_stock_prices(self, symbols: list[str]) -> dict[str, bool]:
         """
         株価データを収集
+
+        yfinanceからの取得はスレッドで並列に行い、DBへの保存は呼び出し元スレッドで順に行う。
         """
         results = {}
 
         logger.info(f"株価データ収集開始: {len(symbols)} 銘柄")
 
-        for i, symbol in enumerate(symbols):
-            if (i + 1) % 50 == 0:
-                logger.info(f"進捗: {i + 1}/{len(symbols)}")
+        for symbol, price_data in self._fetch_concurrently(symbols, self._fetch_stock_prices):
+            if price_data is None:
+                results[symbol] = False
+                continue
 
             try:
-                # レート制限の適用
-                time.sleep(YFINANCE_REQUEST_DELAY)
-
-                # 日本株式のティッカー形式に変換
-                yf_ticker = f"{symbol}.T"
-
-                # 過去1年分のデータを取得
-                ticker = yf.Ticker(yf_ticker)
-                hist = ticker.history(period="1y")
-
-                if hist.empty:
-                    logger.warning(f"株価データが空です: {symbol}")
-                    results[symbol] = False
-                    continue
-
-                # データベース形式に変換
-                index_dates = [ts.date() for ts in pd.to_datetime(hist.index).to_pydatetime()]
-                price_data = pd.DataFrame(
-                    {
-                        "date": index_dates,
-                        "open": hist["Open"],
-                        "high": hist["High"],
-                        "low": hist["Low"],
-                        "close": hist["Close"],
-                        "volume": hist["Volume"],
-                    }
-                )
-
                 # データベースに保存
                 success = self.db_manager.insert_stock_prices(symbol, price_data)
                 results[symbol] = success
 
                 if success:
-                    logger.debug(f"株価データ保存完了: {symbol}")
+                    logger.debug("株価データ保存完了: %s", symbol)
                 else:
                     logger.error(f"株価データ保存失敗: {symbol}")
 
             except Exception as e:
-                logger.error(f"株価データ収集エラー {symbol}: {e}")
+                logger.error(f"株価データ保存エラー {symbol}: {e}")
                 results[symbol] = False
 
         success_count = sum(1 for success in results.values() if success)
@@ -89,41 +147,30 @@ class MarketDataService:
     def collect_ticker_info(self, symbols: list[str]) -> dict[str, bool]:
         """
         ティッカー情報を収集
+
+        yfinanceからの取得はスレッドで並列に行い、DBへの保存は呼び出し元スレッドで順に行う。
         """
         results = {}
 
         logger.info(f"ティッカー情報収集開始: {len(symbols)} 銘柄")
 
-        for i, symbol in enumerate(symbols):
-            if (i + 1) % 50 == 0:
-                logger.info(f"進捗: {i + 1}/{len(symbols)}")
+        for symbol, info in self._fetch_concurrently(symbols, self._fetch_ticker_info):
+            if info is None:
+                results[symbol] = False
+                continue
 
             try:
-                # レート制限の適用
-                time.sleep(YFINANCE_REQUEST_DELAY)
-
-                # 日本株式のティッカー形式に変換
-                yf_ticker = f"{symbol}.T"
-
-                ticker = yf.Ticker(yf_ticker)
-                info = ticker.info
-
-                if not info:
-                    logger.warning(f"ティッカー情報が空です: {symbol}")
-                    results[symbol] = False
-                    continue
-
                 # データベースに保存
                 success = self.db_manager.insert_ticker_info(symbol, info)
                 results[symbol] = success
 
                 if success:
-                    logger.debug(f"ティッカー情報保存完了: {symbol}")
+                    logger.debug("ティッカー情報保存完了: %s", symbol)
                 else:
                     logger.error(f"ティッカー情報保存失敗: {symbol}")
 
             except Exception as e:
-                logger.error(f"ティッカー情報収集エラー {symbol}: {e}")
+                logger.error(f"ティッカー情報保存エラー {symbol}: {e}")
                 results[symbol] = False
 
         success_count = sum(1 for success in results.values() if success)
@@ -131,6 +178,86 @@ class MarketDataService:
 
         return results
 
+    def _fetch_concurrently(
+        self, symbols: list[str], fetch: Callable[[str], Optional[T]]
+    ) -> Iterator[tuple[str, Optional[T]]]:
+        """
+        銘柄ごとの取得処理をスレッドで並列に実行し、完了した順に結果を返す
+
+        quoteSummaryの直接呼び出しにはyfinanceが管理するcookie/crumbが必要なため、
+        asyncioで独自に問い合わせず、yfinanceの同期APIをスレッドで並列化する。
+        同時実行数はYahooのレート制限に合わせてYFINANCE_MAX_WORKERSで抑えている。
+
+        Args:
+            symbols: 銘柄コードのリスト
+            fetch: 1銘柄分を取得する関数（失敗時はNoneを返す）
+
+        Yields:
+            (銘柄コード, 取得結果) のタプル
+        """
+        with ThreadPoolExecutor(max_workers=YFINANCE_MAX_WORKERS) as executor:
+            futures = {executor.submit(fetch, symbol): symbol for symbol in symbols}
+
+            for i, future in enumerate(as_completed(futures)):
+                if (i + 1) % 50 == 0:
+                    logger.info(f"進捗: {i + 1}/{len(symbols)}")
+
+                yield futures[future], future.result()
+
+    def _fetch_stock_prices(self, symbol: str) -> Optional[pd.DataFrame]:
+        """
+        yfinanceから過去1年分の株価データを取得し、データベース形式に変換
+        """
+        try:
+            # レート制限の適用
+            time.sleep(YFINANCE_REQUEST_DELAY)
+
+            # 日本株式のティッカー形式に変換
+            yf_ticker = format_symbol(symbol)
+
+            # 過去1年分のデータを取得
+            ticker = yf.Ticker(yf_ticker, session=get_yfinance_session())
+            hist = ticker.history(period="1y")
+
+            if hist.empty:
+                logger.warning(f"株価データが空です: {symbol}")
+                return None
+
+            # データベース形式に変換
+            index_dates = [ts.date() for ts in pd.to_datetime(hist.index).to_pydatetime()]
+            return pd.DataFrame(
+                {
+                    "date": index_dates,
+                    "open": hist["Open"],
+                    "high": hist["High"],
+                    "low": hist["Low"],
+                    "close": hist["Close"],
+                    "volume": hist["Volume"],
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"株価データ収集エラー {symbol}: {e}")
+            return None
+
+    def _fetch_ticker_info(self, symbol: str) -> Optional[dict]:
+        """
+        yfinanceからティッカー情報を取得
+        """
+        try:
+            # 日本株式のティッカー形式に変換
+            info = _fetch_yfinance_info_coalesced(format_symbol(symbol))
+
+            if not info:
+                logger.warning(f"ティッカー情報が空です: {symbol}")
+                return None
+
+            return info
+
+        except Exception as e:
+            logger.error(f"ティッカー情報収集エラー {symbol}: {e}")
+            return None
+
     def update_stock_data(self, symbols: list[str]) -> dict[str, object]:
         """
         株価データとティッカー情報の差分更新
@@ -143,23 +270,22 @@ class MarketDataService:
         price_symbols_to_update = []
         ticker_symbols_to_update = []
 
+        # 保存済みの最新株価日付・ティッカー情報の更新日は、それぞれ1回のクエリでまとめて取得する
+        latest_price_dates = self.db_manager.get_latest_price_dates(symbols)
+        latest_ticker_dates = self.db_manager.get_latest_ticker_info_dates(symbols)
+
         for symbol in symbols:
             # 価格データの更新判定
-            latest_price_data = self.db_manager.get_latest_stock_price_date(symbol)
-            if latest_price_data is None:
+            latest_price_date = latest_price_dates.get(symbol)
+            if latest_price_date is None or latest_price_date.date() < yesterday:
                 price_symbols_to_update.append(symbol)
-            elif isinstance(latest_price_data, pd.Timestamp):
-                if latest_price_data.date() < yesterday:
-                    price_symbols_to_update.append(symbol)
-            elif hasattr(latest_price_data, "date"):
-                if latest_price_data.date() < yesterday:
-                    price_symbols_to_update.append(symbol)
 
             # ティッカー情報の更新判定（分散間隔）
+            # 間隔内に保存済みの銘柄はyfinanceに問い合わせず、DBの値をそのまま使う
             interval_days = self.get_ticker_info_update_interval_days(symbol)
             threshold_date = datetime.date.today() - datetime.timedelta(days=interval_days)
 
-            latest_ticker_date = self.db_manager.get_latest_ticker_info_date(symbol)
+            latest_ticker_date = latest_ticker_dates.get(symbol)
             if latest_ticker_date is None:
                 ticker_symbols_to_update.append(symbol)
             elif latest_ticker_date.date() < threshold_date:
@@ -1,15 +1,37 @@
 """ポートフォリオのCRUD操作を行うサービス。"""
 
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.config.models import PortfolioValuation
+from app.config.settings import (
+    PORTFOLIO_VALUATION_CACHE_MAXSIZE,
+    PORTFOLIO_VALUATION_CACHE_TTL_SECONDS,
+)
 from app.database import models
 
 MAX_PORTFOLIOS_PER_USER = 10
 
+# ポートフォリオID → (有効期限, 世代, 評価額)。サービスはリクエストごとに生成されるため、プロセス内で共有する
+_valuation_cache: OrderedDict[int, tuple[float, tuple[int, int], PortfolioValuation]] = (
+    OrderedDict()
+)
+_valuation_cache_lock = threading.Lock()
+# ポートフォリオID → 世代。invalidate_cache で進め、破棄前に計算を始めた評価額を書き戻さない
+_valuation_generations: dict[int, int] = {}
+# clear_cache で進める全体の世代
+_valuation_cache_epoch = 0
+
+
+def _valuation_generation(portfolio_id: int) -> tuple[int, int]:
+    """評価額のキャッシュの現在の世代を返す（_valuation_cache_lock を取得して呼び出す）"""
+    return _valuation_cache_epoch, _valuation_generations.get(portfolio_id, 0)
+
 
 class PortfolioService:
     """ポートフォリオを管理するサービス。"""
@@ -39,8 +61,13 @@ class PortfolioService:
         Raises:
             HTTPException: ユーザーが既に上限数のポートフォリオを持っている場合
         """
-        # ユーザーあたり最大数チェック
-        count = self.db.query(models.Portfolio).filter(models.Portfolio.user_id == user_id).count()
+        # ユーザーあたり最大数チェック（上限数まで数えれば判定できるため、LIMITで打ち切る）
+        count = (
+            self.db.query(models.Portfolio.id)
+            .filter(models.Portfolio.user_id == user_id)
+            .limit(MAX_PORTFOLIOS_PER_USER)
+            .count()
+        )
         if count >= MAX_PORTFOLIOS_PER_USER:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,7 +83,6 @@ class PortfolioService:
         )
         self.db.add(portfolio)
         self.db.commit()
-        self.db.refresh(portfolio)
 
         return portfolio
 
@@ -121,7 +147,7 @@ class PortfolioService:
             portfolio.initial_capital = initial_capital
 
         self.db.commit()
-        self.db.refresh(portfolio)
+        self.invalidate_cache(portfolio_id)
 
         return portfolio
 
@@ -142,87 +168,105 @@ class PortfolioService:
 
         self.db.delete(portfolio)
         self.db.commit()
+        self.invalidate_cache(portfolio_id)
+
+    @staticmethod
+    def clear_cache() -> None:
+        """評価額のキャッシュをすべて破棄する。"""
+        global _valuation_cache_epoch
+        with _valuation_cache_lock:
+            _valuation_cache.clear()
+            _valuation_cache_epoch += 1
+
+    @staticmethod
+    def invalidate_cache(portfolio_id: int) -> None:
+        """ポートフォリオの評価額のキャッシュを破棄する（取引の記録後に呼び出す）。
+
+        Args:
+            portfolio_id: ポートフォリオID
+        """
+        with _valuation_cache_lock:
+            _valuation_cache.pop(portfolio_id, None)
+            _valuation_generations[portfolio_id] = _valuation_generations.get(portfolio_id, 0) + 1
 
-    def calculate_portfolio_value(self, portfolio_id: int) -> dict:
+    def calculate_portfolio_value(
+        self, portfolio_id: int, bypass_cache: bool = False
+    ) -> PortfolioValuation:
         """ポートフォリオの総評価額と損益を計算する。
 
+        計算結果は PORTFOLIO_VALUATION_CACHE_TTL_SECONDS の間メモリに保持し、
+        取引の記録時には invalidate_cache で破棄する。株価の更新はTTLの経過後に反映される。
+        計算中に invalidate_cache が呼ばれた場合、その計算結果はキャッシュに保存しない。
+
         Args:
             portfolio_id: ポートフォリオID
+            bypass_cache: Trueの場合はキャッシュを使わずに計算する（残高チェックなど）
 
         Returns:
-            total_value、total_profit_loss等を含む辞書
+            総評価額・総損益・損益率・現金残高
         """
-        portfolio = self.db.get(models.Portfolio, portfolio_id)
-        if not portfolio:
-            return {
-                "total_value": 0.0,
-                "total_profit_loss": 0.0,
-                "total_profit_loss_rate": 0.0,
-                "cash_balance": 0.0,
-            }
-
-        # ポジション一覧取得
-        positions = (
-            self.db.query(models.Position)
-            .filter(models.Position.portfolio_id == portfolio_id)
-            .all()
-        )
-
-        # 最新株価を一括取得してN+1問題を回避
-        symbols = [position.symbol for position in positions]
-        if symbols:
-            # サブクエリで各銘柄の最新日付を取得
-            latest_dates_subquery = (
-                self.db.query(
-                    models.StockPrice.symbol, func.max(models.StockPrice.date).label("max_date")
-                )
-                .filter(models.StockPrice.symbol.in_(symbols))
-                .group_by(models.StockPrice.symbol)
-                .subquery()
+        with _valuation_cache_lock:
+            generation = _valuation_generation(portfolio_id)
+            entry = None if bypass_cache else _valuation_cache.get(portfolio_id)
+            if entry is not None and entry[0] > time.monotonic() and entry[1] == generation:
+                return entry[2]
+
+        valuation = self._calculate_portfolio_value(portfolio_id)
+
+        with _valuation_cache_lock:
+            # 計算中にキャッシュが破棄された場合は、破棄前のデータによる結果を保存しない
+            if _valuation_generation(portfolio_id) != generation:
+                return valuation
+            _valuation_cache[portfolio_id] = (
+                time.monotonic() + PORTFOLIO_VALUATION_CACHE_TTL_SECONDS,
+                generation,
+                valuation,
             )
+            _valuation_cache.move_to_end(portfolio_id)
+            while len(_valuation_cache) > PORTFOLIO_VALUATION_CACHE_MAXSIZE:
+                _valuation_cache.popitem(last=False)
 
-            # 最新株価を一括取得
-            latest_prices = (
-                self.db.query(models.StockPrice)
-                .join(
-                    latest_dates_subquery,
-                    (models.StockPrice.symbol == latest_dates_subquery.c.symbol)
-                    & (models.StockPrice.date == latest_dates_subquery.c.max_date),
-                )
-                .all()
-            )
+        return valuation
 
-            # 銘柄コード -> 終値のマッピングを作成
-            price_map = {sp.symbol: float(sp.close) for sp in latest_prices if sp.close}
-        else:
-            price_map = {}
+    def _calculate_portfolio_value(self, portfolio_id: int) -> PortfolioValuation:
+        """ポートフォリオの総評価額と損益をDBから計算する。
+
+        取引の合計額はトリガーで更新されるportfoliosの集計列を使い、取引履歴は走査しない。
+
+        Args:
+            portfolio_id: ポートフォリオID
+
+        Returns:
+            総評価額・総損益・損益率・現金残高
+        """
+        # 集計列はDB側で更新されるため、セッション内の読み込み済みの値を使わず再取得する
+        portfolio = self.db.get(models.Portfolio, portfolio_id, populate_existing=True)
+        if not portfolio:
+            return PortfolioValuation(
+                total_value=0.0,
+                total_profit_loss=0.0,
+                total_profit_loss_rate=0.0,
+                cash_balance=0.0,
+            )
 
         # 各銘柄の評価額計算
-        total_position_value = 0.0
-        for position in positions:
-            if position.symbol in price_map:
-                current_price = price_map[position.symbol]
-                position_value = current_price * position.quantity
-                total_position_value += position_value
-
-        # 総購入額、総売却額、入金額、出金額を計算
-        transactions = (
-            self.db.query(models.Transaction)
-            .filter(models.Transaction.portfolio_id == portfolio_id)
+        # ポジションと最新株価はlatest_pricesと結合して1回のクエリで取得する（株価のない銘柄は除く）
+        position_prices = (
+            self.db.query(models.Position.quantity, models.LatestPrice.close)
+            .join(models.LatestPrice, models.LatestPrice.symbol == models.Position.symbol)
+            .filter(models.Position.portfolio_id == portfolio_id)
             .all()
         )
-        total_buy_amount = sum(
-            float(t.total_amount) for t in transactions if t.transaction_type == "buy"
-        )
-        total_sell_amount = sum(
-            float(t.total_amount) for t in transactions if t.transaction_type == "sell"
-        )
-        total_deposit = sum(
-            float(t.total_amount) for t in transactions if t.transaction_type == "deposit"
-        )
-        total_withdrawal = sum(
-            float(t.total_amount) for t in transactions if t.transaction_type == "withdrawal"
-        )
+        total_position_value = 0.0
+        for quantity, close in position_prices:
+            if close:
+                total_position_value += float(close) * quantity
+
+        # 総購入額、総売却額、入金額、出金額
+        total_buy_amount = float(portfolio.total_buy_amount)
+        total_sell_amount = float(portfolio.total_sell_amount)
+        total_deposit = float(portfolio.total_deposit)
+        total_withdrawal = float(portfolio.total_withdrawal)
 
         # 現金残高 = 初期資本 - 総購入額 + 総売却額 + 入金額 - 出金額
         cash_balance = (
@@ -247,9 +291,9 @@ class PortfolioService:
             (total_profit_loss / investment_base) * 100 if investment_base != 0 else 0.0
         )
 
-        return {
-            "total_value": total_value,
-            "total_profit_loss": total_profit_loss,
-            "total_profit_loss_rate": total_profit_loss_rate,
-            "cash_balance": cash_balance,
-        }
+        return PortfolioValuation(
+            total_value=total_value,
+            total_profit_loss=total_profit_loss,
+            total_profit_loss_rate=total_profit_loss_rate,
+            cash_balance=cash_balance,
+        )
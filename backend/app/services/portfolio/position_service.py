@@ -4,9 +4,11 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.database import models
+from app.services.portfolio.portfolio_service import PortfolioService
 
 
 class PositionService:
@@ -19,6 +21,8 @@ class PositionService:
             db: SQLAlchemyデータベースセッション
         """
         self.db = db
+        # 最新株価のキャッシュ（インスタンスはリクエストごとに作られるため、リクエスト内で共有）
+        self._price_cache: dict[str, float] = {}
 
     def buy_stock(
         self,
@@ -45,49 +49,94 @@ class PositionService:
         Raises:
             HTTPException: 株価データが見つからない場合
         """
-        # price未指定時は最新終値を取得
-        if not price:
-            price = self._get_latest_price(symbol)
+        transaction = self.buy_stocks(
+            portfolio_id,
+            [
+                {
+                    "symbol": symbol,
+                    "quantity": quantity,
+                    "price": price,
+                    "transaction_date": transaction_date,
+                    "notes": notes,
+                }
+            ],
+        )[0]
 
-        # 既存ポジション取得
-        position = (
-            self.db.query(models.Position)
-            .filter(models.Position.portfolio_id == portfolio_id, models.Position.symbol == symbol)
-            .first()
-        )
+        return transaction
+
+    def buy_stocks(self, portfolio_id: int, trades: list[dict]) -> list[models.Transaction]:
+        """複数の購入をまとめて記録し、ポジションを更新する。
 
-        if position:
-            # 加重平均計算
-            total_cost = float(position.average_price) * position.quantity + price * quantity
-            total_quantity = position.quantity + quantity
-            position.average_price = total_cost / total_quantity
-            position.quantity = total_quantity
-        else:
-            # 新規ポジション作成
-            position = models.Position(
+        既存ポジションと最新株価はそれぞれ1回のクエリで取得し、コミットは最後に1回だけ行う。
+
+        Args:
+            portfolio_id: ポートフォリオID
+            trades: 購入内容のリスト（symbol、quantity、price、transaction_date、notesの辞書。
+                symbol、quantity以外は省略可能で、意味はbuy_stockの引数と同じ）
+
+        Returns:
+            作成された取引記録のリスト（tradesと同じ順序）
+
+        Raises:
+            HTTPException: 株価データが見つからない場合（いずれの購入も記録しない）
+        """
+        symbols = {trade["symbol"] for trade in trades}
+
+        # price未指定の銘柄の最新終値をまとめて取得（ポジションを変更する前にすべて確定させる）
+        self._load_latest_prices({trade["symbol"] for trade in trades if not trade.get("price")})
+        prices = [trade.get("price") or self._get_latest_price(trade["symbol"]) for trade in trades]
+
+        # 既存ポジションをまとめて取得
+        positions = {
+            position.symbol: position
+            for position in self.db.query(models.Position).filter(
+                models.Position.portfolio_id == portfolio_id, models.Position.symbol.in_(symbols)
+            )
+        }
+
+        # 新規ポジションと取引はまとめてセッションに追加し、テーブルごとに一括でINSERTさせる
+        transactions = []
+        new_positions = []
+        for trade, price in zip(trades, prices):
+            symbol = trade["symbol"]
+            quantity = trade["quantity"]
+
+            position = positions.get(symbol)
+            if position:
+                # 加重平均計算
+                total_cost = float(position.average_price) * position.quantity + price * quantity
+                total_quantity = position.quantity + quantity
+                position.average_price = total_cost / total_quantity
+                position.quantity = total_quantity
+            else:
+                # 新規ポジション作成
+                position = models.Position(
+                    portfolio_id=portfolio_id,
+                    symbol=symbol,
+                    quantity=quantity,
+                    average_price=price,
+                )
+                new_positions.append(position)
+                positions[symbol] = position
+
+            # トランザクション記録
+            transaction = models.Transaction(
                 portfolio_id=portfolio_id,
                 symbol=symbol,
+                transaction_type="buy",
                 quantity=quantity,
-                average_price=price,
+                price=price,
+                total_amount=price * quantity,
+                transaction_date=trade.get("transaction_date") or datetime.now(timezone.utc),
+                notes=trade.get("notes"),
             )
-            self.db.add(position)
+            transactions.append(transaction)
 
-        # トランザクション記録
-        transaction = models.Transaction(
-            portfolio_id=portfolio_id,
-            symbol=symbol,
-            transaction_type="buy",
-            quantity=quantity,
-            price=price,
-            total_amount=price * quantity,
-            transaction_date=transaction_date or datetime.now(timezone.utc),
-            notes=notes,
-        )
-        self.db.add(transaction)
+        self.db.add_all([*new_positions, *transactions])
         self.db.commit()
-        self.db.refresh(transaction)
+        PortfolioService.invalidate_cache(portfolio_id)
 
-        return transaction
+        return transactions
 
     def sell_stock(
         self,
@@ -115,11 +164,11 @@ class PositionService:
             HTTPException: 保有株数が不足している場合、または株価データが見つからない場合
         """
         # 保有チェック
-        position = (
-            self.db.query(models.Position)
-            .filter(models.Position.portfolio_id == portfolio_id, models.Position.symbol == symbol)
-            .first()
-        )
+        position = self.db.scalars(
+            select(models.Position).where(
+                models.Position.portfolio_id == portfolio_id, models.Position.symbol == symbol
+            )
+        ).first()
 
         if not position or position.quantity < quantity:
             raise HTTPException(
@@ -152,12 +201,30 @@ class PositionService:
         )
         self.db.add(transaction)
         self.db.commit()
-        self.db.refresh(transaction)
+        PortfolioService.invalidate_cache(portfolio_id)
 
         return transaction
 
+    def _load_latest_prices(self, symbols: set[str]) -> None:
+        """latest_pricesテーブルから複数銘柄の最新の株価をまとめてキャッシュに読み込む。
+
+        Args:
+            symbols: 銘柄コードの集合（キャッシュ済みの銘柄は問い合わせない）
+        """
+        missing = symbols.difference(self._price_cache)
+        if not missing:
+            return
+
+        for symbol, close in self.db.query(
+            models.LatestPrice.symbol, models.LatestPrice.close
+        ).filter(models.LatestPrice.symbol.in_(missing)):
+            if close:
+                self._price_cache[symbol] = float(close)
+
     def _get_latest_price(self, symbol: str) -> float:
-        """stock_pricesテーブルから最新の株価を取得する。
+        """latest_pricesテーブルから最新の株価を取得する。
+
+        同じインスタンスでの2回目以降の呼び出しはキャッシュした値を返す。
 
         Args:
             symbol: 銘柄コード
@@ -168,12 +235,10 @@ class PositionService:
         Raises:
             HTTPException: 株価データが見つからない場合
         """
-        latest = (
-            self.db.query(models.StockPrice)
-            .filter(models.StockPrice.symbol == symbol)
-            .order_by(models.StockPrice.date.desc())
-            .first()
-        )
+        if symbol in self._price_cache:
+            return self._price_cache[symbol]
+
+        latest = self.db.get(models.LatestPrice, symbol)
 
         if not latest or not latest.close:
             raise HTTPException(
@@ -181,4 +246,6 @@ class PositionService:
                 detail=f"銘柄 {symbol} の株価データが見つかりません",
             )
 
-        return float(latest.close)
+        price = float(latest.close)
+        self._price_cache[symbol] = price
+        return price
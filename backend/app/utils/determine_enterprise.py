@@ -1,81 +1,77 @@
-from typing import Optional
+import re
+from collections.abc import Iterable
 
+import pandas as pd
 
-def determine_enterprise_status(name: str, sector: Optional[str], market: Optional[str]) -> bool:
+# 中小企業を除外するキーワード
+EXCLUDE_KEYWORDS = (
+    "投資",
+    "不動産投資",
+    "REIT",
+    "リート",
+    "ファンド",
+    "投資法人",
+    "投資信託",
+    "ホールディングス",
+    "HD",
+)
+
+# 小規模企業を示すキーワード
+SMALL_COMPANY_KEYWORDS = (
+    "地域",
+    "県内",
+    "市内",
+    "ローカル",
+)
+
+# エンタープライズ企業を示すキーワード（今後の拡張用）
+# enterprise_keywords = [
+#     '株式会社', '(株)', 'Corp', 'Corporation',
+#     'Ltd', 'Limited', 'Inc', 'Incorporated',
+#     'Holdings', 'Group', 'グループ'
+# ]
+
+
+def _compile_keywords(keywords: Iterable[str]) -> re.Pattern[str]:
+    """
+    キーワードのいずれかを部分一致で探す正規表現をコンパイル
+
+    他のキーワードを含むキーワード（"投資" に対する "投資法人" など）は結果を変えないため除く。
+    """
+    keywords = set(keywords)
+    required = sorted(k for k in keywords if not any(o != k and o in k for o in keywords))
+    return re.compile("|".join(map(re.escape, required)))
+
+
+# 呼び出しごとにキーワードを走査しないよう、import時に一度だけコンパイルする
+# 除外・小規模企業のキーワードは1つの正規表現にまとめ、企業名を1回の走査で照合する
+_NON_ENTERPRISE_RE = _compile_keywords(EXCLUDE_KEYWORDS + SMALL_COMPANY_KEYWORDS)
+
+
+def determine_enterprise_status(name: str) -> bool:
     """
     企業がエンタープライズ企業かどうかを判定
     基本的な条件で判定（後でより詳細な条件に更新可能）
+
+    現在は企業名の除外キーワードだけで判定し、市場区分・業種は照合しない。
     """
-    # 中小企業を除外するキーワード
-    exclude_keywords = [
-        "投資",
-        "不動産投資",
-        "REIT",
-        "リート",
-        "ファンド",
-        "投資法人",
-        "投資信託",
-        "ホールディングス",
-        "HD",
-    ]
-
-    # 小規模企業を示すキーワード
-    small_company_keywords = [
-        "地域",
-        "県内",
-        "市内",
-        "ローカル",
-    ]
-
-    # エンタープライズ企業を示すキーワード（今後の拡張用）
-    # enterprise_keywords = [
-    #     '株式会社', '(株)', 'Corp', 'Corporation',
-    #     'Ltd', 'Limited', 'Inc', 'Incorporated',
-    #     'Holdings', 'Group', 'グループ'
-    # ]
-
-    # 除外キーワードがある場合は非エンタープライズ
-    for keyword in exclude_keywords:
-        if keyword in name:
-            return False
-
-    # 小規模企業キーワードがある場合は非エンタープライズ
-    for keyword in small_company_keywords:
-        if keyword in name:
-            return False
-
-    # 市場区分による判定
-    if market:
-        if any(
-            premium_market in market for premium_market in ["プライム", "Prime", "東証1部", "1部"]
-        ):
-            return True
-        elif any(
-            standard_market in market
-            for standard_market in ["スタンダード", "Standard", "東証2部", "2部"]
-        ):
-            return True
-
-    # 業種による判定
-    if sector:
-        enterprise_sectors = [
-            "製造業",
-            "情報・通信業",
-            "電気・ガス業",
-            "運輸・郵便業",
-            "卸売・小売業",
-            "金融・保険業",
-            "建設業",
-            "医薬品",
-            "化学",
-            "機械",
-            "電気機器",
-            "輸送用機器",
-            "精密機器",
-        ]
-        for enterprise_sector in enterprise_sectors:
-            if enterprise_sector in sector:
-                return True
-
-    # デフォルトでは True（保守的な判定）
+    # 除外キーワード・小規模企業キーワードがある場合は非エンタープライズ
+    if _NON_ENTERPRISE_RE.search(name):
+        return False
+
+    # 市場区分・業種に関わらず True（保守的な判定）
     return True
+
+
+def determine_enterprise_statuses(names: pd.Series) -> pd.Series:
+    """
+    determine_enterprise_status を企業名の列にまとめて適用
+
+    企業名の列を正規表現で1回走査し、行ごとに関数を呼ばずに判定する。
+    企業名がない行は除外キーワードを含まないものとして扱う。
+
+    Returns:
+        names と同じインデックスの真偽値のSeries
+    """
+    # 判定条件は determine_enterprise_status と同じ
+    return ~names.str.contains(_NON_ENTERPRISE_RE, na=False)
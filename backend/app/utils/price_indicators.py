@@ -1,15 +1,60 @@
+import numpy as np
 import pandas as pd
 
-from app.config.constants import VOLUME_MA_PERIOD
+from app.config.constants import (
+    MACD_FAST_PERIOD,
+    MACD_SIGNAL_PERIOD,
+    MACD_SLOW_PERIOD,
+    VOLUME_MA_PERIOD,
+)
 from app.config.settings import MA_PERIOD
 from app.utils.numeric import is_valid_number
 
 
+def _rolling_mean(values: pd.Series, period: int) -> pd.Series:
+    """
+    期間がそろった区間のみの移動平均を計算
+    """
+    return values.rolling(window=period, min_periods=period).mean()
+
+
 def calculate_moving_average(prices: pd.Series, period: int = MA_PERIOD) -> pd.Series:
     """
     移動平均を計算
     """
-    return prices.rolling(window=period, min_periods=period).mean()
+    return _rolling_mean(prices, period)
+
+
+def calculate_ema(prices: pd.Series, period: int) -> pd.Series:
+    """
+    指数移動平均を計算
+
+    V_i = s * C_i + (1 - s) * V_{i-1}（s = 2 / (period + 1)）の漸化式で計算する。
+    """
+    return prices.ewm(span=period, adjust=False).mean()
+
+
+def calculate_macd(
+    prices: pd.Series,
+    fast_period: int = MACD_FAST_PERIOD,
+    slow_period: int = MACD_SLOW_PERIOD,
+    signal_period: int = MACD_SIGNAL_PERIOD,
+) -> pd.DataFrame:
+    """
+    MACDを計算
+
+    Args:
+        prices: 価格の系列
+        fast_period: 短期EMAの期間
+        slow_period: 長期EMAの期間
+        signal_period: シグナル線（MACDのEMA）の期間
+
+    Returns:
+        macd（短期EMA - 長期EMA）・signal・histogram（macd - signal）の列を持つDataFrame
+    """
+    macd = calculate_ema(prices, fast_period) - calculate_ema(prices, slow_period)
+    signal = calculate_ema(macd, signal_period)
+    return pd.DataFrame({"macd": macd, "signal": signal, "histogram": macd - signal})
 
 
 def calculate_divergence_rate(current_price: float, ma_price: float) -> float:
@@ -23,11 +68,35 @@ def calculate_divergence_rate(current_price: float, ma_price: float) -> float:
     return round(divergence, 2)
 
 
+def calculate_divergence_rates(prices: pd.Series, ma_prices: pd.Series) -> pd.Series:
+    """
+    移動平均からの乖離率を系列全体でまとめて計算
+
+    calculate_divergence_rate を要素ごとに呼ぶのと同じ結果を、NumPyのベクトル演算で求める。
+    移動平均が無効（NaN・無限大・0）の要素は0.0とする。
+
+    Args:
+        prices: 価格の系列
+        ma_prices: 移動平均の系列（pricesと同じインデックス）
+
+    Returns:
+        乖離率（%、小数第2位で丸め）の系列
+    """
+    price_values = prices.to_numpy(dtype=float)
+    ma_values = ma_prices.to_numpy(dtype=float)
+
+    invalid_ma = ~np.isfinite(ma_values) | (ma_values == 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        divergence = (price_values - ma_values) / ma_values * 100
+
+    return pd.Series(np.round(np.where(invalid_ma, 0.0, divergence), 2), index=prices.index)
+
+
 def calculate_volume_average(volumes: pd.Series, period: int = VOLUME_MA_PERIOD) -> pd.Series:
     """
     出来高の移動平均を計算
     """
-    return volumes.rolling(window=period, min_periods=period).mean()
+    return _rolling_mean(volumes, period)
 
 
 def calculate_price_change_percent(current_price: float, previous_price: float) -> float:
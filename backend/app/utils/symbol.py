@@ -1,6 +1,10 @@
 """銘柄コード（シンボル）に関するユーティリティ関数"""
 
+from functools import lru_cache
 
+
+# 銘柄数（約4000）ぶんの変換結果を保持し、バッチで繰り返し呼ばれても文字列を作り直さない
+@lru_cache(maxsize=8192)
 def format_symbol(symbol: str) -> str:
     """
     日本株のシンボルをyfinance形式に変換
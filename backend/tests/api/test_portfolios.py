@@ -210,6 +210,36 @@ async def test_buy_stock_success(
     assert float(position.average_price) == 3000.0
 
 
+@pytest.mark.asyncio
+async def test_buy_stock_without_price_uses_latest_close(
+    authenticated_client, test_user, db_session, create_company, create_stock_price
+) -> None:
+    """価格未指定の購入は最新の終値で約定する。"""
+    from datetime import datetime, timedelta
+
+    from app.database import models
+
+    create_company(symbol="7203", name="トヨタ自動車")
+    create_stock_price(symbol="7203", close=3100.0, date=datetime.now())
+    create_stock_price(symbol="7203", close=2900.0, date=datetime.now() - timedelta(days=1))
+
+    portfolio = models.Portfolio(
+        user_id=test_user.id,
+        name="Test Portfolio",
+        initial_capital=Decimal("1000000.00"),
+    )
+    db_session.add(portfolio)
+    db_session.commit()
+    db_session.refresh(portfolio)
+
+    res = await authenticated_client.post(
+        f"/api/portfolios/{portfolio.id}/positions/buy",
+        json={"symbol": "7203", "quantity": 100},
+    )
+    assert res.status_code == 200
+    assert res.json()["price"] == 3100.0
+
+
 @pytest.mark.asyncio
 async def test_buy_stock_multiple_times_weighted_average(
     authenticated_client, test_user, db_session, create_company, create_stock_price
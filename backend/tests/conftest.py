@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app.database import models
 from app.database.session import SessionLocal, engine
+from app.services.portfolio.portfolio_service import PortfolioService
 
 # 注意: DATABASE_PATH と SESSION_HTTPS_ONLY は pyproject.toml の
 # [tool.pytest.ini_options] env で設定されています（pytest-env）
@@ -27,6 +28,8 @@ def clean_db(db_engine_session):
 
     models.Base.metadata.drop_all(bind=engine)
     models.Base.metadata.create_all(bind=engine)
+    # テーブルを作り直すとIDが再利用されるため、評価額のキャッシュも破棄する
+    PortfolioService.clear_cache()
     yield
 
 
@@ -0,0 +1,150 @@
+"""AIStockAnalysisService unit tests."""
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.database import models
+from app.database.database_manager import DatabaseManager
+from app.services.ai_stock_analysis_service import AIStockAnalysisService, compute_prompt_hash
+
+
+class FakeClaudeService:
+    """Claude API呼び出し回数を記録するテスト用スタブ。"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    def send_message(self, prompt: str) -> str:
+        self.calls += 1
+        return "新規分析"
+
+    def extract_text_from_response(self, response: str) -> str:
+        return response
+
+
+@pytest.fixture
+def ai_service():
+    """Claude APIをスタブ化したAIStockAnalysisServiceを提供。"""
+    service = AIStockAnalysisService(DatabaseManager())
+    service.claude_service = FakeClaudeService()  # type: ignore[assignment]
+    return service
+
+
+@pytest.fixture
+def test_user(db_session):
+    """テスト用ユーザーを作成。"""
+    from app.utils.security import hash_password
+
+    user = models.User(
+        login_id="testuser",
+        display_name="Test User",
+        role="user",
+        status="active",
+        password_hash=hash_password("Test1234!"),
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+@pytest.fixture
+def test_company(db_session):
+    """テスト用企業と株価データを作成。"""
+    company = models.Company(symbol="1234", name="テスト株式会社", market="Prime", sector="化学")
+    db_session.add(company)
+    for i in range(5):
+        db_session.add(
+            models.StockPrice(
+                symbol="1234",
+                date=date.today() - timedelta(days=i),
+                close=Decimal("1000.00") + i,
+            )
+        )
+    db_session.commit()
+    return company
+
+
+class TestPromptReuse:
+    """同一プロンプトの分析結果再利用のテスト。"""
+
+    def test_compute_prompt_hash_is_stable(self):
+        """同じプロンプトからは同じハッシュが得られる。"""
+        assert compute_prompt_hash("abc") == compute_prompt_hash("abc")
+        assert compute_prompt_hash("abc") != compute_prompt_hash("abd")
+        assert len(compute_prompt_hash("abc")) == 32
+
+    def test_reuses_recent_completed_analysis(
+        self, ai_service, db_session, test_user, test_company
+    ):
+        """直近に同一プロンプトの完了済み分析があればAPIを呼ばずに再利用する。"""
+        first_id = ai_service.create_analysis_record(db_session, "1234", test_user.id)
+        asyncio.run(ai_service._perform_analysis("1234", first_id))
+
+        second_id = ai_service.create_analysis_record(db_session, "1234", test_user.id)
+        asyncio.run(ai_service._perform_analysis("1234", second_id))
+
+        db_session.expire_all()
+        first = db_session.get(models.AIStockAnalysis, first_id)
+        second = db_session.get(models.AIStockAnalysis, second_id)
+        assert ai_service.claude_service.calls == 1
+        assert second.status == "completed"
+        assert second.analysis_text == "新規分析"
+        assert second.prompt_hash == first.prompt_hash
+
+    def test_does_not_reuse_expired_analysis(self, ai_service, db_session, test_user, test_company):
+        """再利用期間を過ぎた分析結果は再利用しない。"""
+        db_session.add(
+            models.AIStockAnalysis(
+                symbol="1234",
+                user_id=test_user.id,
+                status="completed",
+                analysis_text="古い分析",
+                prompt_hash="a" * 32,
+                created_at=datetime.now(timezone.utc) - timedelta(hours=49),
+                completed_at=datetime.now(timezone.utc) - timedelta(hours=48),
+            )
+        )
+        db_session.commit()
+
+        assert ai_service.find_reusable_analysis_text(db_session, "a" * 32) is None
+        assert ai_service.find_reusable_analysis_text(db_session, "a" * 32, hours=72) == "古い分析"
+
+    def test_reuse_period_starts_at_completion(
+        self, ai_service, db_session, test_user, test_company
+    ):
+        """再利用期間は依頼時刻ではなく完了時刻から数える。"""
+        now = datetime.now(timezone.utc)
+        db_session.add_all(
+            [
+                # 依頼は古いが、直近に完了した分析は再利用する
+                models.AIStockAnalysis(
+                    symbol="1234",
+                    user_id=test_user.id,
+                    status="completed",
+                    analysis_text="直近に完了した分析",
+                    prompt_hash="b" * 32,
+                    created_at=now - timedelta(hours=48),
+                    completed_at=now - timedelta(minutes=1),
+                ),
+                # 完了時刻のない分析は再利用しない
+                models.AIStockAnalysis(
+                    symbol="1234",
+                    user_id=test_user.id,
+                    status="completed",
+                    analysis_text="完了時刻なし",
+                    prompt_hash="c" * 32,
+                    created_at=now,
+                ),
+            ]
+        )
+        db_session.commit()
+
+        assert ai_service.find_reusable_analysis_text(db_session, "b" * 32) == "直近に完了した分析"
+        assert ai_service.find_reusable_analysis_text(db_session, "c" * 32) is None
@@ -1,7 +1,12 @@
 """CompanyFilterService unit tests."""
 
+from datetime import date
+from decimal import Decimal
+
+import pandas as pd
 import pytest
 
+from app.config.models import FilterCriteria
 from app.database import models
 from app.services.filtering.company_filter_service import CompanyFilterService
 
@@ -71,3 +76,233 @@ class TestGetAllCompanies:
         result = company_filter_service.get_all_companies(limit=100)
 
         assert len(result) == 4  # 実際の企業数
+
+
+class TestFilterCompanies:
+    """filter_companies メソッドのテスト。"""
+
+    def test_specific_symbols(self, company_filter_service, test_companies):
+        """特定銘柄の指定では、データベースに存在する銘柄だけを指定順で返す。"""
+        result = company_filter_service.filter_companies(
+            FilterCriteria(specific_symbols=("9999", "0000", "1234"))
+        )
+
+        assert result == ["9999", "1234"]
+
+    def test_filters_by_latest_indicators(self, company_filter_service, test_companies, db_session):
+        """トリガーで同期した各銘柄の最新の技術指標で絞り込み、銘柄コードだけを返す。"""
+        db_session.add_all(
+            [
+                models.TechnicalIndicator(
+                    symbol="1234", date=date(2026, 9, 1), divergence_rate=1.0, dividend_yield=1.0
+                ),
+                models.TechnicalIndicator(
+                    symbol="1234", date=date(2026, 10, 1), divergence_rate=-8.0, dividend_yield=3.0
+                ),
+                models.TechnicalIndicator(
+                    symbol="5678", date=date(2026, 10, 1), divergence_rate=-2.0, dividend_yield=4.0
+                ),
+            ]
+        )
+        db_session.commit()
+
+        result = company_filter_service.filter_companies(
+            FilterCriteria(divergence_min=5.0, is_enterprise_only=False)
+        )
+
+        assert result == ["1234"]
+        latest = db_session.get(models.LatestTechnicalIndicator, "1234")
+        assert latest.date == date(2026, 10, 1)
+        assert float(latest.dividend_yield) == 3.0
+
+
+class TestInsertCompanies:
+    """DatabaseManager.insert_companies のテスト。"""
+
+    def test_updates_existing_and_inserts_new(self, company_filter_service, test_companies):
+        """既存銘柄は更新し、新規銘柄は追加する。重複した銘柄は後の値で上書きする。"""
+        db_manager = company_filter_service.db_manager
+
+        result = db_manager.insert_companies(
+            [
+                {"symbol": "1234", "name": "テスト株式会社（新）", "market": "Prime"},
+                {"symbol": "2345", "name": "新規上場", "market": "Growth"},
+                {"symbol": "2345", "name": "新規上場（訂正）", "market": "Growth"},
+            ]
+        )
+
+        assert result is True
+        assert db_manager.get_company_by_symbol("1234")["name"] == "テスト株式会社（新）"
+        assert db_manager.get_company_by_symbol("2345")["name"] == "新規上場（訂正）"
+        assert len(db_manager.get_companies()) == 5
+
+    def test_skips_invalid_rows(self, company_filter_service, test_companies):
+        """銘柄コード・銘柄名のない企業データはスキップし、残りを保存する。"""
+        db_manager = company_filter_service.db_manager
+
+        result = db_manager.insert_companies(
+            [
+                {"symbol": None, "name": "コードなし"},
+                {"symbol": "3456"},
+                {"symbol": "2345", "name": "新規上場", "market": "Growth"},
+            ]
+        )
+
+        assert result is True
+        assert db_manager.get_company_by_symbol("2345")["name"] == "新規上場"
+        assert db_manager.get_company_by_symbol("3456") is None
+        assert len(db_manager.get_companies()) == 5
+
+
+class TestInsertCompany:
+    """DatabaseManager.insert_company のテスト。"""
+
+    def test_upserts_by_symbol(self, company_filter_service, test_companies):
+        """既存銘柄は上書きし、新規銘柄は追加する。"""
+        db_manager = company_filter_service.db_manager
+
+        assert db_manager.insert_company({"symbol": "1234", "name": "テスト株式会社（新）"})
+        assert db_manager.insert_company({"symbol": "2345", "name": "新規上場"})
+
+        company = db_manager.get_company_by_symbol("1234")
+        assert company["name"] == "テスト株式会社（新）"
+        assert company["market"] is None
+        assert db_manager.get_company_by_symbol("2345")["name"] == "新規上場"
+
+
+class TestInsertStockPrices:
+    """DatabaseManager.insert_stock_prices のテスト。"""
+
+    def test_upserts_by_date(self, company_filter_service, test_companies, db_session):
+        """同じ日付の株価は上書きし、取得した期間より前の既存データは削除する。"""
+        db_session.add_all(
+            [
+                models.StockPrice(symbol="1234", date=date(2026, 9, 1), close=90),
+                models.StockPrice(symbol="1234", date=date(2026, 10, 1), close=95, volume=900),
+            ]
+        )
+        db_session.commit()
+        db_manager = company_filter_service.db_manager
+
+        price_data = pd.DataFrame(
+            {"close": [100.0, 101.0], "volume": [1000, None]},
+            index=pd.to_datetime(["2026-10-01", "2026-10-02"]),
+        )
+
+        assert db_manager.insert_stock_prices("1234", price_data) is True
+        prices = db_manager.get_stock_prices("1234")
+        assert prices.index.strftime("%Y-%m-%d").tolist() == ["2026-10-01", "2026-10-02"]
+        assert prices["close"].tolist() == [100.0, 101.0]
+        assert prices["volume"].tolist()[0] == 1000
+        assert pd.isna(prices["volume"].tolist()[1])
+
+        latest = db_session.get(models.LatestPrice, "1234", populate_existing=True)
+        assert latest.date == date(2026, 10, 2)
+        # 株価はDecimalに変換せず、SQLiteが返した数値のまま返す
+        assert not isinstance(latest.close, Decimal)
+        assert latest.close == 101.0
+
+
+class TestInsertTickerInfo:
+    """DatabaseManager.insert_ticker_info のテスト。"""
+
+    def test_stores_dividend_actions_as_json(self, company_filter_service, test_companies):
+        """corporateActionsの配当情報は、読み出してそのまま使えるリストとして保存する。"""
+        db_manager = company_filter_service.db_manager
+        dividend = {"amount": 30.0, "currency": "JPY", "dateEpochMs": 1758672000000}
+
+        assert db_manager.insert_ticker_info(
+            "1234",
+            {
+                "sector": "Technology",
+                "corporateActions": [
+                    {"header": "Dividend", "meta": dividend},
+                    {"header": "Split", "meta": {"ratio": 2}},
+                ],
+            },
+        )
+        assert db_manager.get_ticker_info("1234")["corporate_actions_dividend"] == [dividend]
+
+        assert db_manager.insert_ticker_info("1234", {"sector": "Technology"})
+        assert db_manager.get_ticker_info("1234")["corporate_actions_dividend"] is None
+
+
+class TestGetDatabaseStats:
+    """DatabaseManager.get_database_stats のテスト。"""
+
+    def test_counts_symbols_and_latest_date(
+        self, company_filter_service, test_companies, db_session
+    ):
+        """価格のある銘柄数と最新の価格日付を、市場フィルタの有無に応じて集計する。"""
+        db_session.add_all(
+            [
+                models.StockPrice(symbol="1234", date=date(2026, 9, 29), close=100),
+                models.StockPrice(symbol="1234", date=date(2026, 9, 30), close=101),
+                models.StockPrice(symbol="9999", date=date(2026, 10, 1), close=200),
+            ]
+        )
+        db_session.commit()
+        db_manager = company_filter_service.db_manager
+
+        assert db_manager.get_database_stats() == {
+            "symbols_with_prices": 2,
+            "latest_price_date": "2026-10-01",
+            "market_filter": None,
+        }
+        assert db_manager.get_database_stats(market_filter="Prime") == {
+            "symbols_with_prices": 1,
+            "latest_price_date": "2026-09-30",
+            "market_filter": "Prime",
+        }
+
+    def test_cached_within_ttl(self, company_filter_service, test_companies, db_session):
+        """有効期間内は集計し直さず、前回の結果を返す。"""
+        db_session.add(models.StockPrice(symbol="1234", date=date(2026, 9, 30), close=100))
+        db_session.commit()
+        db_manager = company_filter_service.db_manager
+        first = db_manager.get_database_stats()
+
+        db_session.add(models.StockPrice(symbol="9999", date=date(2026, 10, 1), close=200))
+        db_session.commit()
+
+        assert db_manager.get_database_stats() == first
+        db_manager._stats_cache.clear()
+        assert db_manager.get_database_stats()["latest_price_date"] == "2026-10-01"
+
+
+class TestSearchCompanies:
+    """search_companies メソッドのテスト。"""
+
+    def test_filters_without_search(self, company_filter_service, test_companies):
+        """検索文字列がなくても市場区分・業種で絞り込める。"""
+        result = company_filter_service.search_companies(market="Prime", sector="Finance")
+
+        assert [c["symbol"] for c in result] == ["1111"]
+
+    def test_limit_applies_after_filter(self, company_filter_service, test_companies):
+        """件数の上限は絞り込み後の結果に適用する。"""
+        result = company_filter_service.search_companies(limit=1, market="Growth")
+
+        assert [c["symbol"] for c in result] == ["9999"]
+
+    def test_search_pattern(self, company_filter_service, test_companies):
+        """銘柄名の部分一致で検索する。"""
+        result = company_filter_service.search_companies(search="テスト")
+
+        assert sorted(c["symbol"] for c in result) == ["1234", "9999"]
+
+    def test_short_search_pattern(self, company_filter_service, test_companies):
+        """3文字未満の検索文字列も部分一致で検索する。"""
+        result = company_filter_service.search_companies(search="11")
+
+        assert [c["symbol"] for c in result] == ["1111"]
+
+    def test_search_reflects_updates(self, company_filter_service, test_companies, db_session):
+        """企業名の変更が検索インデックスに反映され、大文字小文字を区別しない。"""
+        company = db_session.get(models.Company, "1111")
+        company.name = "Renamed Holdings"
+        db_session.commit()
+
+        assert company_filter_service.search_companies(search="sample") == []
+        result = company_filter_service.search_companies(search="renamed")
+        assert [c["symbol"] for c in result] == ["1111"]
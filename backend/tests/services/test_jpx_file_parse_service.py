@@ -0,0 +1,102 @@
+"""JPXFileParseService unit tests."""
+
+import pandas as pd
+import pytest
+
+from app.config.models import CompanyInfo
+from app.services.jpx.jpx_file_parse_service import JPXFileParseService
+
+
+@pytest.fixture
+def jpx_parser():
+    """JPXFileParseServiceのインスタンスを提供。"""
+    return JPXFileParseService()
+
+
+@pytest.fixture
+def jpx_file(tmp_path):
+    """JPXの上場会社一覧と同じ列構成のExcelファイル。"""
+    df = pd.DataFrame(
+        {
+            "日付": [20260930] * 5,
+            "コード": [7203, "130A", 8951, None, 6758],
+            "銘柄名": [
+                "トヨタ自動車",
+                "Veritas In Silico",
+                "日本ビルファンド投資法人",
+                "欠損",
+                None,
+            ],
+            "市場・商品区分": [
+                "プライム（内国株式）",
+                "グロース（内国株式）",
+                "REIT・ベンチャーファンド・カントリーファンド・インフラファンド",
+                "プライム（内国株式）",
+                "プライム（内国株式）",
+            ],
+            "33業種区分": ["輸送用機器", "医薬品", "-", "-", "電気機器"],
+        }
+    )
+    path = tmp_path / "data_j.xlsx"
+    df.to_excel(path, index=False)
+    return path
+
+
+class TestParseJpxExcel:
+    """parse_jpx_excel メソッドのテスト。"""
+
+    def test_extracts_companies(self, jpx_parser, jpx_file):
+        """銘柄コード・銘柄名のある行だけを企業情報として抽出する。"""
+        companies = jpx_parser.parse_jpx_excel(jpx_file)
+
+        assert [c.symbol for c in companies] == ["7203", "130A", "8951"]
+        assert companies[0] == CompanyInfo(
+            symbol="7203",
+            name="トヨタ自動車",
+            sector="輸送用機器",
+            market="プライム（内国株式）",
+            employees=None,
+            revenue=None,
+            is_enterprise=True,
+        )
+        assert companies[2].is_enterprise is False
+
+    def test_missing_file(self, jpx_parser, tmp_path):
+        """ファイルがない場合は空リストを返す。"""
+        assert jpx_parser.parse_jpx_excel(tmp_path / "missing.xlsx") == []
+
+    def test_symbol_candidates(self, jpx_parser, tmp_path):
+        """ ".T" 付きのコードは4桁に正規化し、4桁のコードになる最初の列を採用する。"""
+        df = pd.DataFrame(
+            {
+                "コード": ["7203.T", "130A", None],
+                "Code": ["9999", "6758", "8306"],
+                "銘柄名": ["トヨタ自動車", "ソニーグループ", "三菱UFJ"],
+            }
+        )
+        path = tmp_path / "symbols.xlsx"
+        df.to_excel(path, index=False)
+
+        companies = jpx_parser.parse_jpx_excel(path)
+
+        assert [c.symbol for c in companies] == ["7203", "6758", "8306"]
+
+    def test_missing_sector_and_market(self, jpx_parser, tmp_path):
+        """業種・市場区分が空欄の行は "Unknown" として抽出する。"""
+        df = pd.DataFrame(
+            {
+                "コード": ["7203", "130A"],
+                "銘柄名": ["トヨタ自動車", "Veritas In Silico"],
+                "市場・商品区分": ["プライム（内国株式）", None],
+                "33業種区分": ["輸送用機器", None],
+            }
+        )
+        path = tmp_path / "blank.xlsx"
+        df.to_excel(path, index=False)
+
+        companies = jpx_parser.parse_jpx_excel(path)
+
+        assert [(c.sector, c.market) for c in companies] == [
+            ("輸送用機器", "プライム（内国株式）"),
+            ("Unknown", "Unknown"),
+        ]
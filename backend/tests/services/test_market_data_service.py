@@ -0,0 +1,186 @@
+"""MarketDataService unit tests."""
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.database import models
+from app.services.market_data import market_data_service as market_data_service_module
+from app.services.market_data.market_data_service import MarketDataService
+
+
+@pytest.fixture
+def market_data_service(db_session):
+    """MarketDataServiceのインスタンスを提供。"""
+    return MarketDataService()
+
+
+class TestCollectTickerInfo:
+    """collect_ticker_info メソッドのテスト。"""
+
+    def test_fetches_concurrently_and_saves_in_caller_thread(
+        self, market_data_service, monkeypatch
+    ):
+        """取得はワーカースレッドで行い、保存は呼び出し元スレッドで行う。"""
+        caller = threading.current_thread()
+        fetch_threads = set()
+        saved = []
+
+        def fetch(symbol):
+            fetch_threads.add(threading.current_thread())
+            return None if symbol == "3333" else {"symbol": symbol}
+
+        def insert(symbol, info):
+            assert threading.current_thread() is caller
+            saved.append(symbol)
+            return True
+
+        monkeypatch.setattr(market_data_service, "_fetch_ticker_info", fetch)
+        monkeypatch.setattr(market_data_service.db_manager, "insert_ticker_info", insert)
+
+        results = market_data_service.collect_ticker_info(["1111", "2222", "3333"])
+
+        assert results == {"1111": True, "2222": True, "3333": False}
+        assert sorted(saved) == ["1111", "2222"]
+        assert caller not in fetch_threads
+
+    def test_save_error_marks_symbol_failed(self, market_data_service, monkeypatch):
+        """保存時の例外は該当銘柄の失敗として扱い、他の銘柄は処理を続ける。"""
+
+        def insert(symbol, info):
+            if symbol == "1111":
+                raise RuntimeError("db error")
+            return True
+
+        monkeypatch.setattr(market_data_service, "_fetch_ticker_info", lambda symbol: {})
+        monkeypatch.setattr(market_data_service.db_manager, "insert_ticker_info", insert)
+
+        results = market_data_service.collect_ticker_info(["1111", "2222"])
+
+        assert results == {"1111": False, "2222": True}
+
+
+class TestFetchTickerInfo:
+    """_fetch_ticker_info メソッドのテスト。"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        MarketDataService.clear_cache()
+        yield
+        MarketDataService.clear_cache()
+
+    def test_memoizes_same_symbol(self, market_data_service, monkeypatch):
+        """同じ銘柄の2回目以降はyfinanceに問い合わせない。"""
+        requested = []
+
+        class FakeTicker:
+            def __init__(self, yf_ticker, session=None):
+                requested.append(yf_ticker)
+                self.info = {"symbol": yf_ticker}
+
+        monkeypatch.setattr(market_data_service_module.yf, "Ticker", FakeTicker)
+
+        assert market_data_service._fetch_ticker_info("1111") == {"symbol": "1111.T"}
+        assert market_data_service._fetch_ticker_info("1111") == {"symbol": "1111.T"}
+        assert requested == ["1111.T"]
+
+    def test_does_not_memoize_errors(self, market_data_service, monkeypatch):
+        """取得に失敗した銘柄は次の呼び出しで再取得する。"""
+        requested = []
+
+        class FailingTicker:
+            def __init__(self, yf_ticker, session=None):
+                requested.append(yf_ticker)
+                raise RuntimeError("network error")
+
+        monkeypatch.setattr(market_data_service_module.yf, "Ticker", FailingTicker)
+
+        assert market_data_service._fetch_ticker_info("1111") is None
+        assert market_data_service._fetch_ticker_info("1111") is None
+        assert requested == ["1111.T", "1111.T"]
+
+    def test_coalesces_concurrent_requests(self, market_data_service, monkeypatch):
+        """同じ銘柄の取得が実行中なら、後から来た呼び出しはその結果を共有する。"""
+        started = threading.Event()
+        release = threading.Event()
+        requested = []
+
+        def slow_fetch(yf_ticker):
+            requested.append(yf_ticker)
+            started.set()
+            release.wait(timeout=5)
+            return {"symbol": yf_ticker}
+
+        monkeypatch.setattr(market_data_service_module, "_fetch_yfinance_info", slow_fetch)
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(market_data_service._fetch_ticker_info("1111"))
+            )
+            for _ in range(3)
+        ]
+        threads[0].start()
+        started.wait(timeout=5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert requested == ["1111.T"]
+        assert results == [{"symbol": "1111.T"}] * 3
+
+
+class TestUpdateStockData:
+    """update_stock_data メソッドのテスト。"""
+
+    def test_skips_recently_saved_ticker_info(self, market_data_service, db_session, monkeypatch):
+        """更新間隔内に保存済みのティッカー情報はyfinanceから再取得しない。"""
+        db_session.add_all(
+            [
+                models.TickerInfo(symbol="1111", last_updated=datetime.now()),
+                models.TickerInfo(symbol="2222", last_updated=datetime.now() - timedelta(days=30)),
+            ]
+        )
+        db_session.commit()
+
+        fetched = []
+        monkeypatch.setattr(market_data_service, "collect_stock_prices", lambda symbols: {})
+        monkeypatch.setattr(
+            market_data_service,
+            "collect_ticker_info",
+            lambda symbols: fetched.extend(symbols) or {},
+        )
+
+        market_data_service.update_stock_data(["1111", "2222", "3333"])
+
+        assert fetched == ["2222", "3333"]
+
+    def test_selects_symbols_with_stale_prices(self, market_data_service, db_session, monkeypatch):
+        """前日より前の株価しかない銘柄と、株価がない銘柄だけを再取得する。"""
+        today = date.today()
+        db_session.add_all(
+            [
+                models.Company(symbol="1111", name="最新"),
+                models.Company(symbol="2222", name="古い"),
+                models.StockPrice(symbol="1111", date=today - timedelta(days=1), close=100),
+                models.StockPrice(symbol="2222", date=today - timedelta(days=5), close=200),
+            ]
+        )
+        db_session.commit()
+
+        fetched = []
+        monkeypatch.setattr(
+            market_data_service,
+            "collect_stock_prices",
+            lambda symbols: fetched.extend(symbols) or {},
+        )
+        monkeypatch.setattr(market_data_service, "collect_ticker_info", lambda symbols: {})
+
+        market_data_service.update_stock_data(["1111", "2222", "3333"])
+
+        assert fetched == ["2222", "3333"]
@@ -1,12 +1,13 @@
 """PortfolioService unit tests."""
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 import pytest
+from fastapi import HTTPException
 
 from app.database import models
-from app.services.portfolio.portfolio_service import PortfolioService
+from app.services.portfolio.portfolio_service import MAX_PORTFOLIOS_PER_USER, PortfolioService
 
 
 @pytest.fixture
@@ -81,6 +82,20 @@ def test_stock_price(db_session, test_company):
     return stock_price
 
 
+class TestCreatePortfolio:
+    """create_portfolio メソッドのテスト。"""
+
+    def test_rejects_over_limit(self, portfolio_service, test_user):
+        """ユーザーあたりの上限数を超えるポートフォリオは作成できない。"""
+        for i in range(MAX_PORTFOLIOS_PER_USER):
+            portfolio_service.create_portfolio(test_user.id, f"ポートフォリオ{i}", None, 1000000.0)
+
+        with pytest.raises(HTTPException) as exc_info:
+            portfolio_service.create_portfolio(test_user.id, "上限超過", None, 1000000.0)
+
+        assert exc_info.value.status_code == 400
+
+
 class TestCalculatePortfolioValue:
     """calculate_portfolio_value メソッドのテスト。"""
 
@@ -88,10 +103,10 @@ class TestCalculatePortfolioValue:
         """初期状態（取引なし）のポートフォリオ評価額を計算。"""
         result = portfolio_service.calculate_portfolio_value(test_portfolio.id)
 
-        assert result["total_value"] == 1000000.0
-        assert result["cash_balance"] == 1000000.0
-        assert result["total_profit_loss"] == 0.0
-        assert result["total_profit_loss_rate"] == 0.0
+        assert result.total_value == 1000000.0
+        assert result.cash_balance == 1000000.0
+        assert result.total_profit_loss == 0.0
+        assert result.total_profit_loss_rate == 0.0
 
     def test_with_buy_transaction(
         self, portfolio_service, db_session, test_portfolio, test_company, test_stock_price
@@ -122,14 +137,14 @@ class TestCalculatePortfolioValue:
         result = portfolio_service.calculate_portfolio_value(test_portfolio.id)
 
         # 現金残高 = 1,000,000 - 100,000 = 900,000
-        assert result["cash_balance"] == 900000.0
+        assert result.cash_balance == 900000.0
         # ポジション評価額 = 100株 x 1,050円（最新株価） = 105,000
         # 総評価額 = 900,000 + 105,000 = 1,005,000
-        assert result["total_value"] == 1005000.0
+        assert result.total_value == 1005000.0
         # 損益 = 1,005,000 - 1,000,000 = 5,000
-        assert result["total_profit_loss"] == 5000.0
+        assert result.total_profit_loss == 5000.0
         # 損益率 = 5,000 / 1,000,000 * 100 = 0.5%
-        assert result["total_profit_loss_rate"] == 0.5
+        assert result.total_profit_loss_rate == 0.5
 
     def test_with_deposit_transaction(self, portfolio_service, db_session, test_portfolio):
         """入金取引後のポートフォリオ評価額を計算。"""
@@ -149,14 +164,14 @@ class TestCalculatePortfolioValue:
         result = portfolio_service.calculate_portfolio_value(test_portfolio.id)
 
         # 現金残高 = 1,000,000 + 100,000 = 1,100,000
-        assert result["cash_balance"] == 1100000.0
+        assert result.cash_balance == 1100000.0
         # 総評価額 = 1,100,000
-        assert result["total_value"] == 1100000.0
+        assert result.total_value == 1100000.0
         # 投資元本 = 1,000,000 + 100,000 = 1,100,000
         # 損益 = 1,100,000 - 1,100,000 = 0（入金は損益に含まれない）
-        assert result["total_profit_loss"] == 0.0
+        assert result.total_profit_loss == 0.0
         # 損益率 = 0 / 1,100,000 * 100 = 0%
-        assert result["total_profit_loss_rate"] == 0.0
+        assert result.total_profit_loss_rate == 0.0
 
     def test_with_withdrawal_transaction(self, portfolio_service, db_session, test_portfolio):
         """出金取引後のポートフォリオ評価額を計算。"""
@@ -176,14 +191,14 @@ class TestCalculatePortfolioValue:
         result = portfolio_service.calculate_portfolio_value(test_portfolio.id)
 
         # 現金残高 = 1,000,000 - 50,000 = 950,000
-        assert result["cash_balance"] == 950000.0
+        assert result.cash_balance == 950000.0
         # 総評価額 = 950,000
-        assert result["total_value"] == 950000.0
+        assert result.total_value == 950000.0
         # 投資元本 = 1,000,000 - 50,000 = 950,000
         # 損益 = 950,000 - 950,000 = 0（出金は損益に含まれない）
-        assert result["total_profit_loss"] == 0.0
+        assert result.total_profit_loss == 0.0
         # 損益率 = 0 / 950,000 * 100 = 0%
-        assert result["total_profit_loss_rate"] == 0.0
+        assert result.total_profit_loss_rate == 0.0
 
     def test_with_multiple_transactions(
         self, portfolio_service, db_session, test_portfolio, test_company, test_stock_price
@@ -238,12 +253,155 @@ class TestCalculatePortfolioValue:
         result = portfolio_service.calculate_portfolio_value(test_portfolio.id)
 
         # 現金残高 = 1,000,000 - 100,000（購入） + 200,000（入金） - 50,000（出金） = 1,050,000
-        assert result["cash_balance"] == 1050000.0
+        assert result.cash_balance == 1050000.0
         # ポジション評価額 = 100株 x 1,050円 = 105,000
         # 総評価額 = 1,050,000 + 105,000 = 1,155,000
-        assert result["total_value"] == 1155000.0
+        assert result.total_value == 1155000.0
         # 投資元本 = 1,000,000 + 200,000（入金） - 50,000（出金） = 1,150,000
         # 損益 = 1,155,000 - 1,150,000 = 5,000（株の評価益のみ）
-        assert result["total_profit_loss"] == 5000.0
+        assert result.total_profit_loss == 5000.0
         # 損益率 = 5,000 / 1,150,000 * 100 ≈ 0.43%
-        assert abs(result["total_profit_loss_rate"] - 0.43478260869565216) < 0.0001
+        assert abs(result.total_profit_loss_rate - 0.43478260869565216) < 0.0001
+
+    def test_reflects_updated_and_deleted_transactions(
+        self, portfolio_service, db_session, test_portfolio
+    ):
+        """取引の変更・削除もポートフォリオの合計額に反映される。"""
+        deposit = models.Transaction(
+            portfolio_id=test_portfolio.id,
+            symbol=None,
+            transaction_type="deposit",
+            quantity=0,
+            price=Decimal("0.00"),
+            total_amount=Decimal("100000.00"),
+            transaction_date=datetime.now(timezone.utc),
+        )
+        withdrawal = models.Transaction(
+            portfolio_id=test_portfolio.id,
+            symbol=None,
+            transaction_type="withdrawal",
+            quantity=0,
+            price=Decimal("0.00"),
+            total_amount=Decimal("50000.00"),
+            transaction_date=datetime.now(timezone.utc),
+        )
+        db_session.add_all([deposit, withdrawal])
+        db_session.commit()
+
+        deposit.total_amount = 300000.0
+        db_session.delete(withdrawal)
+        db_session.commit()
+
+        result = portfolio_service.calculate_portfolio_value(test_portfolio.id)
+
+        # 現金残高 = 1,000,000 + 300,000（変更後の入金） = 1,300,000
+        assert result.cash_balance == 1300000.0
+        assert result.total_profit_loss == 0.0
+
+    def test_uses_latest_price_after_price_changes(
+        self, portfolio_service, db_session, test_portfolio, test_company, test_stock_price
+    ):
+        """株価の追加・削除に合わせて、評価には銘柄ごとの最新の終値を使う。"""
+        db_session.add(
+            models.Position(
+                portfolio_id=test_portfolio.id,
+                symbol=test_company.symbol,
+                quantity=100,
+                average_price=Decimal("1000.00"),
+            )
+        )
+        newer = models.StockPrice(
+            symbol=test_company.symbol,
+            date=test_stock_price.date + timedelta(days=1),
+            close=Decimal("1100.00"),
+        )
+        older = models.StockPrice(
+            symbol=test_company.symbol,
+            date=test_stock_price.date - timedelta(days=1),
+            close=Decimal("900.00"),
+        )
+        db_session.add_all([newer, older])
+        db_session.commit()
+
+        # 最新の終値 1,100円 x 100株 = 110,000
+        assert portfolio_service.calculate_portfolio_value(test_portfolio.id).total_value == (
+            1110000.0
+        )
+
+        db_session.delete(newer)
+        db_session.commit()
+        # 株価の更新ではキャッシュは破棄されない（TTLの経過後に反映される）
+        PortfolioService.clear_cache()
+
+        # 削除後の最新の終値 1,050円 x 100株 = 105,000
+        assert portfolio_service.calculate_portfolio_value(test_portfolio.id).total_value == (
+            1105000.0
+        )
+
+
+class TestValuationCache:
+    """calculate_portfolio_value のキャッシュのテスト。"""
+
+    def test_cached_until_invalidated(self, portfolio_service, db_session, test_portfolio):
+        """キャッシュを破棄するまでは、前回の計算結果を返す。"""
+        assert portfolio_service.calculate_portfolio_value(test_portfolio.id).cash_balance == (
+            1000000.0
+        )
+
+        db_session.add(
+            models.Transaction(
+                portfolio_id=test_portfolio.id,
+                symbol=None,
+                transaction_type="deposit",
+                quantity=0,
+                price=Decimal("0.00"),
+                total_amount=Decimal("100000.00"),
+                transaction_date=datetime.now(timezone.utc),
+            )
+        )
+        db_session.commit()
+
+        assert portfolio_service.calculate_portfolio_value(test_portfolio.id).cash_balance == (
+            1000000.0
+        )
+        PortfolioService.invalidate_cache(test_portfolio.id)
+
+        assert portfolio_service.calculate_portfolio_value(test_portfolio.id).cash_balance == (
+            1100000.0
+        )
+
+    def test_invalidated_during_calculation(
+        self, portfolio_service, db_session, test_portfolio, monkeypatch
+    ):
+        """計算中にキャッシュが破棄された場合は、その計算結果を保存しない。"""
+        calculate = portfolio_service._calculate_portfolio_value
+
+        def calculate_then_invalidate(portfolio_id):
+            valuation = calculate(portfolio_id)
+            # 計算後、保存前に取引が記録されたものとする
+            test_portfolio.initial_capital = Decimal("2000000.00")
+            db_session.commit()
+            PortfolioService.invalidate_cache(portfolio_id)
+            return valuation
+
+        monkeypatch.setattr(
+            portfolio_service, "_calculate_portfolio_value", calculate_then_invalidate
+        )
+        assert portfolio_service.calculate_portfolio_value(test_portfolio.id).cash_balance == (
+            1000000.0
+        )
+        monkeypatch.setattr(portfolio_service, "_calculate_portfolio_value", calculate)
+
+        assert portfolio_service.calculate_portfolio_value(test_portfolio.id).cash_balance == (
+            2000000.0
+        )
+
+    def test_bypass_cache(self, portfolio_service, db_session, test_portfolio):
+        """bypass_cache=True の場合はキャッシュを使わずに計算する。"""
+        portfolio_service.calculate_portfolio_value(test_portfolio.id)
+        test_portfolio.initial_capital = Decimal("2000000.00")
+        db_session.commit()
+
+        result = portfolio_service.calculate_portfolio_value(test_portfolio.id, bypass_cache=True)
+
+        assert result.cash_balance == 2000000.0
@@ -0,0 +1,94 @@
+"""PositionService unit tests."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import models
+from app.services.portfolio.position_service import PositionService
+
+
+@pytest.fixture
+def position_service(db_session):
+    """PositionServiceのインスタンスを提供。"""
+    return PositionService(db_session)
+
+
+@pytest.fixture
+def test_portfolio(db_session):
+    """テスト用のユーザー・企業・株価・ポートフォリオを作成。"""
+    user = models.User(
+        login_id="testuser",
+        display_name="Test User",
+        role="user",
+        status="active",
+        password_hash="x",
+    )
+    db_session.add(user)
+    db_session.add_all(
+        [
+            models.Company(symbol="1111", name="テスト工業", market="Prime"),
+            models.Company(symbol="2222", name="サンプル商事", market="Prime"),
+            models.StockPrice(symbol="2222", date=date(2026, 10, 1), close=Decimal("500.00")),
+        ]
+    )
+    db_session.commit()
+
+    portfolio = models.Portfolio(
+        user_id=user.id, name="テストポートフォリオ", initial_capital=Decimal("1000000.00")
+    )
+    db_session.add(portfolio)
+    db_session.commit()
+    db_session.add(
+        models.Position(
+            portfolio_id=portfolio.id,
+            symbol="1111",
+            quantity=100,
+            average_price=Decimal("1000.00"),
+        )
+    )
+    db_session.commit()
+    return portfolio
+
+
+class TestBuyStocks:
+    """buy_stocks メソッドのテスト。"""
+
+    def test_records_trades_and_updates_positions(
+        self, position_service, db_session, test_portfolio
+    ):
+        """既存ポジションは加重平均で更新し、新規銘柄はポジションを作成する。"""
+        transactions = position_service.buy_stocks(
+            test_portfolio.id,
+            [
+                {"symbol": "1111", "quantity": 100, "price": 1200.0},
+                {"symbol": "2222", "quantity": 10},
+                {"symbol": "2222", "quantity": 10, "price": 600.0},
+            ],
+        )
+
+        assert [float(t.total_amount) for t in transactions] == [120000.0, 5000.0, 6000.0]
+        positions = {
+            p.symbol: p
+            for p in db_session.query(models.Position).filter_by(portfolio_id=test_portfolio.id)
+        }
+        assert positions["1111"].quantity == 200
+        assert float(positions["1111"].average_price) == 1100.0
+        assert positions["2222"].quantity == 20
+        assert float(positions["2222"].average_price) == 550.0
+
+    def test_missing_price_records_nothing(self, position_service, db_session, test_portfolio):
+        """株価のない銘柄が含まれる場合は、いずれの購入も記録しない。"""
+        with pytest.raises(HTTPException) as exc_info:
+            position_service.buy_stocks(
+                test_portfolio.id,
+                [
+                    {"symbol": "2222", "quantity": 10},
+                    {"symbol": "1111", "quantity": 10},
+                ],
+            )
+
+        assert exc_info.value.status_code == 404
+        assert db_session.query(models.Transaction).count() == 0
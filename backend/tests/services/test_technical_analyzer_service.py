@@ -0,0 +1,380 @@
+"""TechnicalAnalyzerService unit tests."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from app.database import models
+from app.services.analysis.technical_analyzer_service import (
+    TechnicalAnalyzerService,
+    _analyze_ma_trend,
+    _analyze_price_trend,
+)
+
+PRIME = "プライム（内国株式）"
+
+
+@pytest.fixture
+def analyzer(db_session):
+    """TechnicalAnalyzerServiceのインスタンスを提供。"""
+    return TechnicalAnalyzerService()
+
+
+def add_prices(db_session, symbol: str, closes: list[float]) -> None:
+    """古い順の終値リストから株価データを作成する（最後の要素が本日）。"""
+    today = date.today()
+    for i, close in enumerate(closes):
+        db_session.add(
+            models.StockPrice(
+                symbol=symbol,
+                date=today - timedelta(days=len(closes) - 1 - i),
+                open=Decimal(str(close)),
+                high=Decimal(str(close)),
+                low=Decimal(str(close)),
+                close=Decimal(str(close)),
+                volume=1000,
+            )
+        )
+
+
+@pytest.fixture
+def candidate_companies(db_session):
+    """乖離率・配当利回りの条件を満たす候補企業を作成。"""
+    for symbol, dividend_rate in [("1111", Decimal("40")), ("2222", Decimal("30"))]:
+        db_session.add(
+            models.Company(symbol=symbol, name=f"企業{symbol}", market=PRIME, is_enterprise=True)
+        )
+        db_session.add(
+            models.TickerInfo(symbol=symbol, trailing_annual_dividend_rate=dividend_rate)
+        )
+    # 1111: 直近で大きく下落（前日比 -10%）
+    add_prices(db_session, "1111", [1100.0] * 29 + [1000.0, 900.0])
+    # 2222: 小幅に下落（前日比 -1%）
+    add_prices(db_session, "2222", [1100.0] * 29 + [1000.0, 990.0])
+    db_session.commit()
+
+
+class TestGetDividendYield:
+    """get_dividend_yield メソッドのテスト。"""
+
+    def test_uses_given_ticker_info(self, analyzer, monkeypatch):
+        """ticker_infoを渡した場合はDBから再取得しない。"""
+
+        def fail(symbol):
+            raise AssertionError("get_ticker_info should not be called")
+
+        monkeypatch.setattr(analyzer.db_manager, "get_ticker_info", fail)
+
+        ticker_info = {"trailing_annual_dividend_rate": 40.0}
+        assert analyzer.get_dividend_yield("1111", 1000.0, ticker_info=ticker_info) == 4.0
+
+    def test_no_dividend_skips_price_lookup(self, analyzer, monkeypatch):
+        """年間配当金がなければ株価を取得せずに0.0を返す。"""
+
+        def fail(symbol):
+            raise AssertionError("get_stock_prices_arrays should not be called")
+
+        monkeypatch.setattr(analyzer.db_manager, "get_stock_prices_arrays", fail)
+
+        ticker_info = {"trailing_annual_dividend_rate": None}
+        assert analyzer.get_dividend_yield("1111", ticker_info=ticker_info) == 0.0
+
+    def test_falls_back_to_ticker_price(self, analyzer):
+        """株価データがない場合はticker_infoの株価を使う。"""
+        ticker_info = {"trailing_annual_dividend_rate": 30.0, "current_price": 1000.0}
+        assert analyzer.get_dividend_yield("1111", ticker_info=ticker_info) == 3.0
+
+        ticker_info = {"trailing_annual_dividend_rate": 30.0, "current_price": None}
+        assert analyzer.get_dividend_yield("1111", ticker_info=ticker_info) == 0.0
+
+    @pytest.mark.parametrize("latest_close", [np.nan, 0.0, -100.0])
+    def test_invalid_close_falls_back_to_ticker_price(self, analyzer, monkeypatch, latest_close):
+        """最新の終値が欠損・0以下の場合はticker_infoの株価を使う。"""
+        monkeypatch.setattr(
+            analyzer.db_manager,
+            "get_stock_prices_arrays",
+            lambda symbol: {"close": np.array([900.0, latest_close])},
+        )
+
+        ticker_info = {"trailing_annual_dividend_rate": 30.0, "current_price": 1000.0}
+        assert analyzer.get_dividend_yield("1111", ticker_info=ticker_info) == 3.0
+
+    def test_analyze_batch_prefetches_ticker_info(self, analyzer, db_session, monkeypatch):
+        """バッチではticker_infoを銘柄ごとに取得せず、1回のクエリでまとめて取得する。"""
+        db_session.add(
+            models.TickerInfo(symbol="1111", trailing_annual_dividend_rate=Decimal("40"))
+        )
+        add_prices(db_session, "1111", [1000.0] * 30)
+        add_prices(db_session, "2222", [1000.0] * 30)
+        db_session.commit()
+
+        def fail(symbol):
+            raise AssertionError("get_ticker_info should not be called")
+
+        monkeypatch.setattr(analyzer.db_manager, "get_ticker_info", fail)
+
+        results = analyzer.analyze_batch_stocks(["1111", "2222"], max_workers=1)
+
+        assert results["1111"]["dividend_yield"] == 4.0
+        # ticker_infoがない銘柄も再取得せずに0.0とする
+        assert results["2222"]["dividend_yield"] == 0.0
+
+
+class TestAnalyzeBatchStocks:
+    """analyze_batch_stocks メソッドのテスト。"""
+
+    def test_writes_indicators_in_one_batch(self, analyzer, candidate_companies, monkeypatch):
+        """全銘柄の計算後に技術指標を1回でまとめて保存する。"""
+        calls = []
+        bulk_insert = analyzer.db_manager.insert_technical_indicators_bulk
+        monkeypatch.setattr(
+            analyzer.db_manager,
+            "insert_technical_indicators_bulk",
+            lambda w: calls.append([write.symbol for write in w]) or bulk_insert(w),
+        )
+
+        results = analyzer.analyze_batch_stocks(["1111", "9999", "2222"])
+
+        assert calls == [["1111", "2222"]]
+        assert list(results) == ["1111", "9999", "2222"]
+        assert results["9999"] is None
+        assert len(analyzer.db_manager.get_technical_indicators("2222")) == 7
+
+    def test_failed_write_marks_results_failed(self, analyzer, candidate_companies, monkeypatch):
+        """一括保存に失敗した銘柄の結果はNoneになる。"""
+        monkeypatch.setattr(
+            analyzer.db_manager, "insert_technical_indicators_bulk", lambda w: False
+        )
+
+        results = analyzer.analyze_batch_stocks(["1111", "2222"])
+
+        assert results == {"1111": None, "2222": None}
+
+    def test_retries_each_symbol_when_batch_fails(self, analyzer, candidate_companies, monkeypatch):
+        """一括保存に失敗した場合は銘柄ごとに保存し直し、保存できなかった銘柄だけNoneになる。"""
+        calls = []
+        bulk_insert = analyzer.db_manager.insert_technical_indicators_bulk
+
+        def insert_unless_1111(writes):
+            calls.append([write.symbol for write in writes])
+            return "1111" not in calls[-1] and bulk_insert(writes)
+
+        monkeypatch.setattr(
+            analyzer.db_manager, "insert_technical_indicators_bulk", insert_unless_1111
+        )
+
+        results = analyzer.analyze_batch_stocks(["1111", "2222"])
+
+        assert calls == [["1111", "2222"], ["1111"], ["2222"]]
+        assert results["1111"] is None
+        assert results["2222"] is not None
+        assert len(analyzer.db_manager.get_technical_indicators("2222")) == 7
+
+
+class TestGetLatestPricesBulk:
+    """DatabaseManager.get_latest_prices_bulk のテスト。"""
+
+    def test_returns_latest_n_rows_per_symbol(self, analyzer, candidate_companies):
+        """銘柄ごとに直近n件のみを日付昇順で返す。"""
+        df = analyzer.db_manager.get_latest_prices_bulk(["1111", "2222"], n=2)
+
+        assert df["symbol"].tolist() == ["1111", "1111", "2222", "2222"]
+        assert df[df["symbol"] == "1111"]["close"].tolist() == [1000.0, 900.0]
+
+    def test_empty_symbols(self, analyzer):
+        """銘柄リストが空の場合は空のDataFrameを返す。"""
+        assert analyzer.db_manager.get_latest_prices_bulk([]).empty
+
+
+class TestGetStockPricesArrays:
+    """DatabaseManager.get_stock_prices_arrays のテスト。"""
+
+    def test_returns_arrays_in_date_order(self, analyzer, candidate_companies):
+        """日付・終値・出来高を日付昇順の配列で返す。"""
+        arrays = analyzer.db_manager.get_stock_prices_arrays("1111")
+
+        assert len(arrays["date"]) == 31
+        assert arrays["date"][-1] == np.datetime64(date.today(), "ns")
+        assert arrays["close"][-2:].tolist() == [1000.0, 900.0]
+        assert arrays["volume"].dtype == np.float64
+
+    def test_unknown_symbol(self, analyzer):
+        """株価データがない銘柄は空の配列を返す。"""
+        assert len(analyzer.db_manager.get_stock_prices_arrays("9999")["date"]) == 0
+
+    def test_db_error_is_raised(self, analyzer, tmp_path, monkeypatch):
+        """DBからの取得に失敗した場合は、空の配列を返さずに例外を送出する。"""
+        monkeypatch.setattr(
+            analyzer.db_manager, "_engine", create_engine(f"sqlite:///{tmp_path}/missing/db")
+        )
+
+        with pytest.raises(OperationalError):
+            analyzer.db_manager.get_stock_prices_arrays("1111")
+
+
+class TestGetInvestmentCandidates:
+    """get_investment_candidates メソッドのテスト。"""
+
+    def test_enriches_candidates_with_latest_prices(self, analyzer, candidate_companies):
+        """最新株価・前日比・スコアが付与され、スコア順に並ぶ。"""
+        analyzer.analyze_batch_stocks(["1111", "2222"])
+
+        candidates = analyzer.get_investment_candidates(
+            divergence_threshold=-1.0, dividend_min=0.0, dividend_max=100.0, market_filter="prime"
+        )
+
+        by_symbol = {c["symbol"]: c for c in candidates}
+        assert set(by_symbol) == {"1111", "2222"}
+        assert by_symbol["1111"]["latest_price"] == 900.0
+        assert by_symbol["1111"]["price_change_1d"] == -10.0
+        assert by_symbol["2222"]["price_change_1d"] == -1.0
+        scores = [c["analysis_score"] for c in candidates]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_sorts_by_score_and_limits(self, analyzer, monkeypatch):
+        """スコアの降順に並び、同点は抽出順を保ち、limit指定時は上位のみ返す。"""
+        filtered = [{"symbol": symbol} for symbol in ["1111", "2222", "3333", "4444"]]
+        monkeypatch.setattr(
+            analyzer.db_manager,
+            "get_filtered_companies",
+            lambda **kwargs: [dict(c) for c in filtered],
+        )
+        monkeypatch.setattr(
+            analyzer, "_calculate_investment_scores", lambda candidates: [3.0, 7.0, 3.0, 5.0]
+        )
+        monkeypatch.setattr(
+            analyzer,
+            "_summarize_latest_prices",
+            lambda latest_prices: {c["symbol"]: (100.0, 0.0) for c in filtered},
+        )
+
+        candidates = analyzer.get_investment_candidates()
+        assert [c["symbol"] for c in candidates] == ["2222", "4444", "1111", "3333"]
+
+        top = analyzer.get_investment_candidates(limit=2)
+        assert [c["symbol"] for c in top] == ["2222", "4444"]
+
+
+class TestCalculateInvestmentScores:
+    """_calculate_investment_scores メソッドのテスト。"""
+
+    def test_scores_follow_thresholds(self, analyzer):
+        """乖離率・配当利回り・企業規模・市場区分の各閾値で加点される。"""
+        candidates = [
+            # 乖離率10%以上(5) + 配当3.5-4.5%(3) + 大企業(2) + プライム(2)
+            {
+                "divergence_rate": -10.0,
+                "dividend_yield": 4.0,
+                "is_enterprise": True,
+                "market": PRIME,
+            },
+            # 乖離率3%以上(2) + 配当3-5%(2) + スタンダード(1)
+            {
+                "divergence_rate": -3.0,
+                "dividend_yield": 5.0,
+                "is_enterprise": False,
+                "market": "スタンダード（内国株式）",
+            },
+            # 乖離率3%未満(0) + 配当その他(1)
+            {"divergence_rate": -2.9, "dividend_yield": 6.0, "is_enterprise": False, "market": ""},
+            # 値が欠損していれば加点しない
+            {
+                "divergence_rate": None,
+                "dividend_yield": None,
+                "is_enterprise": None,
+                "market": None,
+            },
+        ]
+
+        assert analyzer._calculate_investment_scores(candidates) == [12.0, 5.0, 1.0, 0.0]
+
+    def test_empty_candidates(self, analyzer):
+        """候補が空の場合は空リストを返す。"""
+        assert analyzer._calculate_investment_scores([]) == []
+
+
+class TestTrendAnalysis:
+    """トレンド判定関数のテスト。"""
+
+    def test_ma_trend(self):
+        """MACDの符号とヒストグラムの傾きで判定する。"""
+        flat = [100.0] * 50
+        rising = pd.Series(flat + [100.0 + i for i in range(1, 11)])
+        falling = pd.Series(flat + [100.0 - i for i in range(1, 11)])
+
+        assert _analyze_ma_trend(rising) == "Upward"
+        assert _analyze_ma_trend(falling) == "Downward"
+        assert _analyze_ma_trend(pd.Series(flat)) == "Sideways"
+        assert _analyze_ma_trend(pd.Series(flat[:10])) == "Unknown"
+
+    def test_price_trend(self):
+        """前日比の大きさで判定する。"""
+        assert _analyze_price_trend((100.0, 103.0)) == "Strong Up"
+        assert _analyze_price_trend((100.0, 99.0)) == "Down"
+        assert _analyze_price_trend((100.0, 100.0)) == "Flat"
+
+
+class TestIncrementalIndicatorUpdate:
+    """analyze_single_stock の差分更新のテスト。"""
+
+    @pytest.fixture
+    def analyzed_stock(self, analyzer, db_session):
+        """指標を一度保存した後、翌日の株価を追加した銘柄。"""
+        db_session.add(
+            models.TickerInfo(symbol="1111", trailing_annual_dividend_rate=Decimal("40"))
+        )
+        add_prices(db_session, "1111", [1000.0 + i for i in range(40)])
+        db_session.commit()
+        analyzer.analyze_single_stock("1111")
+
+        db_session.add(
+            models.StockPrice(
+                symbol="1111",
+                date=date.today() + timedelta(days=1),
+                open=Decimal("1100"),
+                high=Decimal("1100"),
+                low=Decimal("1100"),
+                close=Decimal("1100"),
+                volume=1000,
+            )
+        )
+        db_session.commit()
+
+    def test_appends_only_new_rows(self, analyzer, analyzed_stock, monkeypatch):
+        """保存済みの最新日以降だけを再計算し、全期間の再計算と同じ指標を保存する。"""
+        writes = []
+        bulk_insert = analyzer.db_manager.insert_technical_indicators_bulk
+        monkeypatch.setattr(
+            analyzer.db_manager,
+            "insert_technical_indicators_bulk",
+            lambda w: writes.extend(w) or bulk_insert(w),
+        )
+
+        result = analyzer.analyze_single_stock("1111")
+
+        # 保存済みの最新日と追加した翌日の2行だけを書き込む
+        assert len(writes[0].indicators) == 2
+        assert writes[0].oldest_date is not None
+        indicators = analyzer.db_manager.get_technical_indicators("1111")
+        # 41日分の株価に対し、25日移動平均が計算できるのは17日分
+        assert len(indicators) == 17
+        expected_ma = (sum(1000.0 + i for i in range(16, 40)) + 1100.0) / 25
+        assert indicators["ma_25"].iat[-1] == pytest.approx(expected_ma)
+        assert result["latest_ma_25"] == pytest.approx(expected_ma)
+
+    def test_recalculates_all_when_prices_revised(self, analyzer, analyzed_stock, db_session):
+        """過去の株価が調整されていた場合は全期間を再計算する。"""
+        for price in db_session.query(models.StockPrice).filter_by(symbol="1111"):
+            price.close = price.close / 2
+        db_session.commit()
+
+        analyzer.analyze_single_stock("1111")
+
+        indicators = analyzer.db_manager.get_technical_indicators("1111")
+        assert len(indicators) == 17
+        assert indicators["ma_25"].iat[0] == pytest.approx(sum(1000.0 + i for i in range(25)) / 50)
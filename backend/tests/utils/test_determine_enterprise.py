@@ -0,0 +1,41 @@
+"""エンタープライズ判定ユーティリティ関数のテスト"""
+
+import pandas as pd
+
+from app.utils.determine_enterprise import (
+    determine_enterprise_status,
+    determine_enterprise_statuses,
+)
+
+
+class TestDetermineEnterpriseStatus:
+    """determine_enterprise_status関数のテスト"""
+
+    def test_excluded_keywords(self):
+        """投資法人・持株会社などのキーワードを含む銘柄は対象外"""
+        assert determine_enterprise_status("日本ビルファンド投資法人") is False
+        assert determine_enterprise_status("サンプルHD") is False
+
+    def test_small_company_keywords(self):
+        """小規模企業を示すキーワードを含む銘柄は対象外"""
+        assert determine_enterprise_status("地域サービス") is False
+
+    def test_without_keywords(self):
+        """除外キーワードがなければ対象"""
+        assert determine_enterprise_status("トヨタ自動車")
+        assert determine_enterprise_status("サンプル工業")
+
+
+class TestDetermineEnterpriseStatuses:
+    """determine_enterprise_statuses関数のテスト"""
+
+    def test_matches_scalar_function(self):
+        """行ごとに determine_enterprise_status を呼んだ結果と一致する"""
+        names = pd.Series(
+            ["トヨタ自動車", "日本ビルファンド投資法人", "サンプルHD", "地域サービス"]
+        )
+
+        result = determine_enterprise_statuses(names)
+
+        assert result.tolist() == [determine_enterprise_status(name) for name in names]
+        assert result.tolist() == [True, False, False, False]
@@ -0,0 +1,88 @@
+"""価格指標ユーティリティ関数のテスト"""
+
+import math
+
+import pandas as pd
+import pytest
+
+from app.utils.price_indicators import (
+    calculate_divergence_rate,
+    calculate_divergence_rates,
+    calculate_ema,
+    calculate_macd,
+    calculate_moving_average,
+)
+
+
+class TestCalculateEma:
+    """calculate_ema関数のテスト"""
+
+    def test_matches_recursive_definition(self):
+        """V_i = s * C_i + (1 - s) * V_{i-1} の漸化式と一致する"""
+        prices = pd.Series([100.0, 102.5, 98.3, 110.0, 95.1])
+        period = 3
+        s = 2 / (period + 1)
+
+        expected = [prices.iloc[0]]
+        for price in prices.iloc[1:]:
+            expected.append(s * price + (1 - s) * expected[-1])
+
+        result = calculate_ema(prices, period)
+
+        assert result.tolist() == pytest.approx(expected)
+
+
+class TestCalculateMacd:
+    """calculate_macd関数のテスト"""
+
+    def test_columns(self):
+        """macd・signal・histogramの関係が成り立つ"""
+        prices = pd.Series([100.0 + i % 7 for i in range(40)])
+
+        result = calculate_macd(prices)
+
+        expected_macd = calculate_ema(prices, 12) - calculate_ema(prices, 26)
+        assert result["macd"].tolist() == pytest.approx(expected_macd.tolist())
+        assert result["histogram"].tolist() == pytest.approx(
+            (result["macd"] - result["signal"]).tolist()
+        )
+
+    def test_constant_prices(self):
+        """価格が一定ならMACDは0になる"""
+        result = calculate_macd(pd.Series([100.0] * 40))
+
+        assert result["macd"].abs().max() == 0.0
+
+
+class TestCalculateDivergenceRates:
+    """calculate_divergence_rates関数のテスト"""
+
+    def test_matches_scalar_calculation(self):
+        """要素ごとのcalculate_divergence_rateと同じ結果になる"""
+        prices = pd.Series([100.0, 102.5, 98.3, 110.0, 95.1, 101.7, 99.9])
+        ma = calculate_moving_average(prices, 3)
+
+        result = calculate_divergence_rates(prices, ma)
+
+        expected = [calculate_divergence_rate(p, m) for p, m in zip(prices, ma)]
+        assert result.tolist() == expected
+
+    def test_invalid_moving_average_returns_zero(self):
+        """移動平均がNaN・0の要素は0.0になる"""
+        prices = pd.Series([100.0, 100.0, 100.0])
+        ma = pd.Series([math.nan, 0.0, 80.0])
+
+        result = calculate_divergence_rates(prices, ma)
+
+        assert result.tolist() == [0.0, 0.0, 25.0]
+
+    def test_preserves_index(self):
+        """入力のインデックスを保持する"""
+        index = pd.date_range("2024-01-01", periods=2)
+        prices = pd.Series([110.0, 90.0], index=index)
+        ma = pd.Series([100.0, 100.0], index=index)
+
+        result = calculate_divergence_rates(prices, ma)
+
+        assert result.index.equals(index)
+        assert result.tolist() == [10.0, -10.0]